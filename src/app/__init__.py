@@ -1,25 +1,36 @@
 # src/app/__init__.py
 from flask import Flask, request, current_app
-from .config import Config
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from .config import get_config
 from .extensions import db, migrate, bcrypt, jwt, cors, scheduler, socketio
+from .models import User
 from .routes import register_blueprints
-from .tasks import schedule_jobs
+from .tasks import schedule_jobs, start_scheduler
 from .cli import register_cli
 from .utils import api_error, api_ok
 from .sockets import register_socketio
+from .compress import init_compression, stats as compress_stats
+from . import archive, drain, ending_soon, facets, metrics
+from .retry import TransactionConflict
+from .sqlite_profile import init_sqlite_profile
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
-    app.config.from_object(Config())
+    app.config.from_object(get_config())
+    if config:
+        app.config.update(config)
 
     # Extensiones base
     db.init_app(app)
+    init_sqlite_profile(app, db)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     jwt.init_app(app)
 
     # Orígenes QUEMADOS (idénticos para CORS HTTP y WS)
     ORIGINS = ["https://cbid.click", "https://www.cbid.click"]
+    # El navegador cachea el preflight (Chromium recorta a 7200 s)
+    PREFLIGHT_MAX_AGE = app.config.get("CORS_MAX_AGE", 7200)
 
     # CORS HTTP para /api/* y también para /socket.io/* (preflight del WS)
     cors.init_app(
@@ -28,14 +39,17 @@ def create_app():
             r"/api/*": {
                 "origins": ORIGINS,
                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization"],
+                "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+                "expose_headers": ["Idempotent-Replayed"],
                 "supports_credentials": True,
+                "max_age": PREFLIGHT_MAX_AGE,
             },
             r"/socket.io/*": {
                 "origins": ORIGINS,
                 "methods": ["GET", "POST", "OPTIONS"],
                 "allow_headers": ["Content-Type", "Authorization"],
                 "supports_credentials": True,
+                "max_age": PREFLIGHT_MAX_AGE,
             },
         },
     )
@@ -53,10 +67,11 @@ def create_app():
         if request.method == "OPTIONS" and (
             request.path.startswith("/api/") or request.path.startswith("/socket.io/")
         ):
+            metrics.mark("preflight")
             resp = current_app.make_default_options_response()
             origin = request.headers.get("Origin", "")
             req_hdrs = request.headers.get(
-                "Access-Control-Request-Headers", "Authorization, Content-Type"
+                "Access-Control-Request-Headers", "Authorization, Content-Type, Idempotency-Key"
             )
             if origin in ORIGINS:
                 resp.headers["Access-Control-Allow-Origin"] = origin
@@ -64,14 +79,38 @@ def create_app():
                 resp.headers["Access-Control-Allow-Credentials"] = "true"
                 resp.headers["Access-Control-Allow-Methods"] = "GET,POST,PUT,DELETE,OPTIONS"
                 resp.headers["Access-Control-Allow-Headers"] = req_hdrs
+                resp.headers["Access-Control-Max-Age"] = str(PREFLIGHT_MAX_AGE)
             return resp
 
     register_blueprints(app)
+    # gzip para JSON (no afecta SSE ni /media)
+    init_compression(app)
 
     @app.get("/api/health")
     def health():
         return api_ok(True)
 
+    @app.get("/api/metrics")
+    def edge_metrics():
+        # Solo administradores, salvo METRICS_PUBLIC (bind interno, no expuesto)
+        if not current_app.config.get("METRICS_PUBLIC"):
+            verify_jwt_in_request()
+            try:
+                user = db.session.get(User, int(get_jwt_identity()))
+            except (TypeError, ValueError):
+                user = None
+            if not user or user.role != "admin":
+                return api_error("Solo administradores.", 403)
+        return api_ok({
+            "bidArchive": archive.stats(),
+            "compression": compress_stats(),
+            "drain": drain.stats(),
+            "endingSoon": ending_soon.stats(),
+            "facets": facets.stats(),
+            "preflightPerMinute": metrics.per_minute("preflight"),
+            **metrics.snapshot(),
+        })
+
     # Mensajes JWT claros (evita 500 opacos)
     @jwt.unauthorized_loader
     def jwt_missing(reason):
@@ -85,10 +124,22 @@ def create_app():
     def jwt_expired(h, d):
         return api_error("Token expirado.", 401)
 
-    # Jobs
+    # Contención persistente en la BD: el cliente puede reintentar
+    @app.errorhandler(TransactionConflict)
+    def tx_conflict(e):
+        resp, status = api_error("Servidor ocupado, reintente en unos segundos.", 503)
+        resp.headers["Retry-After"] = "1"
+        return resp, status
+
+    # Jobs: el scheduler arranca al servir (primera petición o conexión /rt, o
+    # post_worker_init en gunicorn), nunca desde la CLI; el líder se elige por lock
     scheduler.init_app(app)
     schedule_jobs(scheduler, app)
-    scheduler.start()
+
+    @app.before_request
+    def _lazy_scheduler():
+        if not scheduler.running:
+            start_scheduler(scheduler, app)
 
     # Namespaces/handlers de Socket.IO
     register_socketio(socketio)
@@ -0,0 +1,182 @@
+# app/archive.py
+"""Archivo en frío de las pujas de lotes cerrados hace más de
+BID_ARCHIVE_AFTER_DAYS días.
+
+El job (líder, cada BID_ARCHIVE_INTERVAL_SECONDS, hasta
+BID_ARCHIVE_MAX_PER_RUN lotes) mueve de `bids` a `bids_archive` las pujas
+no ganadoras, ARCHIVE_CHUNK lotes por transacción, y deja una fila por lote
+en archived_bid_summaries. La ganadora queda en `bids`: winner_bid_id, el
+precio final y los máximos agrupados no cambian. list_bids y my_history
+suman lo archivado (has_archived / archived_columns).
+
+`flask archive-bids` vacía la cola a mano; `flask restore-bids` devuelve las
+pujas de unos lotes a `bids` (y los saca del job)."""
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import load_only
+from .extensions import db
+from .models import ArchivedBidSummary, Bid, BidArchive, Vehicle
+from .retry import transactional
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+ARCHIVE_CHUNK = 100  # lotes por transacción
+_COLUMNS = ("id", "vehicle_id", "bidder_id", "amount", "created_at", "updated_at")
+
+_STATE = {"lastRunAt": None, "lastRun": None, "lagSeconds": None, "vehicles": 0, "bids": 0}
+
+def _cutoff(app, now=None):
+    return (now or datetime.utcnow()) - timedelta(days=app.config.get("BID_ARCHIVE_AFTER_DAYS", 90))
+
+def _pending(cutoff):
+    """Lotes cerrados antes del corte y sin fila de resumen (los más viejos primero)."""
+    return (
+        db.session.query(Vehicle.id, Vehicle.auction_end_at)
+        .outerjoin(ArchivedBidSummary, ArchivedBidSummary.vehicle_id == Vehicle.id)
+        .filter(
+            Vehicle.status == "closed",
+            Vehicle.auction_end_at <= cutoff,
+            ArchivedBidSummary.vehicle_id.is_(None),
+        )
+        .order_by(Vehicle.auction_end_at, Vehicle.id)
+    )
+
+@transactional("archive_bids")
+def _archive_chunk(ids):
+    """Mueve las pujas perdedoras de un grupo de lotes. Devuelve (lotes, pujas)."""
+    lots = dict(
+        db.session.query(Vehicle.id, Vehicle.winner_bid_id)
+        .filter(Vehicle.id.in_(ids), Vehicle.status == "closed")
+        .with_for_update()
+        .all()
+    )
+    # Sin ganadora no hay pujas (el cierre elige la más alta): solo el resumen
+    winners = {vid: wid for vid, wid in lots.items() if wid is not None}
+    moved, summary = 0, {}
+    if winners:
+        moving = Bid.vehicle_id.in_(list(winners)) & Bid.id.notin_(list(winners.values()))
+        summary = {row.vehicle_id: row for row in db.session.execute(
+            select(
+                Bid.vehicle_id,
+                func.count(Bid.id).label("n"),
+                func.count(func.distinct(Bid.bidder_id)).label("bidders"),
+                func.max(Bid.amount).label("top"),
+                func.min(Bid.created_at).label("first"),
+                func.max(Bid.created_at).label("last"),
+            ).where(moving).group_by(Bid.vehicle_id)
+        )}
+        moved = db.session.execute(insert(BidArchive).from_select(
+            list(_COLUMNS), select(*(getattr(Bid, c) for c in _COLUMNS)).where(moving)
+        )).rowcount
+        db.session.execute(delete(Bid).where(moving).execution_options(synchronize_session=False))
+    now = datetime.utcnow()
+    for vid in lots:
+        row = summary.get(vid)
+        db.session.add(ArchivedBidSummary(
+            vehicle_id=vid,
+            bid_count=row.n if row else 0,
+            bidder_count=row.bidders if row else 0,
+            top_amount=row.top if row else None,
+            first_bid_at=row.first if row else None,
+            last_bid_at=row.last if row else None,
+            archived_at=now,
+        ))
+    db.session.commit()
+    return len(lots), moved
+
+def _lag_seconds(cutoff):
+    """Cuánto hace que el lote pendiente más viejo debió archivarse (0 = al día)."""
+    oldest = _pending(cutoff).with_entities(func.min(Vehicle.auction_end_at)).scalar()
+    return round((cutoff - oldest).total_seconds()) if oldest else 0
+
+def archive_closed_bids(app=None, now=None, limit=None):
+    """Una pasada del archivo (con contexto de app y sesión limpia). Devuelve las pujas movidas."""
+    if app is None:
+        app = current_app._get_current_object()
+    if limit is None:
+        limit = app.config.get("BID_ARCHIVE_MAX_PER_RUN", 5000)
+    with app.app_context():
+        try:
+            cutoff = _cutoff(app, now)
+            q = _pending(cutoff)
+            if limit:
+                q = q.limit(limit)
+            ids = [vid for vid, _ in q.all()]
+            db.session.rollback()
+            started = time.perf_counter()
+            vehicles = bids = 0
+            for i in range(0, len(ids), ARCHIVE_CHUNK):
+                t0 = time.perf_counter()
+                n, moved = _archive_chunk(ids[i:i + ARCHIVE_CHUNK])
+                metrics.observe("archive.chunk_ms", (time.perf_counter() - t0) * 1000)
+                metrics.incr("archive.vehicles", n)
+                metrics.incr("archive.bids", moved)
+                vehicles += n
+                bids += moved
+            elapsed = time.perf_counter() - started
+            _STATE["lagSeconds"] = _lag_seconds(cutoff)
+            db.session.rollback()
+            _STATE["vehicles"] += vehicles
+            _STATE["bids"] += bids
+            _STATE["lastRunAt"] = datetime.utcnow().isoformat() + "Z"
+            _STATE["lastRun"] = {
+                "vehicles": vehicles,
+                "bids": bids,
+                "seconds": round(elapsed, 3),
+                "bidsPerSecond": round(bids / elapsed, 1) if elapsed else 0,
+            }
+            if vehicles:
+                log.info("Archivo de pujas: %s lotes, %s pujas en %.1fs", vehicles, bids, elapsed)
+            return bids
+        finally:
+            db.session.remove()
+
+@transactional("restore_bids")
+def _restore_chunk(ids):
+    moving = BidArchive.vehicle_id.in_(ids)
+    restored = db.session.execute(insert(Bid).from_select(
+        list(_COLUMNS), select(*(getattr(BidArchive, c) for c in _COLUMNS)).where(moving)
+    )).rowcount
+    db.session.execute(delete(BidArchive).where(moving).execution_options(synchronize_session=False))
+    # La fila queda (bid_count 0): el job no vuelve a archivar el lote
+    db.session.execute(
+        update(ArchivedBidSummary)
+        .where(ArchivedBidSummary.vehicle_id.in_(ids))
+        .values(bid_count=0, restored_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return restored
+
+def restore(vehicle_ids):
+    """Devuelve a `bids` las pujas archivadas de esos lotes. Devuelve cuántas."""
+    ids = list(vehicle_ids)
+    total = 0
+    for i in range(0, len(ids), ARCHIVE_CHUNK):
+        total += _restore_chunk(ids[i:i + ARCHIVE_CHUNK])
+    metrics.incr("archive.restored", total)
+    return total
+
+def has_archived(vehicle_id):
+    """¿El lote tiene pujas en el archivo? (búsqueda por PK del resumen)"""
+    summary = db.session.get(ArchivedBidSummary, vehicle_id)
+    return bool(summary and summary.bid_count)
+
+def archived_columns(columns):
+    """Las mismas columnas con las de `bids` cambiadas por las de `bids_archive`."""
+    return [getattr(BidArchive, c.key) if c.class_ is Bid else c for c in columns]
+
+def archived_bids(vehicle_id, columns):
+    return (
+        BidArchive.query
+        .options(load_only(*archived_columns(columns)))
+        .filter(BidArchive.vehicle_id == vehicle_id)
+        .all()
+    )
+
+def stats():
+    return dict(_STATE)
@@ -0,0 +1,60 @@
+# app/bid_summary.py
+"""Reconstrucción de user_vehicle_bid_summary desde `bids` y `bids_archive`
+(datos previos a la tabla, o para corregirla). Trabaja por rangos de
+vehicle_id: borra el resumen del rango y lo vuelve a calcular con un
+INSERT ... SELECT agrupado, una transacción por rango."""
+from sqlalchemy import bindparam, delete, func, insert, literal, select, union_all, update
+from .extensions import db
+from .models import Bid, BidArchive, UserVehicleBidSummary
+
+def _rebuild(lo, hi):
+    table = UserVehicleBidSummary.__table__
+    in_range = Bid.vehicle_id.between(lo, hi)
+    db.session.execute(delete(table).where(table.c.vehicle_id.between(lo, hi)))
+    # Pujas vivas y archivadas (la más alta de cada lote siempre queda en `bids`)
+    source = union_all(*(
+        select(t.bidder_id, t.vehicle_id, t.amount, t.id, t.created_at).where(t.vehicle_id.between(lo, hi))
+        for t in (Bid, BidArchive)
+    )).subquery()
+    grouped = (
+        select(source.c.bidder_id, source.c.vehicle_id, func.max(source.c.amount), func.count(source.c.id),
+               func.max(source.c.created_at), literal(False))
+        .group_by(source.c.bidder_id, source.c.vehicle_id)
+    )
+    inserted = db.session.execute(insert(table).from_select(
+        ["user_id", "vehicle_id", "max_amount", "bid_count", "last_bid_at", "is_leading"], grouped
+    )).rowcount
+    # Líder de cada lote: quien hizo la puja más alta (montos distintos por el incremento mínimo)
+    top = (
+        select(Bid.vehicle_id, func.max(Bid.amount).label("top"))
+        .where(in_range).group_by(Bid.vehicle_id).subquery()
+    )
+    leaders = db.session.execute(
+        select(Bid.vehicle_id, Bid.bidder_id)
+        .join(top, (top.c.vehicle_id == Bid.vehicle_id) & (top.c.top == Bid.amount))
+    ).all()
+    if leaders:
+        db.session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam("uid"), table.c.vehicle_id == bindparam("vid"))
+            .values(is_leading=True),
+            [{"uid": uid, "vid": vid} for vid, uid in leaders],
+        )
+    db.session.commit()
+    return inserted
+
+def backfill(batch_size=5000, first_vid=None, echo=None):
+    """Recalcula el resumen de los lotes con pujas (desde `first_vid`). Devuelve las filas escritas."""
+    echo = echo or (lambda *_: None)
+    q = db.session.query(func.min(Bid.vehicle_id), func.max(Bid.vehicle_id))
+    if first_vid is not None:
+        q = q.filter(Bid.vehicle_id >= first_vid)
+    lo, hi = q.one()
+    db.session.rollback()
+    if lo is None:
+        return 0
+    total = 0
+    for start in range(lo, hi + 1, batch_size):
+        total += _rebuild(start, min(start + batch_size - 1, hi))
+        echo(f"resumen de pujas: lotes hasta {min(start + batch_size - 1, hi)}/{hi} ({total} filas)")
+    return total
@@ -0,0 +1,100 @@
+# app/changefeed.py
+"""Secuencia global de cambios de `Vehicle` para sincronización delta del catálogo.
+
+Los valores salen del autoincremental de `change_log`, así que dos
+transacciones no se esperan entre sí. A cambio, una puede confirmar su seq
+después de que otra con un seq mayor ya sea visible. Para que el feed no
+salte ese seq para siempre, cada transacción que reserva deja antes una
+marca "en curso" (fila de change_log con committed=False, confirmada aparte
+y visible para todos) que pasa a committed=True en su mismo commit. El feed
+publica solo por debajo de la marca en curso más baja, tarde lo que tarde
+el commit; un rollback borra su marca, y las de procesos caídos se ignoran
+pasados CHANGES_INFLIGHT_TIMEOUT_SECONDS.
+
+Con SQLite hay un solo escritor: los commits no se cruzan y no hace falta
+la marca (además la conexión aparte esperaría al propio escritor)."""
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, update
+from sqlalchemy.orm import Session
+from .extensions import db
+from .models import ChangeLog
+
+log = logging.getLogger(__name__)
+
+MARKERS = "change_markers"  # clave en session.info: marcas de la transacción actual
+
+def _mark_in_flight():
+    """Abre la marca "en curso" de la transacción (una sola por transacción)."""
+    if db.engine.dialect.name == "sqlite" or db.session.info.get(MARKERS):
+        return
+    # Commit propio: visible antes que cualquier seq que esta transacción reserve
+    with db.engine.begin() as conn:
+        marker = conn.execute(insert(ChangeLog).values(committed=False)).inserted_primary_key[0]
+    db.session.info[MARKERS] = [marker]
+    # Se cierra en el mismo commit que publica los seqs
+    db.session.execute(update(ChangeLog).where(ChangeLog.id == marker).values(committed=True))
+
+@event.listens_for(Session, "after_commit")
+def _markers_closed(session):
+    session.info.pop(MARKERS, None)
+
+@event.listens_for(Session, "after_rollback")
+def _markers_abandoned(session):
+    markers = session.info.pop(MARKERS, None)
+    if not markers:
+        return
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(delete(ChangeLog).where(ChangeLog.id.in_(markers)))
+    except Exception:
+        # Queda en curso hasta CHANGES_INFLIGHT_TIMEOUT_SECONDS
+        log.exception("No se pudo borrar la marca de cambios %s", markers)
+
+def allocate(n: int = 1) -> list:
+    """Reserva `n` valores crecientes (no necesariamente consecutivos)."""
+    _mark_in_flight()
+    rows = [ChangeLog() for _ in range(n)]
+    db.session.add_all(rows)
+    db.session.flush()
+    return [row.id for row in rows]
+
+def stamp(*vehicles):
+    """Asigna un `change_seq` nuevo a cada vehículo modificado (llamar justo antes del commit)."""
+    if not vehicles:
+        return
+    for v, seq in zip(vehicles, allocate(len(vehicles))):
+        v.change_seq = seq
+
+def visible_seq() -> int:
+    """Mayor seq que ya no puede quedar detrás de un commit en curso."""
+    stale = datetime.utcnow() - timedelta(
+        seconds=current_app.config.get("CHANGES_INFLIGHT_TIMEOUT_SECONDS", 600)
+    )
+    pending = (
+        db.session.query(func.min(ChangeLog.id))
+        .filter(ChangeLog.committed.is_(False), ChangeLog.created_at > stale)
+        .scalar()
+    )
+    if pending is not None:
+        return pending - 1
+    return db.session.query(func.max(ChangeLog.id)).scalar() or 0
+
+def prune(app=None):
+    """Borra filas viejas del log (siempre queda la última). Job periódico."""
+    if app is None:
+        app = current_app._get_current_object()
+    with app.app_context():
+        try:
+            last = db.session.query(func.max(ChangeLog.id)).scalar()
+            if last is None:
+                return 0
+            cutoff = datetime.utcnow() - timedelta(hours=app.config.get("CHANGE_LOG_RETENTION_HOURS", 24))
+            deleted = ChangeLog.query.filter(ChangeLog.created_at < cutoff, ChangeLog.id < last).delete(
+                synchronize_session=False
+            )
+            db.session.commit()
+            return deleted
+        finally:
+            db.session.remove()
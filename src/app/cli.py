@@ -4,6 +4,10 @@ from flask import current_app
 from .extensions import db
 from .models import User, Vehicle
 from .config import Config
+from .importer import FORMATS, detect_format, import_vehicles
+from .synthetic import generate
+from .bid_summary import backfill
+from .archive import archive_closed_bids, restore
 
 def register_cli(app):
     @app.cli.command("seed")
@@ -51,3 +55,71 @@ def register_cli(app):
 
             db.session.commit()
             click.echo("Seed listo.")
+
+    @app.cli.command("import-vehicles")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--seller", "seller_email", required=True, help="Email del vendedor dueño de los lotes.")
+    @click.option("--format", "fmt", type=click.Choice(FORMATS), default=None,
+                  help="csv o ndjson (por defecto según la extensión).")
+    def import_vehicles_cmd(path, seller_email, fmt):
+        """Importa un catálogo CSV/NDJSON en lotes (errores por fila)."""
+        with app.app_context():
+            seller = User.query.filter_by(email=seller_email.strip().lower()).first()
+            if not seller:
+                raise click.ClickException(f"No existe el usuario {seller_email}.")
+            fmt = fmt or detect_format(path.rsplit(".", 1)[-1], None)
+            if not fmt:
+                raise click.ClickException("No se pudo inferir el formato; use --format.")
+            with open(path, encoding="utf-8-sig", newline="") as fh:
+                result = import_vehicles(
+                    fh, fmt, seller.id,
+                    min_inc_default=app.config.get("MIN_INCREMENT_DEFAULT", 100),
+                )
+            for err in result["errors"]:
+                click.echo(f"fila {err['row']}: {err['error']} ({err['lotCode']})", err=True)
+            click.echo(f"Importados: {result['inserted']}  Con error: {result['failed']}")
+
+    @app.cli.command("bench-seed")
+    @click.option("--users", default=1000, show_default=True)
+    @click.option("--vehicles", default=2000, show_default=True)
+    @click.option("--bids", default=50000, show_default=True)
+    @click.option("--batch-size", default=5000, show_default=True)
+    @click.option("--skew", default=1.1, show_default=True, help="Exponente Zipf (lotes calientes / pujadores frecuentes).")
+    @click.option("--closed-ratio", default=0.3, show_default=True)
+    @click.option("--seed", "rnd_seed", default=42, show_default=True)
+    def bench_seed(users, vehicles, bids, batch_size, skew, closed_ratio, rnd_seed):
+        """Genera volumen sintético (p. ej. --users 100000 --vehicles 200000 --bids 20000000)."""
+        with app.app_context():
+            summary = generate(
+                users=users, vehicles=vehicles, bids=bids, batch_size=batch_size,
+                skew=skew, closed_ratio=closed_ratio, seed=rnd_seed, echo=click.echo,
+            )
+            click.echo(
+                f"Listo: {summary['users']} usuarios, {summary['vehicles']} vehículos, "
+                f"{summary['bids']} pujas (contraseña: {summary['password']})."
+            )
+
+    @app.cli.command("backfill-bid-summary")
+    @click.option("--batch-size", default=5000, show_default=True, help="Lotes (vehicle_id) por transacción.")
+    def backfill_bid_summary(batch_size):
+        """Reconstruye user_vehicle_bid_summary desde las pujas existentes."""
+        with app.app_context():
+            rows = backfill(batch_size=batch_size, echo=click.echo)
+            click.echo(f"Listo: {rows} filas de resumen.")
+
+    @app.cli.command("archive-bids")
+    @click.option("--days", type=int, default=None, help="Antigüedad mínima del cierre (por defecto BID_ARCHIVE_AFTER_DAYS).")
+    def archive_bids(days):
+        """Archiva ya las pujas de todos los lotes cerrados antes del corte."""
+        if days is not None:
+            app.config["BID_ARCHIVE_AFTER_DAYS"] = days
+        moved = archive_closed_bids(app, limit=0)
+        click.echo(f"Listo: {moved} pujas archivadas.")
+
+    @app.cli.command("restore-bids")
+    @click.argument("vehicle_ids", nargs=-1, type=int, required=True)
+    def restore_bids(vehicle_ids):
+        """Devuelve a `bids` las pujas archivadas de los lotes indicados."""
+        with app.app_context():
+            restored = restore(vehicle_ids)
+            click.echo(f"Listo: {restored} pujas restauradas.")
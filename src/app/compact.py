@@ -0,0 +1,111 @@
+# app/compact.py
+"""Protocolo compacto opcional para /rt: msgpack binario, claves cortas y
+un solo frame por conexión y tick.
+
+El cliente lo pide al conectar (`auth: {"protocol": "compact"}` o
+`?protocol=compact`) y recibe en `connected` la tabla de códigos. Sus salas
+llevan el prefijo `c:` (`c:vehicle:1`, `c:user:7`), así las emisiones JSON
+de siempre no le llegan. Los eventos de esas salas se acumulan y, cada
+RT_COMPACT_TICK_MS, cada conexión recibe un evento `f` con un arreglo
+msgpack de [código, datos] en orden de emisión.
+
+Las respuestas directas (connected, vehicles_snapshot, resumed...) siguen en JSON."""
+import struct
+import threading
+from flask import current_app
+import msgpack
+from .extensions import socketio
+from .tracing import record_emit
+
+NAMESPACE = "/rt"
+PREFIX = "c:"
+FRAME_EVENT = "f"
+
+EVENT_CODES = {"top-updated": 1, "closed": 2, "notification": 3, "notifications": 4}
+FIELD_CODES = {
+    "vehicleId": "v", "vehicle_id": "vi", "top": "t", "bidId": "b", "seq": "s", "epoch": "e",
+    "traceId": "tr", "committedAt": "c", "ackRequested": "a", "ackToken": "k", "winnerBidId": "w",
+    "amount": "m", "type": "y", "payload": "p", "items": "i", "minutes": "mn",
+    "message": "ms",
+}
+
+SIDS = set()        # conexiones que negociaron el protocolo compacto
+_PENDING = []       # [(sala sin prefijo, evento ya empaquetado, committedAt)]
+_LOCK = threading.Lock()
+_TICKER = {"started": False}
+
+def room(name, sid):
+    return PREFIX + name if sid in SIDS else name
+
+def _shorten(value):
+    if isinstance(value, dict):
+        return {FIELD_CODES.get(k, k): _shorten(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_shorten(v) for v in value]
+    return value
+
+def encode(event, data):
+    return msgpack.packb([EVENT_CODES.get(event, event), _shorten(data)], use_bin_type=True)
+
+def _array_header(n):
+    if n < 16:
+        return bytes([0x90 | n])
+    if n < 0x10000:
+        return b"\xdc" + struct.pack(">H", n)
+    return b"\xdd" + struct.pack(">I", n)
+
+def enqueue(name, event, data):
+    """Encola un evento de la sala `name` (no-op si no hay clientes compactos)."""
+    if not SIDS:
+        return
+    packed = encode(event, data)  # una vez por evento, no por cliente
+    committed = data.get("committedAt") if isinstance(data, dict) else None
+    with _LOCK:
+        _PENDING.append((name, packed, committed))
+
+def flush():
+    """Envía lo acumulado: un frame por conexión. Devuelve cuántos frames salieron."""
+    global _PENDING
+    with _LOCK:
+        pending, _PENDING = _PENDING, []
+    if not pending:
+        return 0
+    manager = socketio.server.manager
+    members = {}        # sala -> [sid]
+    per_sid = {}        # sid -> [evento empaquetado] (orden de emisión)
+    for name, packed, _ in pending:
+        sids = members.get(name)
+        if sids is None:
+            sids = members[name] = [sid for sid, _ in manager.get_participants(NAMESPACE, PREFIX + name)]
+        for sid in sids:
+            per_sid.setdefault(sid, []).append(packed)
+    for sid, items in per_sid.items():
+        # Un arreglo msgpack es cabecera + elementos concatenados
+        frame = _array_header(len(items)) + b"".join(items)
+        socketio.emit(FRAME_EVENT, frame, to=sid, namespace=NAMESPACE)
+    for _, _, committed in pending:
+        record_emit("socketio_compact", committed)
+    return len(per_sid)
+
+def _tick(app):
+    while True:
+        socketio.sleep(app.config.get("RT_COMPACT_TICK_MS", 50) / 1000)
+        try:
+            flush()
+        except Exception:
+            app.logger.exception("Error enviando frames compactos")
+
+def register(sid):
+    """Marca la conexión como compacta y arranca el tick (una vez por proceso)."""
+    SIDS.add(sid)
+    with _LOCK:
+        if _TICKER["started"]:
+            return
+        _TICKER["started"] = True
+    socketio.start_background_task(_tick, current_app._get_current_object())
+
+def unregister(sid):
+    SIDS.discard(sid)
+
+def codes():
+    return {"events": EVENT_CODES, "fields": FIELD_CODES}
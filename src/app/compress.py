@@ -0,0 +1,87 @@
+# app/compress.py
+"""Compresión gzip de respuestas JSON en el borde de la app.
+
+Solo JSON por encima de COMPRESS_MIN_BYTES y si el cliente acepta gzip;
+nunca streams (SSE) ni archivos. En GET el cuerpo comprimido se reutiliza
+por hash del contenido: el mismo listado para muchos clientes se comprime
+una vez."""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import request
+from . import metrics
+
+_CACHE = OrderedDict()   # blake2b(cuerpo) -> gzip
+_LOCK = threading.Lock()
+
+def _cached_gzip(body, level, max_entries):
+    key = hashlib.blake2b(body, digest_size=16).digest()
+    with _LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+            metrics.incr("compress.cache_hits")
+            return hit
+    out = gzip.compress(body, compresslevel=level, mtime=0)
+    with _LOCK:
+        _CACHE[key] = out
+        while len(_CACHE) > max_entries:
+            _CACHE.popitem(last=False)
+    return out
+
+def _add_vary(resp):
+    vary = {v.strip().lower() for v in resp.headers.get("Vary", "").split(",") if v.strip()}
+    if "accept-encoding" not in vary:
+        resp.headers.add("Vary", "Accept-Encoding")
+
+def init_compression(app):
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    min_bytes = app.config.get("COMPRESS_MIN_BYTES", 1024)
+    level = app.config.get("COMPRESS_LEVEL", 6)
+    cache_entries = app.config.get("COMPRESS_CACHE_ENTRIES", 256)
+    cache_max_bytes = app.config.get("COMPRESS_CACHE_MAX_BYTES", 1024 * 1024)
+
+    @app.after_request
+    def _gzip(resp):
+        if (
+            resp.mimetype != "application/json"
+            or resp.direct_passthrough
+            or resp.is_streamed
+            or resp.status_code < 200
+            or resp.status_code in (204, 304)
+            or "Content-Encoding" in resp.headers
+        ):
+            return resp
+        _add_vary(resp)
+        if request.accept_encodings["gzip"] <= 0:
+            return resp
+        body = resp.get_data()
+        if len(body) < min_bytes:
+            return resp
+        if request.method == "GET" and len(body) <= cache_max_bytes:
+            out = _cached_gzip(body, level, cache_entries)
+        else:
+            out = gzip.compress(body, compresslevel=level, mtime=0)
+        if len(out) >= len(body):
+            return resp
+        resp.set_data(out)
+        resp.headers["Content-Encoding"] = "gzip"
+        metrics.incr("compress.responses")
+        metrics.incr("compress.bytes_in", len(body))
+        metrics.incr("compress.bytes_out", len(out))
+        return resp
+
+def stats():
+    c = metrics.snapshot()["counters"]
+    bytes_in = c.get("compress.bytes_in", 0)
+    bytes_out = c.get("compress.bytes_out", 0)
+    return {
+        "responses": c.get("compress.responses", 0),
+        "cacheHits": c.get("compress.cache_hits", 0),
+        "bytesIn": bytes_in,
+        "bytesOut": bytes_out,
+        "bytesSaved": bytes_in - bytes_out,
+    }
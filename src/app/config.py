@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from datetime import timedelta
 
@@ -21,9 +22,100 @@ class Config:
 
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-change-me")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=12)
+    # Solo para endpoints que lo permiten explícitamente (SSE: EventSource no envía cabeceras)
+    JWT_QUERY_STRING_NAME = "token"
 
     BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "10"))
 
     CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")]
+    CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "7200"))
+
+    # gzip de respuestas JSON
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+    COMPRESS_CACHE_ENTRIES = int(os.getenv("COMPRESS_CACHE_ENTRIES", "256"))
 
     MIN_INCREMENT_DEFAULT = int(os.getenv("MIN_INCREMENT_DEFAULT", "100"))
+
+    # Jobs en segundo plano: arranque perezoso al servir y un solo proceso líder
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+    LEADER_LOCK_NAME = os.getenv("LEADER_LOCK_NAME", "carbid:jobs")
+    LEADER_LOCK_FILE = os.getenv("LEADER_LOCK_FILE", os.path.join(tempfile.gettempdir(), "carbid-jobs.lock"))
+    LEADER_HEARTBEAT_SECONDS = int(os.getenv("LEADER_HEARTBEAT_SECONDS", "5"))
+
+    # Recordatorios de cierre (minutos antes de auction_end_at)
+    REMINDER_HORIZONS_MINUTES = [int(m) for m in os.getenv("REMINDER_HORIZONS_MINUTES", "60,10").split(",")]
+
+    # Fotos subidas: disco local, variantes generadas en segundo plano
+    MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "media"))
+    MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(15 * 1024 * 1024)))
+    MEDIA_MAX_FILES = int(os.getenv("MEDIA_MAX_FILES", "12"))
+    MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))
+    # Detrás de nginx: delega la lectura del archivo con X-Sendfile
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "0") == "1"
+
+    # Idempotency-Key en pujas y alta de vehículos ("memory" o "db" con varios workers)
+    IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+
+    # Reintentos ante deadlock / lock wait timeout (@transactional)
+    TX_RETRY_ATTEMPTS = int(os.getenv("TX_RETRY_ATTEMPTS", "4"))
+    TX_RETRY_BASE_DELAY = float(os.getenv("TX_RETRY_BASE_DELAY", "0.05"))
+    TX_RETRY_MAX_DELAY = float(os.getenv("TX_RETRY_MAX_DELAY", "1.0"))
+    TX_RETRY_BUDGET = int(os.getenv("TX_RETRY_BUDGET", "6"))  # reintentos por petición
+
+    # /api/metrics sin JWT de admin: solo si el puerto no sale a internet
+    METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "0") == "1"
+
+    # Fracción de eventos top-updated que piden ack al cliente (latencia commit → ack)
+    TRACE_ACK_SAMPLE_RATE = float(os.getenv("TRACE_ACK_SAMPLE_RATE", "0"))
+
+    # Protocolo compacto de /rt (opt-in): un frame por conexión cada tick
+    RT_COMPACT_TICK_MS = int(os.getenv("RT_COMPACT_TICK_MS", "50"))
+
+    # Índice en memoria "cierra pronto": verificación contra la BD. Es por
+    # worker y solo ve los eventos que emite su proceso: precios, altas y
+    # cierres hechos en otro worker pueden tardar hasta esto en aparecer
+    ENDING_SOON_VERIFY_SECONDS = int(os.getenv("ENDING_SOON_VERIFY_SECONDS", "300"))
+    # Índice de facetas del catálogo: verificación contra la BD (mismo
+    # atraso por worker; solo alimenta los conteos de /vehicles/facets)
+    FACETS_VERIFY_SECONDS = int(os.getenv("FACETS_VERIFY_SECONDS", "300"))
+
+    # Archivo en frío de pujas de lotes cerrados (job del líder)
+    BID_ARCHIVE_ENABLED = os.getenv("BID_ARCHIVE_ENABLED", "1") == "1"
+    BID_ARCHIVE_AFTER_DAYS = int(os.getenv("BID_ARCHIVE_AFTER_DAYS", "90"))
+    BID_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("BID_ARCHIVE_INTERVAL_SECONDS", "3600"))
+    BID_ARCHIVE_MAX_PER_RUN = int(os.getenv("BID_ARCHIVE_MAX_PER_RUN", "5000"))  # lotes por pasada
+
+    # Feed de cambios: marcas "en curso" de procesos caídos que se dejan de
+    # esperar (debe superar la transacción más larga) y retención del log
+    CHANGES_INFLIGHT_TIMEOUT_SECONDS = int(os.getenv("CHANGES_INFLIGHT_TIMEOUT_SECONDS", "600"))
+    CHANGE_LOG_RETENTION_HOURS = int(os.getenv("CHANGE_LOG_RETENTION_HOURS", "24"))
+
+    # Drenado al reiniciar: señal, ventana de cierre y pista de reconexión al azar
+    DRAIN_SIGNAL = os.getenv("DRAIN_SIGNAL", "SIGTERM")
+    DRAIN_WINDOW_SECONDS = float(os.getenv("DRAIN_WINDOW_SECONDS", "20"))
+    DRAIN_RECONNECT_MIN_MS = int(os.getenv("DRAIN_RECONNECT_MIN_MS", "1000"))
+    DRAIN_RECONNECT_MAX_MS = int(os.getenv("DRAIN_RECONNECT_MAX_MS", "15000"))
+
+class SQLiteConfig(Config):
+    """Perfil embebido sin MySQL (DB_PROFILE=sqlite): WAL, un escritor y lectores en pool."""
+    DB_PROFILE = "sqlite"
+    SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "carbid.sqlite"))
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{SQLITE_PATH}"
+    SQLITE_READERS = int(os.getenv("SQLITE_READERS", "8"))
+    SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": SQLITE_READERS, "max_overflow": 0, "pool_timeout": 30}
+    # Una sola conexión de escritura: el pool serializa las transacciones
+    SQLALCHEMY_BINDS = {
+        "writer": {"url": SQLALCHEMY_DATABASE_URI, "pool_size": 1, "max_overflow": 0, "pool_timeout": 30},
+    }
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+
+def get_config():
+    return SQLiteConfig() if os.getenv("DB_PROFILE") == "sqlite" else Config()
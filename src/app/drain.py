@@ -0,0 +1,110 @@
+# app/drain.py
+"""Drenado escalonado de conexiones largas (SSE y Socket.IO) al reiniciar.
+
+Con DRAIN_SIGNAL (SIGTERM por defecto, la que gunicorn manda a los workers
+al reiniciar; el handler se instala en gunicorn.conf.py) el proceso:
+- deja de aceptar streams nuevos: SSE responde 503 con Retry-After y /rt
+  rechaza la conexión con la misma pista;
+- cierra las conexiones abiertas de a una, repartidas en
+  DRAIN_WINDOW_SECONDS. Antes de cerrar, cada cliente recibe `reconnect`
+  con `retryAfterMs` al azar entre DRAIN_RECONNECT_MIN_MS y
+  DRAIN_RECONNECT_MAX_MS (en SSE también como `retry:`, que EventSource
+  respeta);
+- sigue con el apagado normal de gunicorn, que espera a que terminen
+  (graceful_timeout debe cubrir la ventana).
+
+Así los clientes vuelven escalonados y no todos en el mismo segundo."""
+import logging
+import random
+import signal
+import time
+from flask import current_app
+from .extensions import socketio
+from . import metrics, sse
+from .utils import api_error
+
+log = logging.getLogger(__name__)
+
+NAMESPACE = "/rt"
+EVENT = "reconnect"
+
+_STATE = {"draining": False, "startedAt": None, "total": 0, "closed": 0}
+
+def is_draining():
+    return _STATE["draining"]
+
+def reconnect_hint(config=None):
+    config = config if config is not None else current_app.config
+    lo = config.get("DRAIN_RECONNECT_MIN_MS", 1000)
+    hi = max(lo, config.get("DRAIN_RECONNECT_MAX_MS", 15000))
+    return {"reason": "draining", "retryAfterMs": random.randint(lo, hi)}
+
+def refuse_stream():
+    """Respuesta para un stream SSE nuevo durante el drenado."""
+    hint = reconnect_hint()
+    resp, status = api_error("Servidor reiniciando; reconectar más tarde.", 503, **hint)
+    resp.headers["Retry-After"] = str(max(1, round(hint["retryAfterMs"] / 1000)))
+    return resp, status
+
+def _targets():
+    subs = [("sse", sub) for sub in list(sse.SUBSCRIBERS)]
+    sids = []
+    server = socketio.server
+    if server is not None:
+        sids = [("rt", sid) for sid, _ in server.manager.get_participants(NAMESPACE, None)]
+    targets = subs + sids
+    random.shuffle(targets)
+    return targets
+
+def _close(kind, target, hint):
+    if kind == "sse":
+        sse.close_stream(target, EVENT, hint, retry_ms=hint["retryAfterMs"])
+    else:
+        socketio.emit(EVENT, hint, to=target, namespace=NAMESPACE)
+        socketio.server.disconnect(target, namespace=NAMESPACE)
+
+def _run(app, window):
+    targets = _targets()
+    _STATE["total"] = len(targets)
+    log.warning("Drenando %s conexiones en %ss", len(targets), window)
+    step = window / len(targets) if targets else 0
+    started = time.monotonic()
+    for i, (kind, target) in enumerate(targets):
+        wait = started + i * step - time.monotonic()
+        if wait > 0:
+            socketio.sleep(wait)
+        try:
+            _close(kind, target, reconnect_hint(app.config))
+        except Exception:
+            log.exception("Error cerrando conexión durante el drenado")
+        _STATE["closed"] += 1
+        metrics.mark("drain.closed")
+    log.warning("Drenado completo: %s conexiones en %.1fs", len(targets), time.monotonic() - started)
+
+def start(app, window=None):
+    """Entra en modo drenado (una sola vez) y reparte los cierres en segundo plano."""
+    if _STATE["draining"]:
+        return None
+    _STATE.update(draining=True, startedAt=time.time(), total=0, closed=0)
+    if window is None:
+        window = app.config.get("DRAIN_WINDOW_SECONDS", 20)
+    return socketio.start_background_task(_run, app, window)
+
+def install_signal_handler(app):
+    """Encadena el drenado al handler actual de DRAIN_SIGNAL (el de gunicorn)."""
+    signum = getattr(signal, app.config.get("DRAIN_SIGNAL", "SIGTERM"))
+    previous = signal.getsignal(signum)
+
+    def _handler(sig, frame):
+        start(app)
+        if callable(previous):
+            previous(sig, frame)
+
+    signal.signal(signum, _handler)
+
+def reset():
+    """Sale del modo drenado (pruebas y benchmarks; en producción el proceso termina)."""
+    _STATE.update(draining=False, startedAt=None)
+
+def stats():
+    return {k: _STATE[k] for k in ("draining", "startedAt", "total", "closed")}
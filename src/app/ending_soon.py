@@ -0,0 +1,111 @@
+# app/ending_soon.py
+"""Índice en memoria de subastas activas ordenadas por `auction_end_at`
+(rail "cierra pronto": GET /api/vehicles/ending-soon).
+
+Lista ordenada de (fin, id) más un dict id -> entrada: la consulta es una
+bisección al instante actual y un corte de k elementos, O(log n + k) y sin
+BD. Se arma al arrancar (job de verificación) o con la primera consulta, y
+se mantiene con los eventos: alta de vehículo, `top-updated` y `closed`
+(vía broadcast_vehicle). Es local al proceso, como el seq de realtime:
+con varios workers, lo que emite otro proceso (precio nuevo, alta, cierre)
+se ve recién en la próxima verificación.
+
+Cada ENDING_SOON_VERIFY_SECONDS se compara con la BD: las diferencias se
+cuentan en `ending_soon.drift` y el índice se reemplaza por lo leído
+(construcción, verificación e invalidación: ver memindex)."""
+import bisect
+from datetime import datetime
+from sqlalchemy import func
+from .extensions import db
+from .memindex import MemoryIndex
+from .models import Bid, Vehicle
+
+_KEYS = []      # [(auction_end_at, vehicle_id)] ordenada
+_ITEMS = {}     # vehicle_id -> (auction_end_at, entrada JSON)
+
+def _entry(vid, make, model, year, lot_code, base_price, min_increment, end_at, top):
+    return {
+        "id": vid,
+        "make": make,
+        "model": model,
+        "year": year,
+        "lotCode": lot_code,
+        "basePrice": base_price,
+        "currentPrice": max(base_price, top or 0),
+        "minIncrement": min_increment,
+        "endsAt": end_at.isoformat() + "Z",
+    }
+
+def _load():
+    """{id: (fin, entrada)} de todos los lotes activos, en una consulta."""
+    top = (
+        db.session.query(Bid.vehicle_id, func.max(Bid.amount).label("top"))
+        .join(Vehicle, Vehicle.id == Bid.vehicle_id)
+        .filter(Vehicle.status == "active")
+        .group_by(Bid.vehicle_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(
+            Vehicle.id, Vehicle.make, Vehicle.model, Vehicle.year, Vehicle.lot_code,
+            Vehicle.base_price, Vehicle.min_increment, Vehicle.auction_end_at, top.c.top,
+        )
+        .outerjoin(top, top.c.vehicle_id == Vehicle.id)
+        .filter(Vehicle.status == "active")
+        .all()
+    )
+    return {r[0]: (r[7], _entry(*r)) for r in rows}
+
+def _install(items):
+    global _KEYS, _ITEMS
+    drift = sum(1 for vid in _ITEMS.keys() | items.keys() if _ITEMS.get(vid) != items.get(vid))
+    _ITEMS = items
+    _KEYS = sorted((end, vid) for vid, (end, _) in items.items())
+    return drift
+
+_INDEX = MemoryIndex("ending_soon", "ending-soon", _load, _install, lambda: len(_KEYS))
+build, verify, invalidate, stats = _INDEX.build, _INDEX.verify, _INDEX.invalidate, _INDEX.stats
+
+def _put(vid, end_at, entry):
+    old = _ITEMS.get(vid)
+    if old is not None:
+        del _KEYS[bisect.bisect_left(_KEYS, (old[0], vid))]
+    bisect.insort(_KEYS, (end_at, vid))
+    _ITEMS[vid] = (end_at, entry)
+
+def add_vehicle(v):
+    """Alta (después del commit)."""
+    entry = _entry(v.id, v.make, v.model, v.year, v.lot_code, v.base_price,
+                   v.min_increment, v.auction_end_at, None)
+    with _INDEX.lock:
+        _INDEX.touch()
+        if _INDEX.built and v.status == "active":
+            _put(v.id, v.auction_end_at, entry)
+
+def remove(vehicle_id):
+    with _INDEX.lock:
+        _INDEX.touch()
+        old = _ITEMS.pop(vehicle_id, None)
+        if old is not None:
+            del _KEYS[bisect.bisect_left(_KEYS, (old[0], vehicle_id))]
+
+def on_event(vehicle_id, event, payload):
+    """Eventos de broadcast_vehicle: precio nuevo o cierre."""
+    if event == "closed":
+        remove(vehicle_id)
+    elif event == "top-updated":
+        with _INDEX.lock:
+            _INDEX.touch()
+            current = _ITEMS.get(vehicle_id)
+            if current is not None and payload.get("top") is not None:
+                end_at, entry = current
+                if payload["top"] > entry["currentPrice"]:
+                    _ITEMS[vehicle_id] = (end_at, {**entry, "currentPrice": payload["top"]})
+
+def soonest(limit, now=None):
+    """Los `limit` lotes activos que cierran primero desde `now`."""
+    _INDEX.ensure()
+    now = now or datetime.utcnow()
+    with _INDEX.lock:
+        i = bisect.bisect_left(_KEYS, (now,))
+        return [_ITEMS[vid][1] for _, vid in _KEYS[i:i + limit]]
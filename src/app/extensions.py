@@ -5,8 +5,9 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_apscheduler import APScheduler
 from flask_socketio import SocketIO
+from .sqlite_profile import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 bcrypt = Bcrypt()
 jwt = JWTManager()
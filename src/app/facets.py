@@ -0,0 +1,225 @@
+# app/facets.py
+"""Índice de facetas del catálogo (lotes activos): marca, modelo, década y
+banda de precio actual.
+
+Por faceta, valor -> conjunto de ids; además una lista ordenada de
+(precio actual, id) para rangos de precio. Se mantiene como el índice
+"cierra pronto" (ver memindex): alta de vehículo, `top-updated` (puede
+cambiar de banda) y `closed`, con verificación periódica contra la BD
+(FACETS_VERIFY_SECONDS).
+
+Es local al proceso y puede atrasarse hasta la próxima verificación, así
+que solo sirve los conteos aproximados de GET /api/vehicles/facets (cada
+faceta aplica los demás filtros, no el propio, para que el panel muestre
+las alternativas). Los filtros de `list_vehicles` (make, model, year,
+decade, price_band, min_price, max_price) van en SQL: `sql_filter`."""
+import bisect
+from collections import Counter
+from sqlalchemy import func, or_, select
+from .extensions import db
+from .memindex import MemoryIndex
+from .models import Bid, Vehicle
+
+# Límites inferiores de las bandas de precio; la última es abierta
+PRICE_BANDS = (0, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+FACETS = ("make", "model", "decade", "priceBand")
+# Filtro -> faceta a la que pertenece (no se aplica al contar esa faceta)
+FILTER_GROUPS = {
+    "make": "make", "model": "model", "year": "decade", "decade": "decade",
+    "price_band": "priceBand", "min_price": "priceBand", "max_price": "priceBand",
+}
+INT_FILTERS = ("year", "decade", "price_band", "min_price", "max_price")
+MAX_VALUES = 50  # valores por faceta en la respuesta (los más frecuentes)
+
+_ATTRS = {}     # vehicle_id -> {"make", "model", "year", "decade", "priceBand", "price"}
+_POSTINGS = {name: {} for name in (*FACETS, "year")}
+_PRICES = []    # [(precio actual, vehicle_id)] ordenada
+
+class FacetFilterError(ValueError):
+    pass
+
+def band_of(price):
+    return PRICE_BANDS[bisect.bisect_right(PRICE_BANDS, price) - 1]
+
+def _attrs(make, model, year, price):
+    return {"make": make, "model": model, "year": year, "decade": year // 10 * 10,
+            "priceBand": band_of(price), "price": price}
+
+def _load():
+    top = (
+        db.session.query(Bid.vehicle_id, func.max(Bid.amount).label("top"))
+        .join(Vehicle, Vehicle.id == Bid.vehicle_id)
+        .filter(Vehicle.status == "active")
+        .group_by(Bid.vehicle_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(Vehicle.id, Vehicle.make, Vehicle.model, Vehicle.year, Vehicle.base_price, top.c.top)
+        .outerjoin(top, top.c.vehicle_id == Vehicle.id)
+        .filter(Vehicle.status == "active")
+        .all()
+    )
+    return {vid: _attrs(make, model, year, max(base, top or 0)) for vid, make, model, year, base, top in rows}
+
+def _index(vid, attrs):
+    for name, postings in _POSTINGS.items():
+        postings.setdefault(attrs[name], set()).add(vid)
+    bisect.insort(_PRICES, (attrs["price"], vid))
+    _ATTRS[vid] = attrs
+
+def _unindex(vid):
+    attrs = _ATTRS.pop(vid, None)
+    if attrs is None:
+        return None
+    for name, postings in _POSTINGS.items():
+        ids = postings[attrs[name]]
+        ids.discard(vid)
+        if not ids:
+            del postings[attrs[name]]
+    del _PRICES[bisect.bisect_left(_PRICES, (attrs["price"], vid))]
+    return attrs
+
+def _install(items):
+    global _ATTRS, _POSTINGS, _PRICES
+    postings = {name: {} for name in _POSTINGS}
+    for vid, attrs in items.items():
+        for name, values in postings.items():
+            values.setdefault(attrs[name], set()).add(vid)
+    drift = sum(1 for vid in _ATTRS.keys() | items.keys() if _ATTRS.get(vid) != items.get(vid))
+    _ATTRS, _POSTINGS = items, postings
+    _PRICES = sorted((attrs["price"], vid) for vid, attrs in items.items())
+    return drift
+
+_INDEX = MemoryIndex("facets", "de facetas", _load, _install, lambda: len(_ATTRS))
+build, verify, invalidate, stats = _INDEX.build, _INDEX.verify, _INDEX.invalidate, _INDEX.stats
+
+def add_vehicle(v):
+    with _INDEX.lock:
+        _INDEX.touch()
+        if _INDEX.built and v.status == "active" and v.id not in _ATTRS:
+            _index(v.id, _attrs(v.make, v.model, v.year, v.base_price))
+
+def on_event(vehicle_id, event, payload):
+    """Eventos de broadcast_vehicle: precio nuevo (quizá otra banda) o cierre."""
+    if event not in ("closed", "top-updated"):
+        return
+    with _INDEX.lock:
+        _INDEX.touch()
+        if event == "closed":
+            _unindex(vehicle_id)
+            return
+        attrs = _ATTRS.get(vehicle_id)
+        top = payload.get("top")
+        if attrs is not None and top is not None and top > attrs["price"]:
+            _unindex(vehicle_id)
+            _index(vehicle_id, _attrs(attrs["make"], attrs["model"], attrs["year"], top))
+
+def parse_filters(args):
+    """Filtros presentes en la query string (enteros validados)."""
+    filters = {}
+    for name in FILTER_GROUPS:
+        raw = args.get(name)
+        if raw is None or raw == "":
+            continue
+        if name in INT_FILTERS:
+            try:
+                filters[name] = int(raw)
+            except ValueError:
+                raise FacetFilterError(f"{name} debe ser entero.")
+            if name == "price_band" and filters[name] not in PRICE_BANDS:
+                raise FacetFilterError(f"price_band debe ser uno de {', '.join(map(str, PRICE_BANDS))}.")
+        else:
+            filters[name] = raw
+    return filters
+
+def _match(filters):
+    """Ids que cumplen `filters` (None = sin filtros). Llamar con el lock tomado."""
+    sets = []
+    for name, key in (("make", "make"), ("model", "model"), ("year", "year"),
+                      ("decade", "decade"), ("price_band", "priceBand")):
+        if name in filters:
+            sets.append(_POSTINGS[key].get(filters[name], set()))
+    ranged = "min_price" in filters or "max_price" in filters
+    if ranged:
+        lo_price = filters.get("min_price", float("-inf"))
+        hi_price = filters.get("max_price", float("inf"))
+        lo = bisect.bisect_left(_PRICES, (lo_price,))
+        hi = bisect.bisect_right(_PRICES, (hi_price, float("inf")))
+        # El rango solo se materializa si es el conjunto más chico
+        if not sets or hi - lo < min(map(len, sets)):
+            sets.append({vid for _, vid in _PRICES[lo:hi]})
+            ranged = False
+    if not sets:
+        return None
+    sets.sort(key=len)
+    result = set(sets[0])
+    for s in sets[1:]:
+        result &= s
+        if not result:
+            break
+    if ranged:
+        result = {vid for vid in result if lo_price <= _ATTRS[vid]["price"] <= hi_price}
+    return result
+
+def _values(name, counts):
+    if name in ("decade", "priceBand"):
+        items = sorted(counts.items())
+    else:
+        items = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:MAX_VALUES]
+    out = []
+    for value, count in items:
+        entry = {"value": value, "count": count}
+        if name == "priceBand":
+            i = PRICE_BANDS.index(value)
+            entry["max"] = PRICE_BANDS[i + 1] if i + 1 < len(PRICE_BANDS) else None
+        out.append(entry)
+    return out
+
+def counts(filters):
+    """{"total", "facets"} para la combinación de filtros actual."""
+    _INDEX.ensure()
+    result = {}
+    with _INDEX.lock:
+        matched = _match(filters)
+        total = len(_ATTRS) if matched is None else len(matched)
+        for name in FACETS:
+            others = {k: v for k, v in filters.items() if FILTER_GROUPS[k] != name}
+            base = matched if len(others) == len(filters) else _match(others)
+            if base is None:
+                tally = {value: len(ids) for value, ids in _POSTINGS[name].items()}
+            else:
+                tally = Counter(_ATTRS[vid][name] for vid in base)
+            result[name] = _values(name, tally)
+    return {"total": total, "facets": result}
+
+def sql_filter(q, filters):
+    """Los mismos filtros en SQL (listado de lotes, exacto en cualquier estado)."""
+    if "make" in filters:
+        q = q.filter(Vehicle.make == filters["make"])
+    if "model" in filters:
+        q = q.filter(Vehicle.model == filters["model"])
+    if "year" in filters:
+        q = q.filter(Vehicle.year == filters["year"])
+    if "decade" in filters:
+        q = q.filter(Vehicle.year.between(filters["decade"], filters["decade"] + 9))
+    lo, hi = filters.get("min_price"), filters.get("max_price")
+    if "price_band" in filters:
+        i = PRICE_BANDS.index(filters["price_band"])
+        lo = max(lo or 0, PRICE_BANDS[i])
+        if i + 1 < len(PRICE_BANDS):
+            hi = min(hi, PRICE_BANDS[i + 1] - 1) if hi is not None else PRICE_BANDS[i + 1] - 1
+    if lo is not None or hi is not None:
+        # MAX correlacionado: una búsqueda en ix_bids_vehicle_id por lote que ya
+        # pasó los demás filtros, no un GROUP BY de toda la tabla bids
+        top = (
+            select(func.max(Bid.amount))
+            .where(Bid.vehicle_id == Vehicle.id)
+            .correlate(Vehicle)
+            .scalar_subquery()
+        )
+        # Precio actual = max(base, top), partido para no repetir la subconsulta
+        if lo is not None:
+            q = q.filter(or_(Vehicle.base_price >= lo, top >= lo))
+        if hi is not None:
+            q = q.filter(Vehicle.base_price <= hi, func.coalesce(top, 0) <= hi)
+    return q
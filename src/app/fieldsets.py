@@ -0,0 +1,52 @@
+# app/fieldsets.py
+"""`?fields=a,b,c`: representaciones parciales.
+
+Cada representación declara, por campo JSON, las columnas ORM que necesita.
+Los campos pedidos deciden tanto el SELECT (`load_only` o columnas sueltas)
+como la salida; un campo no pedido no se lee de la BD ni se serializa.
+Sin `fields` se devuelve la representación completa, como siempre."""
+from flask import request
+
+class FieldsetError(ValueError):
+    pass
+
+class Fieldset:
+    """Campos pedidos; `names=None` = todos."""
+
+    def __init__(self, names=None, exclude=frozenset()):
+        self.names = names
+        self.exclude = exclude
+
+    def __contains__(self, name):
+        return name not in self.exclude and (self.names is None or name in self.names)
+
+    def any(self, *names):
+        return any(name in self for name in names)
+
+    def without(self, *names):
+        return Fieldset(self.names, self.exclude | frozenset(names))
+
+    def columns(self, spec, *always):
+        """Columnas (sin repetir) que necesitan los campos pedidos de `spec`."""
+        cols = {id(c): c for c in always}
+        for name, needed in spec.items():
+            if name in self:
+                cols.update((id(c), c) for c in needed)
+        return list(cols.values())
+
+    def pick(self, values, *args):
+        """Arma la salida solo con los campos pedidos (en el orden de `values`)."""
+        return {name: fn(*args) for name, fn in values.items() if name in self}
+
+ALL = Fieldset()
+
+def parse_fields(spec):
+    """Lee `?fields=`; lanza FieldsetError si hay campos desconocidos."""
+    raw = request.args.get("fields")
+    if not raw:
+        return ALL
+    names = frozenset(f.strip() for f in raw.split(",") if f.strip())
+    unknown = sorted(names - set(spec))
+    if unknown:
+        raise FieldsetError(f"Campos desconocidos: {', '.join(unknown)}.")
+    return Fieldset(names)
@@ -0,0 +1,228 @@
+# app/idempotency.py
+"""Cabecera Idempotency-Key para POST que crean filas (pujas, vehículos).
+
+La primera petición con una clave ejecuta la vista y guarda su respuesta;
+las repeticiones la reciben tal cual (`Idempotent-Replayed: true`) sin
+volver a tomar locks ni emitir eventos. Si el duplicado llega mientras la
+original sigue en curso, espera a que termine en lugar de ejecutarse.
+
+Backends (IDEMPOTENCY_BACKEND):
+- "memory": diccionario acotado con TTL, por proceso (1 worker).
+- "db": tabla `idempotency_keys`, compartida entre procesos."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from .extensions import db, socketio
+from .models import IdempotencyKey
+from .utils import api_error
+from .sqlite_profile import write_engine
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# Respuestas que no se guardan: el cliente debe poder reintentar
+RETRYABLE_STATUS = (409, 429)
+# Cabeceras que se recalculan al responder
+_SKIP_HEADERS = {"content-length", "date", "set-cookie"}
+
+class _Entry:
+    __slots__ = ("fingerprint", "expires", "response", "done")
+
+    def __init__(self, fingerprint, expires):
+        self.fingerprint = fingerprint
+        self.expires = expires
+        self.response = None
+        self.done = threading.Event()
+
+class MemoryStore:
+    """Claves en orden de llegada (= orden de vencimiento, el TTL es fijo)."""
+
+    def __init__(self, ttl_seconds, max_keys):
+        self.ttl = ttl_seconds
+        self.max_keys = max_keys
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        while self._items:
+            key, entry = next(iter(self._items.items()))
+            if entry.expires > now and len(self._items) <= self.max_keys:
+                break
+            self._items.popitem(last=False)
+            entry.done.set()
+
+    def claim(self, key, fingerprint, wait_seconds):
+        """("owner" | "replay" | "mismatch" | "busy", respuesta guardada)."""
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                self._purge(now)
+                entry = self._items.get(key)
+                if entry is None:
+                    self._items[key] = _Entry(fingerprint, now + self.ttl)
+                    return "owner", None
+            if entry.fingerprint != fingerprint:
+                return "mismatch", None
+            if entry.response is not None:
+                return "replay", entry.response
+            remaining = deadline - now
+            if remaining <= 0 or not entry.done.wait(remaining):
+                return "busy", None
+            # Terminó: o dejó respuesta o liberó la clave (se vuelve a intentar)
+
+    def complete(self, key, response):
+        with self._lock:
+            entry = self._items.get(key)
+        if entry is not None:
+            entry.response = response
+            entry.done.set()
+
+    def release(self, key):
+        with self._lock:
+            entry = self._items.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+class DatabaseStore:
+    """Misma semántica sobre `idempotency_keys`; la fila con status NULL es el
+    lock de la petición en curso. Usa conexiones propias, fuera de la sesión
+    de la vista (el decorador cierra antes la transacción de la vista)."""
+
+    POLL_SECONDS = 0.05
+
+    def __init__(self, ttl_seconds):
+        self.ttl = ttl_seconds
+
+    def claim(self, key, fingerprint, wait_seconds):
+        table = IdempotencyKey.__table__
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            now = datetime.utcnow()
+            try:
+                with write_engine(db).begin() as conn:
+                    conn.execute(insert(table).values(
+                        key=key, fingerprint=fingerprint, created_at=now,
+                        expires_at=now + timedelta(seconds=self.ttl),
+                    ))
+                return "owner", None
+            except IntegrityError:
+                pass
+            with write_engine(db).begin() as conn:
+                row = conn.execute(select(table).where(table.c.key == key)).first()
+                if row is not None and row.expires_at <= now:
+                    conn.execute(delete(table).where(table.c.key == key, table.c.expires_at <= now))
+                    continue
+            if row is None:
+                continue
+            if row.fingerprint != fingerprint:
+                return "mismatch", None
+            if row.status_code is not None:
+                return "replay", {"status": row.status_code, "headers": row.headers or [], "body": row.body or b""}
+            if time.monotonic() >= deadline:
+                return "busy", None
+            # Cede al loop (gevent/eventlet) en lugar de bloquear el worker
+            socketio.sleep(self.POLL_SECONDS)
+
+    def complete(self, key, response):
+        table = IdempotencyKey.__table__
+        with write_engine(db).begin() as conn:
+            conn.execute(update(table).where(table.c.key == key).values(
+                status_code=response["status"], headers=response["headers"], body=response["body"],
+            ))
+
+    def release(self, key):
+        table = IdempotencyKey.__table__
+        with write_engine(db).begin() as conn:
+            conn.execute(delete(table).where(table.c.key == key))
+
+def purge_expired(app=None):
+    """Borra claves vencidas del backend "db" (job periódico)."""
+    if app is None:
+        app = current_app._get_current_object()
+    if app.config.get("IDEMPOTENCY_BACKEND") != "db":
+        return 0
+    with app.app_context():
+        table = IdempotencyKey.__table__
+        with write_engine(db).begin() as conn:
+            return conn.execute(delete(table).where(table.c.expires_at <= datetime.utcnow())).rowcount
+
+def get_store(app):
+    store = app.extensions.get("idempotency")
+    if store is None:
+        ttl = app.config.get("IDEMPOTENCY_TTL_SECONDS", 86400)
+        if app.config.get("IDEMPOTENCY_BACKEND") == "db":
+            store = DatabaseStore(ttl)
+        else:
+            store = MemoryStore(ttl, app.config.get("IDEMPOTENCY_MAX_KEYS", 10000))
+        app.extensions["idempotency"] = store
+    return store
+
+def _sha256(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+def _freeze(resp):
+    return {
+        "status": resp.status_code,
+        "headers": [[k, v] for k, v in resp.headers.items() if k.lower() not in _SKIP_HEADERS],
+        "body": resp.get_data(),
+    }
+
+def _replay(stored):
+    resp = make_response(stored["body"], stored["status"])
+    resp.headers.clear()
+    for k, v in stored["headers"]:
+        resp.headers.add(k, v)
+    resp.headers["Idempotent-Replayed"] = "true"
+    return resp
+
+def _end_transaction():
+    """Cierra la transacción que la vista dejó abierta (p. ej. un 400 tras el
+    SELECT ... FOR UPDATE): libera sus locks y, con el perfil sqlite, la única
+    conexión de escritura que el store usa a continuación."""
+    db.session.rollback()
+
+def idempotent(view):
+    """Decorador para vistas con @jwt_required(): la clave es por usuario."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        raw = request.headers.get(HEADER)
+        if not raw:
+            return view(*args, **kwargs)
+        if len(raw) > MAX_KEY_LENGTH:
+            return api_error(f"{HEADER} demasiado larga.", 400)
+
+        key = _sha256(get_jwt_identity(), request.method, request.path, raw)
+        fingerprint = _sha256(request.query_string, request.get_data(cache=True))
+        store = get_store(current_app)
+        state, stored = store.claim(key, fingerprint, current_app.config.get("IDEMPOTENCY_WAIT_SECONDS", 10))
+        if state == "replay":
+            return _replay(stored)
+        if state == "mismatch":
+            return api_error(f"{HEADER} ya usada con otra petición.", 422)
+        if state == "busy":
+            return api_error(f"Hay una petición en curso con esta {HEADER}.", 409)
+
+        try:
+            resp = make_response(view(*args, **kwargs))
+        except Exception:
+            _end_transaction()
+            store.release(key)
+            raise
+        _end_transaction()
+        if resp.status_code >= 500 or resp.status_code in RETRYABLE_STATUS:
+            store.release(key)
+        else:
+            store.complete(key, _freeze(resp))
+        return resp
+    return wrapper
@@ -0,0 +1,183 @@
+# app/importer.py
+"""Importación masiva de vehículos (CSV o NDJSON) por lotes.
+
+Las filas se validan a medida que se leen; cada lote hace una sola consulta
+de `lot_code` existentes y un INSERT executemany por tabla."""
+import csv
+import json
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from .extensions import db
+from .models import Vehicle, VehicleImage, Watchlist
+from .changefeed import allocate
+
+FORMATS = ("csv", "ndjson")
+BATCH_SIZE = 500
+
+def detect_format(explicit, content_type):
+    fmt = (explicit or "").lower()
+    fmt = {"jsonl": "ndjson"}.get(fmt, fmt)
+    if fmt in FORMATS:
+        return fmt
+    ct = (content_type or "").lower()
+    if "csv" in ct:
+        return "csv"
+    if "ndjson" in ct or "jsonl" in ct or "json-seq" in ct:
+        return "ndjson"
+    return None
+
+def iter_records(lines, fmt):
+    """Genera (nº de fila, dict | None, error | None) sin cargar el archivo completo."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for i, rec in enumerate(reader, start=1):
+            yield i, rec, None
+        return
+    for i, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            yield i, None, "JSON inválido."
+            continue
+        if not isinstance(rec, dict):
+            yield i, None, "Cada línea debe ser un objeto JSON."
+            continue
+        yield i, rec, None
+
+def _to_int(value, default=None):
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def validate_record(rec, seller_id, min_inc_default):
+    """Misma validación que `create_vehicle`; devuelve (fila para INSERT, error)."""
+    def s(key):
+        return str(rec.get(key) or "").strip()
+
+    make, model, lot_code = s("make"), s("model"), s("lot_code")
+    year = _to_int(rec.get("year"), 0)
+    base_price = _to_int(rec.get("base_price"), 0)
+    min_increment = _to_int(rec.get("min_increment"), min_inc_default)
+    if not all([make, model, lot_code]) or year is None or year < 1886 or not base_price or base_price <= 0:
+        return None, "Datos incompletos o inválidos."
+    if min_increment is None or min_increment <= 0:
+        return None, "min_increment inválido."
+    if len(lot_code) > 20:
+        return None, "lot_code demasiado largo."
+
+    images = rec.get("images") or []
+    if isinstance(images, str):
+        # En CSV: URLs separadas por "|"
+        images = [u.strip() for u in images.split("|") if u.strip()]
+    if not isinstance(images, list):
+        return None, "images debe ser un arreglo de URLs."
+
+    row = {
+        "seller_id": seller_id,
+        "make": make,
+        "model": model,
+        "year": year,
+        "base_price": base_price,
+        "lot_code": lot_code,
+        "images": images,
+        "description": s("description"),
+        "min_increment": min_increment,
+        "status": s("status") or "active",
+    }
+    ends = s("auction_end_at")
+    if ends:
+        try:
+            row["auction_end_at"] = datetime.fromisoformat(ends.rstrip("Z"))
+        except ValueError:
+            return None, "auction_end_at inválido (ISO 8601)."
+    return row, None
+
+def _existing_lot_codes(codes):
+    if not codes:
+        return set()
+    rows = db.session.query(Vehicle.lot_code).filter(Vehicle.lot_code.in_(codes)).all()
+    return {r[0] for r in rows}
+
+def is_lot_code_conflict(exc):
+    """¿El IntegrityError viene del índice único de lot_code (y no de otra restricción)?"""
+    msg = str(getattr(exc, "orig", exc))
+    # MySQL: "Duplicate entry ... for key 'ix_vehicles_lot_code'"; SQLite: "... vehicles.lot_code"
+    return "ix_vehicles_lot_code" in msg or "vehicles.lot_code" in msg
+
+def _flush_batch(batch, errors, attempts=3):
+    """Inserta un lote; los lot_code ya existentes se reportan por fila."""
+    for _ in range(attempts):
+        taken = _existing_lot_codes([row["lot_code"] for _, row in batch])
+        for n, row in batch:
+            if row["lot_code"] in taken:
+                errors.append({"row": n, "lotCode": row["lot_code"], "error": "El código de lote ya existe."})
+        batch = [(n, row) for n, row in batch if row["lot_code"] not in taken]
+        if not batch:
+            return 0
+        try:
+            for (_, row), seq in zip(batch, allocate(len(batch))):
+                row["change_seq"] = seq
+            images = {row["lot_code"]: row["images"] for _, row in batch}
+            db.session.execute(insert(Vehicle), [
+                {k: v for k, v in row.items() if k != "images"} for _, row in batch
+            ])
+            # El vendedor sigue sus lotes (agenda), igual que en create_vehicle
+            created = db.session.query(
+                Vehicle.id, Vehicle.lot_code, Vehicle.auction_end_at, Vehicle.seller_id
+            ).filter(Vehicle.lot_code.in_(list(images))).all()
+            db.session.execute(insert(Watchlist), [
+                {"user_id": seller, "vehicle_id": vid, "auction_end_at": ends}
+                for vid, _, ends, seller in created
+            ])
+            media = [
+                {"vehicle_id": vid, "position": pos, "url": url}
+                for vid, code, _, _ in created
+                for pos, url in enumerate(images[code])
+            ]
+            if media:
+                db.session.execute(insert(VehicleImage), media)
+            db.session.commit()
+            return len(batch)
+        except IntegrityError as e:
+            db.session.rollback()
+            if not is_lot_code_conflict(e):
+                for n, row in batch:
+                    errors.append({"row": n, "lotCode": row["lot_code"], "error": "No se pudo insertar la fila."})
+                return 0
+            # Otro import insertó el mismo lote entre la consulta y el INSERT:
+            # la próxima vuelta lo encuentra y lo reporta por fila
+    for n, row in batch:
+        errors.append({"row": n, "lotCode": row["lot_code"],
+                       "error": "Conflicto con otra importación en curso; reintente la fila."})
+    return 0
+
+def import_vehicles(lines, fmt, seller_id, min_inc_default=100, batch_size=BATCH_SIZE):
+    """Importa en lotes de `batch_size`; devuelve el resumen con errores por fila."""
+    errors = []
+    inserted = 0
+    batch = []
+    seen = set()
+    for n, rec, err in iter_records(lines, fmt):
+        if err is None:
+            row, err = validate_record(rec, seller_id, min_inc_default)
+        if err is None and row["lot_code"] in seen:
+            err = "lot_code duplicado en el archivo."
+        if err is not None:
+            errors.append({"row": n, "lotCode": (rec or {}).get("lot_code"), "error": err})
+            continue
+        seen.add(row["lot_code"])
+        batch.append((n, row))
+        if len(batch) >= batch_size:
+            inserted += _flush_batch(batch, errors)
+            batch = []
+    if batch:
+        inserted += _flush_batch(batch, errors)
+    errors.sort(key=lambda e: e["row"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
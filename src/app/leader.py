@@ -0,0 +1,129 @@
+# app/leader.py
+import fcntl
+import os
+from sqlalchemy import text
+from .extensions import db
+
+class _MySQLLock:
+    """Lock consultivo de MySQL (GET_LOCK) atado a una conexión dedicada.
+    Si el proceso muere, MySQL libera el lock al cerrarse la conexión."""
+
+    def __init__(self, engine, name):
+        self.engine = engine
+        self.name = name
+        self.conn = None
+
+    def acquire(self) -> bool:
+        try:
+            if self.conn is None:
+                self.conn = self.engine.connect()
+            got = self.conn.execute(text("SELECT GET_LOCK(:n, 0)"), {"n": self.name}).scalar()
+            self.conn.commit()
+            return got == 1
+        except Exception:
+            self._drop()
+            return False
+
+    def held(self) -> bool:
+        if self.conn is None:
+            return False
+        try:
+            mine = self.conn.execute(
+                text("SELECT IS_USED_LOCK(:n) = CONNECTION_ID()"), {"n": self.name}
+            ).scalar()
+            self.conn.commit()
+            return mine == 1
+        except Exception:
+            self._drop()
+            return False
+
+    def release(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(text("SELECT RELEASE_LOCK(:n)"), {"n": self.name})
+            self.conn.commit()
+        except Exception:
+            pass
+        self._drop()
+
+    def _drop(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        self.conn = None
+
+class _FileLock:
+    """Sustituto para SQLite/desarrollo: flock exclusivo sobre un archivo.
+    El kernel lo libera si el proceso termina."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fh = None
+
+    def acquire(self) -> bool:
+        if self.fh is not None:
+            return True
+        fh = open(self.path, "a+")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(os.getpid()))
+        fh.flush()
+        self.fh = fh
+        return True
+
+    def held(self) -> bool:
+        return self.fh is not None
+
+    def release(self):
+        if self.fh is None:
+            return
+        try:
+            fcntl.flock(self.fh.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.fh.close()
+            self.fh = None
+
+class LeaderElector:
+    """Elige un único proceso líder para los jobs en segundo plano.
+
+    Cada proceso llama a `heartbeat()` periódicamente: el líder verifica que
+    sigue teniendo el lock y los demás intentan tomarlo (sin esperar)."""
+
+    def __init__(self):
+        self._lock = None
+        self.is_leader = False
+
+    def _make_lock(self, app):
+        engine = db.engine
+        if engine.dialect.name == "mysql":
+            return _MySQLLock(engine, app.config["LEADER_LOCK_NAME"])
+        return _FileLock(app.config["LEADER_LOCK_FILE"])
+
+    def heartbeat(self, app) -> bool:
+        with app.app_context():
+            if self._lock is None:
+                self._lock = self._make_lock(app)
+            if self.is_leader and not self._lock.held():
+                app.logger.warning("Liderazgo de jobs perdido (pid %s)", os.getpid())
+                self.is_leader = False
+            if not self.is_leader:
+                self.is_leader = self._lock.acquire()
+                if self.is_leader:
+                    app.logger.info("Proceso %s es líder de jobs", os.getpid())
+        return self.is_leader
+
+    def release(self):
+        if self._lock is not None:
+            self._lock.release()
+        self._lock = None
+        self.is_leader = False
+
+leader = LeaderElector()
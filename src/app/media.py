@@ -0,0 +1,154 @@
+# app/media.py
+"""Fotos subidas: originales en disco local y variantes pre-dimensionadas.
+
+Cada archivo se guarda por el SHA-256 de su contenido (MEDIA_ROOT/ab/<hash>/),
+así una URL nunca cambia de contenido y se puede servir como inmutable.
+Las variantes (`thumb`, `medium`) se generan una sola vez en un pool de
+workers; bajo gevent el redimensionado corre en hilos nativos y la
+escritura en la BD vuelve a un greenlet."""
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .extensions import db
+from .models import VehicleImage
+from .changefeed import stamp
+
+log = logging.getLogger(__name__)
+
+# Caja máxima (px) de cada variante; se conserva la proporción y no se amplía
+VARIANTS = {"thumb": 320, "medium": 1024}
+VARIANT_QUALITY = 82
+TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+FILE_NAMES = {f"original.{ext}" for ext in TYPES} | {f"{name}.jpg" for name in VARIANTS}
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+URL_PREFIX = "/media"
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def sniff(head: bytes):
+    """Extensión según los bytes mágicos; None si no es JPEG/PNG/WebP."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def blob_dir(root, digest):
+    return os.path.join(root, digest[:2], digest)
+
+def media_url(digest, name):
+    return f"{URL_PREFIX}/{digest}/{name}"
+
+def _write_once(path, data):
+    """Escritura atómica; si el archivo ya existe (mismo hash) no se toca."""
+    if os.path.exists(path):
+        return
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+def store_original(root, data: bytes):
+    """Guarda el original; devuelve (hash, extensión). ValueError si no es imagen."""
+    ext = sniff(data[:16])
+    if ext is None:
+        raise ValueError("Formato de imagen no soportado (use JPEG, PNG o WebP).")
+    digest = hashlib.sha256(data).hexdigest()
+    folder = blob_dir(root, digest)
+    os.makedirs(folder, exist_ok=True)
+    _write_once(os.path.join(folder, f"original.{ext}"), data)
+    return digest, ext
+
+def build_variants(root, digest, ext):
+    """Genera las variantes JPEG que falten; devuelve {"thumb": {"url", "w", "h"}, ...}.
+
+    Solo CPU y disco: se puede ejecutar en un hilo nativo."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        log.warning("Pillow no está instalado: se sirven solo los originales.")
+        return {}
+
+    folder = blob_dir(root, digest)
+    out = {}
+    with Image.open(os.path.join(folder, f"original.{ext}")) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode != "RGB":
+            im = im.convert("RGB")
+        for name, box in VARIANTS.items():
+            variant = im.copy()
+            variant.thumbnail((box, box), Image.LANCZOS)
+            buf = io.BytesIO()
+            variant.save(buf, "JPEG", quality=VARIANT_QUALITY, optimize=True, progressive=True)
+            _write_once(os.path.join(folder, f"{name}.jpg"), buf.getvalue())
+            out[name] = {"url": media_url(digest, f"{name}.jpg"), "w": variant.width, "h": variant.height}
+    return out
+
+def _save_variants(app, image_id, variants):
+    with app.app_context():
+        try:
+            img = db.session.get(VehicleImage, image_id)
+            if img is None:
+                return
+            img.variants = variants
+            # La portada cambia de URL: los clientes en delta-sync la ven
+            stamp(img.vehicle)
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+def _gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+def _pool(app):
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            workers = app.config.get("MEDIA_WORKERS", 2)
+            if _gevent_patched():
+                # Hilos nativos del hub: Pillow suelta el GIL y no bloquea el loop
+                from gevent.threadpool import ThreadPoolExecutor as Executor
+            else:
+                Executor = ThreadPoolExecutor
+            _POOL = Executor(max_workers=workers)
+        return _POOL
+
+def _process(app, image_id, digest, ext):
+    try:
+        _save_variants(app, image_id, build_variants(app.config["MEDIA_ROOT"], digest, ext))
+    except Exception:
+        log.exception("No se pudieron generar las variantes de la imagen %s", image_id)
+
+def schedule_variants(app, image_id, digest, ext):
+    """Encola la generación de variantes; devuelve un handle que se puede esperar."""
+    pool = _pool(app)
+    if not _gevent_patched():
+        return pool.submit(_process, app, image_id, digest, ext)
+
+    import gevent
+
+    def job():
+        try:
+            variants = pool.submit(build_variants, app.config["MEDIA_ROOT"], digest, ext).result()
+            _save_variants(app, image_id, variants)
+        except Exception:
+            log.exception("No se pudieron generar las variantes de la imagen %s", image_id)
+
+    return gevent.spawn(job)
+
+def small_url(img):
+    """URL para tarjetas del catálogo: la miniatura si ya existe, si no el original."""
+    if img is None:
+        return None
+    return ((img.variants or {}).get("thumb") or {}).get("url") or img.url
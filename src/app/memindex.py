@@ -0,0 +1,102 @@
+# app/memindex.py
+"""Ciclo de vida común de los índices en memoria por proceso (ending_soon,
+facets): construcción desde la BD, verificación periódica con conteo de
+deriva, invalidación y estadísticas.
+
+Cada módulo guarda sus propias estructuras y aporta dos funciones:
+`load()` lee la BD y devuelve los ítems; `install(items)` (con `lock`
+tomado) reemplaza las estructuras y devuelve cuántos ítems difieren de lo
+anterior. Los eventos que tocan el índice llaman `touch()` con el lock
+tomado: una construcción que se cruzó con uno se repite.
+
+Las construcciones van de a una (single-flight): con el índice frío, las
+consultas concurrentes esperan la primera en vez de leer la BD cada una."""
+import logging
+import threading
+from datetime import datetime
+from flask import current_app
+from .extensions import db
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+class MemoryIndex:
+    def __init__(self, name, label, load, install, size):
+        self.name = name      # prefijo de métricas (`{name}.drift`)
+        self.label = label    # para los logs
+        self.lock = threading.Lock()
+        self._building = threading.Lock()  # una construcción a la vez
+        self.state = {"built": False, "version": 0, "lastDrift": None, "verifiedAt": None}
+        self._load, self._install, self._size = load, install, size
+
+    @property
+    def built(self):
+        return self.state["built"]
+
+    def touch(self):
+        """Marca un cambio incremental (llamar con `lock` tomado)."""
+        self.state["version"] += 1
+
+    def _replace(self, items, version=None):
+        """Reemplaza el índice salvo que haya habido eventos desde `version`.
+        Devuelve (reemplazado, deriva); deriva None si no había índice."""
+        with self.lock:
+            if version is not None and self.state["version"] != version:
+                return False, None
+            drift = self._install(items)
+            drift = drift if self.state["built"] else None
+            self.state["built"] = True
+            return True, drift
+
+    def build(self, attempts=3):
+        """Lee la BD y reemplaza el índice. Devuelve la deriva (None si no había índice)."""
+        with self._building:
+            return self._build(attempts)
+
+    def _build(self, attempts=3):
+        for attempt in range(attempts):
+            version = self.state["version"]
+            items = self._load()
+            db.session.rollback()
+            # Con eventos constantes, el último intento se queda con lo leído
+            done, drift = self._replace(items, version if attempt < attempts - 1 else None)
+            if done:
+                return drift
+
+    def ensure(self):
+        if self.state["built"]:
+            return
+        with self._building:
+            # Quien esperaba a otra construcción ya encuentra el índice armado
+            if not self.state["built"]:
+                self._build()
+
+    def verify(self, app=None):
+        """Job periódico (en cada proceso): compara con la BD y corrige."""
+        if app is None:
+            app = current_app._get_current_object()
+        with app.app_context():
+            try:
+                drift = self.build()
+            finally:
+                db.session.remove()
+        self.state["verifiedAt"] = datetime.utcnow().isoformat() + "Z"
+        if drift:
+            metrics.incr(f"{self.name}.drift", drift)
+            log.warning("Índice %s desalineado con la BD: %s lotes", self.label, drift)
+        self.state["lastDrift"] = drift or 0
+        return drift or 0
+
+    def invalidate(self):
+        """Cambios masivos (importación): se reconstruye en la próxima consulta."""
+        with self.lock:
+            self.touch()
+            self.state["built"] = False
+
+    def stats(self):
+        return {
+            "built": self.state["built"],
+            "size": self._size(),
+            "lastDrift": self.state["lastDrift"],
+            "verifiedAt": self.state["verifiedAt"],
+        }
@@ -0,0 +1,85 @@
+# app/metrics.py
+"""Contadores en memoria del proceso, expuestos en GET /api/metrics (JWT de admin).
+
+Con varios workers cada proceso lleva los suyos (igual que los canales SSE)."""
+import threading
+import time
+from collections import deque
+
+# Minutos de historia por serie
+RATE_WINDOW_MINUTES = 15
+# Límites superiores (ms) de los buckets de histogramas; el último es +Inf
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+COUNTERS = {}
+_RATES = {}   # nombre -> deque([minuto, n])
+HISTOGRAMS = {}  # nombre -> {"buckets": [n, ...], "count": n, "sum": ms}
+_LOCK = threading.Lock()
+
+def incr(name, n=1):
+    with _LOCK:
+        COUNTERS[name] = COUNTERS.get(name, 0) + n
+
+def mark(name, n=1):
+    """Como `incr`, y además acumula en la serie por minuto."""
+    minute = int(time.time() // 60)
+    with _LOCK:
+        COUNTERS[name] = COUNTERS.get(name, 0) + n
+        series = _RATES.setdefault(name, deque(maxlen=RATE_WINDOW_MINUTES))
+        if series and series[-1][0] == minute:
+            series[-1][1] += n
+        else:
+            series.append([minute, n])
+
+def per_minute(name):
+    """[[inicio del minuto (epoch), n], ...] de los últimos minutos con actividad."""
+    with _LOCK:
+        return [[m * 60, n] for m, n in _RATES.get(name, ())]
+
+def observe(name, ms):
+    """Suma una medición (ms) al histograma `name`."""
+    i = 0
+    while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+        i += 1
+    with _LOCK:
+        h = HISTOGRAMS.get(name)
+        if h is None:
+            h = HISTOGRAMS[name] = {"buckets": [0] * (len(BUCKETS_MS) + 1), "count": 0, "sum": 0.0}
+        h["buckets"][i] += 1
+        h["count"] += 1
+        h["sum"] += ms
+
+def _quantile(h, q):
+    """Cota superior del bucket donde cae el cuantil `q`."""
+    target = q * h["count"]
+    seen = 0
+    for i, n in enumerate(h["buckets"]):
+        seen += n
+        if n and seen >= target:
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else None
+    return None
+
+def _histogram_view(h):
+    labels = [str(b) for b in BUCKETS_MS] + ["+Inf"]
+    return {
+        "count": h["count"],
+        "avgMs": round(h["sum"] / h["count"], 3) if h["count"] else 0,
+        "p50Ms": _quantile(h, 0.5),
+        "p90Ms": _quantile(h, 0.9),
+        "p99Ms": _quantile(h, 0.99),
+        "buckets": dict(zip(labels, h["buckets"])),
+    }
+
+def snapshot():
+    with _LOCK:
+        return {
+            "counters": dict(COUNTERS),
+            "perMinute": {name: [[m * 60, n] for m, n in series] for name, series in _RATES.items()},
+            "histograms": {name: _histogram_view(h) for name, h in HISTOGRAMS.items()},
+        }
+
+def reset():
+    with _LOCK:
+        COUNTERS.clear()
+        _RATES.clear()
+        HISTOGRAMS.clear()
@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from .extensions import db, bcrypt
 
 class TimestampMixin:
@@ -29,18 +31,27 @@ class Vehicle(db.Model, TimestampMixin):
     model = db.Column(db.String(80), nullable=False)
     year = db.Column(db.Integer, nullable=False)
     base_price = db.Column(db.Integer, nullable=False)
-    lot_code = db.Column(db.String(20), nullable=False)
-    images = db.Column(db.JSON, nullable=True)
-    description = db.Column(db.Text, nullable=True)
+    lot_code = db.Column(db.String(20), unique=True, index=True, nullable=False)
+    # TEXT pesado: solo se carga al accederlo (detalle), nunca en listados
+    description = db.deferred(db.Column(db.Text, nullable=True))
 
     status = db.Column(db.String(20), nullable=False, default="active")  # active|closed
     auction_start_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     auction_end_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.utcnow() + timedelta(days=7))
     min_increment = db.Column(db.Integer, nullable=False, default=100)
+    # Secuencia global de cambios (alta, puja, cierre) para sincronizar el catálogo
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, index=True)
+    # Menor horizonte de recordatorio ya enviado (minutos); NULL = ninguno
+    reminded_minutes = db.Column(db.Integer, nullable=True)
 
     # Gana una puja
     winner_bid_id = db.Column(db.Integer, db.ForeignKey("bids.id"), nullable=True)
 
+    # Cierre y recordatorios recorren (status, auction_end_at)
+    __table_args__ = (
+        db.Index("ix_vehicles_status_end", "status", "auction_end_at"),
+    )
+
     # Relaciones
     seller = db.relationship("User", foreign_keys=[seller_id])
 
@@ -53,6 +64,23 @@ class Vehicle(db.Model, TimestampMixin):
         order_by="Bid.amount.desc()",
     )
 
+    # Fotos normalizadas (la portada es position=0)
+    media = db.relationship(
+        "VehicleImage",
+        back_populates="vehicle",
+        order_by="VehicleImage.position",
+        cascade="all, delete-orphan",
+    )
+
+    @property
+    def images(self):
+        """URLs de las fotos en orden (compatibilidad con el antiguo arreglo JSON)."""
+        return [img.url for img in self.media]
+
+    @images.setter
+    def images(self, urls):
+        self.media = [VehicleImage(position=i, url=u) for i, u in enumerate(urls or [])]
+
     # Relación directa al ganador (opcional, útil para lecturas)
     winner_bid = db.relationship(
         "Bid",
@@ -61,6 +89,21 @@ class Vehicle(db.Model, TimestampMixin):
         post_update=True,   # ayuda a evitar ciclos al actualizar FKs
     )
 
+class VehicleImage(db.Model, TimestampMixin):
+    __tablename__ = "vehicle_images"
+    id = db.Column(db.Integer, primary_key=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicles.id"), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    url = db.Column(db.String(1024), nullable=False)
+    # Variantes pre-dimensionadas: {"thumb": {"url", "w", "h"}, "medium": {...}}
+    variants = db.Column(db.JSON, nullable=True)
+
+    vehicle = db.relationship("Vehicle", back_populates="media")
+
+    __table_args__ = (
+        db.Index("ix_vehicle_images_vehicle_position", "vehicle_id", "position", unique=True),
+    )
+
 class Bid(db.Model, TimestampMixin):
     __tablename__ = "bids"
     id = db.Column(db.Integer, primary_key=True)
@@ -78,3 +121,124 @@ class Notification(db.Model, TimestampMixin):
     type = db.Column(db.String(50), nullable=False)
     payload = db.Column(db.JSON, nullable=True)
     read_at = db.Column(db.DateTime, nullable=True)
+
+class Watchlist(db.Model, TimestampMixin):
+    """Lotes que sigue un usuario. `auction_end_at` se copia del vehículo para
+    que la agenda sea un solo rango sobre (user_id, auction_end_at)."""
+    __tablename__ = "watchlist"
+    # Margen para lotes vencidos que el job aún no cerró
+    GRACE = timedelta(hours=1)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicles.id"), primary_key=True, index=True)
+    auction_end_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_watchlist_user_end", "user_id", "auction_end_at", "vehicle_id"),
+    )
+
+    @staticmethod
+    def ensure(user_id, vehicle):
+        """Agrega el lote a la lista del usuario si aún no está (misma transacción).
+        Un solo INSERT que ignora la fila existente: dos peticiones a la vez del
+        mismo usuario no chocan en la PK."""
+        values = {"user_id": user_id, "vehicle_id": vehicle.id, "auction_end_at": vehicle.auction_end_at}
+        if db.engine.dialect.name == "mysql":
+            stmt = mysql_insert(Watchlist).values(**values)
+            stmt = stmt.on_duplicate_key_update(user_id=stmt.inserted.user_id)
+        else:
+            stmt = sqlite_insert(Watchlist).values(**values).on_conflict_do_nothing()
+        db.session.execute(stmt)
+
+class UserVehicleBidSummary(db.Model):
+    """Resumen por (usuario, lote) de sus pujas: lo mantiene place_bid en la
+    misma transacción (con el lote bloqueado), así "mis pujas activas" es un
+    rango sobre la PK sin recorrer `bids`. `flask backfill-bid-summary` lo
+    reconstruye desde las pujas."""
+    __tablename__ = "user_vehicle_bid_summary"
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicles.id"), primary_key=True, index=True)
+    max_amount = db.Column(db.Integer, nullable=False)
+    bid_count = db.Column(db.Integer, nullable=False, default=0)
+    last_bid_at = db.Column(db.DateTime, nullable=False)
+    # Tiene la puja más alta del lote (al cerrar: la ganadora)
+    is_leading = db.Column(db.Boolean, nullable=False, default=False)
+
+    @staticmethod
+    def record(user_id, vehicle, amount, prev_top_bidder=None):
+        """Suma una puja nueva (la más alta del lote) y quita el liderazgo al anterior."""
+        now = datetime.utcnow()
+        row = db.session.get(UserVehicleBidSummary, (user_id, vehicle.id))
+        if row is None:
+            # Primera fila del par: puede haber pujas previas al resumen (sin
+            # backfill todavía), así que se cuentan las reales, la nueva incluida
+            count, top = db.session.query(db.func.count(Bid.id), db.func.max(Bid.amount)).filter(
+                Bid.bidder_id == user_id, Bid.vehicle_id == vehicle.id
+            ).one()
+            db.session.add(UserVehicleBidSummary(
+                user_id=user_id, vehicle_id=vehicle.id, max_amount=max(top or 0, amount),
+                bid_count=max(count, 1), last_bid_at=now, is_leading=True,
+            ))
+        else:
+            row.max_amount = max(row.max_amount, amount)
+            row.bid_count += 1
+            row.last_bid_at = now
+            row.is_leading = True
+        if prev_top_bidder and prev_top_bidder != user_id:
+            db.session.query(UserVehicleBidSummary).filter_by(
+                user_id=prev_top_bidder, vehicle_id=vehicle.id
+            ).update({UserVehicleBidSummary.is_leading: False}, synchronize_session=False)
+
+class BidArchive(db.Model):
+    """Pujas de lotes cerrados hace tiempo (app/archive.py). Mismas columnas e
+    ids que `bids`; la ganadora queda en `bids` (winner_bid_id)."""
+    __tablename__ = "bids_archive"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    vehicle_id = db.Column(db.Integer, nullable=False, index=True)
+    bidder_id = db.Column(db.Integer, nullable=False, index=True)
+    amount = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    # En MySQL, páginas comprimidas: se lee poco y ocupa menos
+    __table_args__ = {"mysql_row_format": "COMPRESSED"}
+
+class ArchivedBidSummary(db.Model):
+    """Una fila por lote archivado: cuántas pujas se movieron y su rango.
+    `bid_count` 0 = nada en el archivo (sin pujas perdedoras o restaurado)."""
+    __tablename__ = "archived_bid_summaries"
+    vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicles.id"), primary_key=True)
+    bid_count = db.Column(db.Integer, nullable=False, default=0)
+    bidder_count = db.Column(db.Integer, nullable=False, default=0)
+    top_amount = db.Column(db.Integer, nullable=True)
+    first_bid_at = db.Column(db.DateTime, nullable=True)
+    last_bid_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    restored_at = db.Column(db.DateTime, nullable=True)
+
+class ChangeLog(db.Model):
+    """Fuente de la secuencia de cambios del catálogo: cada cambio inserta una
+    fila y usa su id autoincremental (sin una fila contador que quede
+    bloqueada hasta el commit). Los commits pueden llegar fuera de orden; el
+    feed solo publica hasta `changefeed.visible_seq()`, por debajo de la
+    marca en curso (committed=False) más baja."""
+    __tablename__ = "change_log"
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True, autoincrement=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    committed = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+
+    __table_args__ = (
+        db.Index("ix_change_log_committed_id", "committed", "id"),
+    )
+
+class IdempotencyKey(db.Model):
+    """Respuesta guardada por Idempotency-Key (backend "db", varios procesos).
+    `status_code` NULL = petición en curso."""
+    __tablename__ = "idempotency_keys"
+    key = db.Column(db.String(64), primary_key=True)  # sha256(usuario|método|ruta|clave)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    headers = db.Column(db.JSON, nullable=True)
+    body = db.Column(db.LargeBinary(length=16777215), nullable=True)  # MEDIUMBLOB en MySQL
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,38 @@
+# app/notify.py
+from collections import defaultdict
+from sqlalchemy import insert
+from .extensions import db, socketio
+from .models import Notification
+from .sse import publish
+from . import compact
+
+def bulk_insert_notifications(rows):
+    """Inserta [{user_id, type, payload}, ...] en un solo executemany."""
+    if rows:
+        db.session.execute(insert(Notification), rows)
+
+def notify_user(user_id, type_, payload):
+    """Notificación en vivo a `user:{uid}` por Socket.IO y SSE."""
+    data = {"type": type_, "payload": payload}
+    socketio.emit("notification", data, to=f"user:{user_id}", namespace="/rt")
+    publish(f"user:{user_id}", "notification", data)
+    compact.enqueue(f"user:{user_id}", "notification", data)
+
+def emit_notifications(rows, batch_size=200):
+    """Emite a `user:{uid}` (Socket.IO y SSE) agrupando por usuario: un frame por usuario.
+
+    Con una sola notificación se conserva el evento `notification` de siempre;
+    con varias se envía `notifications` con la lista. Cada `batch_size`
+    usuarios se cede el control para no acaparar el hub de gevent."""
+    by_user = defaultdict(list)
+    for r in rows:
+        by_user[r["user_id"]].append({"type": r["type"], "payload": r["payload"]})
+    for i, (uid, items) in enumerate(by_user.items(), start=1):
+        if len(items) == 1:
+            notify_user(uid, items[0]["type"], items[0]["payload"])
+        else:
+            socketio.emit("notifications", {"items": items}, to=f"user:{uid}", namespace="/rt")
+            publish(f"user:{uid}", "notifications", {"items": items})
+            compact.enqueue(f"user:{uid}", "notifications", {"items": items})
+        if i % batch_size == 0:
+            socketio.sleep(0)
@@ -0,0 +1,107 @@
+# app/realtime.py
+"""Eventos de tiempo real por vehículo (SSE + Socket.IO) con número de secuencia.
+
+El `seq` es local al proceso (el worker de Socket.IO es único, ver Procfile):
+cada evento de la sala `vehicle:{id}` lo incrementa y los snapshots informan
+el último emitido, así el cliente sabe desde dónde contar. Los últimos
+eventos de cada sala quedan en un buffer acotado para reponer huecos tras
+una reconexión (`resume`).
+
+Como el contador vuelve a 0 en cada arranque, eventos y snapshots llevan
+además `epoch` (id del arranque): el cliente lo devuelve con sus `lastSeq`
+y, si no coincide, recibe snapshot en vez de un replay con seqs de otro
+proceso."""
+import threading
+import uuid
+from collections import OrderedDict, deque
+from sqlalchemy import func
+from .extensions import db, socketio
+from .models import Vehicle, Bid
+from .sse import publish
+from .tracing import record_emit
+from . import compact, ending_soon, facets
+
+BUFFER_SIZE = 100    # eventos recientes por vehículo
+MAX_BUFFERS = 5000   # vehículos con buffer (se descarta el menos reciente)
+
+_SEQ = {}  # vehicle_id -> último seq emitido
+_BUFFERS = OrderedDict()  # vehicle_id -> deque[(seq, event, data)]
+_SEQ_LOCK = threading.Lock()
+EPOCH = uuid.uuid4().hex[:12]  # id de este arranque del proceso
+
+def current_seq(vehicle_id: int) -> int:
+    return _SEQ.get(vehicle_id, 0)
+
+def broadcast_vehicle(vehicle_id: int, event: str, payload: dict) -> dict:
+    """Emite a `vehicle:{id}` por SSE y Socket.IO con el siguiente `seq`."""
+    with _SEQ_LOCK:
+        seq = _SEQ.get(vehicle_id, 0) + 1
+        _SEQ[vehicle_id] = seq
+        data = {**payload, "seq": seq, "epoch": EPOCH}
+        buf = _BUFFERS.get(vehicle_id)
+        if buf is None:
+            buf = _BUFFERS[vehicle_id] = deque(maxlen=BUFFER_SIZE)
+            if len(_BUFFERS) > MAX_BUFFERS:
+                _BUFFERS.popitem(last=False)
+        else:
+            _BUFFERS.move_to_end(vehicle_id)
+        buf.append((seq, event, data))
+    publish(f"vehicle:{vehicle_id}", event, data)
+    socketio.emit(event, data, to=f"vehicle:{vehicle_id}", namespace="/rt")
+    record_emit("socketio", data.get("committedAt"))
+    compact.enqueue(f"vehicle:{vehicle_id}", event, data)
+    ending_soon.on_event(vehicle_id, event, payload)
+    facets.on_event(vehicle_id, event, payload)
+    return data
+
+def events_since(vehicle_id: int, last_seq: int, epoch=None):
+    """Eventos con seq > last_seq, o None si el hueco ya no está en el buffer
+    o el seq del cliente es de otro arranque (`epoch` distinto): toca snapshot."""
+    if epoch != EPOCH:
+        return None
+    with _SEQ_LOCK:
+        current = _SEQ.get(vehicle_id, 0)
+        if last_seq == current:
+            return []
+        if last_seq > current:
+            return None
+        buf = list(_BUFFERS.get(vehicle_id, ()))
+    if not buf or buf[0][0] > last_seq + 1:
+        return None
+    return [{"event": event, "data": data} for seq, event, data in buf if seq > last_seq]
+
+def price_rows(ids):
+    """(id, base_price, min_increment, status, auction_end_at, top) de varios lotes
+    en una sola consulta: PK de vehicles + máximo agrupado sobre ix_bids_vehicle_id."""
+    if not ids:
+        return []
+    top = (
+        db.session.query(Bid.vehicle_id, func.max(Bid.amount).label("top"))
+        .filter(Bid.vehicle_id.in_(ids))
+        .group_by(Bid.vehicle_id)
+        .subquery()
+    )
+    return (
+        db.session.query(
+            Vehicle.id, Vehicle.base_price, Vehicle.min_increment,
+            Vehicle.status, Vehicle.auction_end_at, top.c.top,
+        )
+        .outerjoin(top, top.c.vehicle_id == Vehicle.id)
+        .filter(Vehicle.id.in_(ids))
+        .all()
+    )
+
+def vehicle_snapshots(ids):
+    """Estado compacto de varios lotes en una sola consulta (máximo de pujas agrupado).
+    El seq se lee antes de consultar: una puja que entra en medio llega después
+    como evento (a lo sumo repetido), nunca queda tapada por un seq más nuevo."""
+    seqs = {vid: current_seq(vid) for vid in ids}
+    return [{
+        "id": vid,
+        "currentPrice": max(base, top_amount or 0),
+        "minIncrement": min_inc,
+        "status": status,
+        "endsAt": ends.isoformat() + "Z",
+        "seq": seqs.get(vid, 0),
+        "epoch": EPOCH,
+    } for vid, base, min_inc, status, ends, top_amount in price_rows(ids)]
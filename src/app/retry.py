@@ -0,0 +1,82 @@
+# app/retry.py
+"""Reintentos de unidades de trabajo ante lock wait timeout / deadlock.
+
+`@transactional("nombre")` vuelve a ejecutar la función completa (consultas
++ commit) si la BD aborta la transacción por contención: MySQL 1205/1213 o
+"database is locked" en SQLite. Espera con backoff exponencial y jitter
+completo usando `socketio.sleep` (cede bajo gevent). Las funciones
+decoradas no deben emitir eventos antes del commit.
+
+En una petición, todos los reintentos comparten un presupuesto
+(TX_RETRY_BUDGET); agotado, se responde 503 con Retry-After."""
+import logging
+import random
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context
+from sqlalchemy.exc import DBAPIError
+from .extensions import db, socketio
+from . import metrics
+from .sqlite_profile import mark_writer
+
+log = logging.getLogger(__name__)
+
+RETRYABLE_MYSQL_CODES = (1205, 1213)  # lock wait timeout, deadlock
+
+class TransactionConflict(Exception):
+    """Reintentos agotados por contención (se responde 503)."""
+
+    def __init__(self, name):
+        super().__init__(f"Conflicto de concurrencia en {name}")
+        self.name = name
+
+def is_retryable(exc):
+    orig = getattr(exc, "orig", None)
+    args = getattr(orig, "args", None) or ()
+    if args and args[0] in RETRYABLE_MYSQL_CODES:
+        return True
+    return "database is locked" in str(orig or exc)
+
+def _setting(key, default):
+    return current_app.config.get(key, default) if has_app_context() else default
+
+def _take_budget():
+    """True si la petición todavía puede reintentar (fuera de una petición: siempre)."""
+    if not has_request_context():
+        return True
+    left = g.get("tx_retry_budget")
+    if left is None:
+        left = _setting("TX_RETRY_BUDGET", 6)
+    if left <= 0:
+        return False
+    g.tx_retry_budget = left - 1
+    return True
+
+def backoff_delay(attempt, base, cap):
+    """Jitter completo: uniforme en [0, min(cap, base * 2^intento)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def transactional(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            attempts = _setting("TX_RETRY_ATTEMPTS", 4)
+            base = _setting("TX_RETRY_BASE_DELAY", 0.05)
+            cap = _setting("TX_RETRY_MAX_DELAY", 1.0)
+            attempt = 0
+            while True:
+                mark_writer(db.session)  # perfil SQLite: toda la unidad en el escritor
+                try:
+                    return func(*args, **kwargs)
+                except DBAPIError as e:
+                    if not is_retryable(e):
+                        raise
+                    db.session.rollback()
+                    attempt += 1
+                    if attempt >= attempts or not _take_budget():
+                        metrics.incr(f"tx.giveups.{name}")
+                        log.warning("Reintentos agotados en %s: %s", name, e.orig)
+                        raise TransactionConflict(name) from e
+                    metrics.incr(f"tx.retries.{name}")
+                    socketio.sleep(backoff_delay(attempt - 1, base, cap))
+        return wrapper
+    return decorator
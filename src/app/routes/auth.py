@@ -4,6 +4,7 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 from ..extensions import db
 from ..models import User
 from ..utils import api_error, api_ok
+from ..retry import transactional
 
 bp = Blueprint("auth", __name__)
 
@@ -68,6 +69,7 @@ def me():
 
 @bp.post("/change-password")
 @jwt_required()
+@transactional("change_password")
 def change_password():
     uid = get_jwt_identity()
     data = request.get_json() or {}
@@ -0,0 +1,23 @@
+import os
+from flask import Blueprint, abort, current_app, send_file
+from ..media import DIGEST_RE, FILE_NAMES, blob_dir
+
+bp = Blueprint("media", __name__)
+
+# El nombre del archivo incluye el hash del contenido: nunca cambia
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+@bp.get("/<digest>/<name>")
+def serve_media(digest, name):
+    """
+    Sirve originales y variantes desde MEDIA_ROOT. `send_file` usa
+    wsgi.file_wrapper (sendfile en gunicorn) o X-Sendfile si USE_X_SENDFILE.
+    """
+    if not DIGEST_RE.match(digest) or name not in FILE_NAMES:
+        abort(404)
+    path = os.path.join(blob_dir(current_app.config["MEDIA_ROOT"], digest), name)
+    if not os.path.isfile(path):
+        abort(404)
+    resp = send_file(path, conditional=True, etag=f"{digest}-{name}", max_age=31536000)
+    resp.headers["Cache-Control"] = IMMUTABLE
+    return resp
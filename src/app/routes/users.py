@@ -1,40 +1,94 @@
 # app/routes/users.py
+from datetime import datetime, timezone
 from flask import Blueprint
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func
 from ..extensions import db
-from ..models import Bid, Vehicle, Notification
-from ..utils import api_ok
+from ..models import Bid, BidArchive, Vehicle, Notification, UserVehicleBidSummary, Watchlist
+from ..utils import api_error, api_ok
+from ..fieldsets import FieldsetError, parse_fields
+from .vehicles import top_bids
+from .. import archive
 
 bp = Blueprint("users", __name__)
 
+# Campo JSON -> columnas del SELECT (pujas unidas a su vehículo)
+HISTORY_COLUMNS = {
+    "bidId": (Bid.id,),
+    "vehicleId": (Bid.vehicle_id,),
+    "make": (Vehicle.make,),
+    "model": (Vehicle.model,),
+    "amount": (Bid.amount,),
+    "topAtClose": (Bid.vehicle_id,),
+    "won": (Bid.id, Vehicle.status, Vehicle.winner_bid_id),
+    "vehicleStatus": (Vehicle.status,),
+    "bidAt": (Bid.created_at,),
+}
+_HISTORY_VALUES = {
+    "bidId": lambda r, tops: r.id,
+    "vehicleId": lambda r, tops: r.vehicle_id,
+    "make": lambda r, tops: r.make,
+    "model": lambda r, tops: r.model,
+    "amount": lambda r, tops: r.amount,
+    "topAtClose": lambda r, tops: tops.get(r.vehicle_id),
+    "won": lambda r, tops: r.status == "closed" and r.winner_bid_id == r.id,
+    "vehicleStatus": lambda r, tops: r.status,
+    "bidAt": lambda r, tops: r.created_at.isoformat() + "Z",
+}
+
+def _history_query(columns, table, uid, join):
+    """Pujas del usuario en `bids` o `bids_archive` (mismas columnas)."""
+    q = db.session.query(*columns).select_from(table)
+    if join:
+        q = q.join(Vehicle, Vehicle.id == table.vehicle_id)
+    return q.filter(table.bidder_id == uid)
+
 @bp.get("/users/me/history")
 @jwt_required()
 def my_history():
+    try:
+        fields = parse_fields(HISTORY_COLUMNS)
+    except FieldsetError as e:
+        return api_error(str(e), 400)
+    uid = int(get_jwt_identity())
+    # Filas de columnas sueltas (sin entidades): solo lo que se va a devolver;
+    # created_at e id siempre, para intercalar las pujas archivadas
+    columns = fields.columns(HISTORY_COLUMNS, Bid.id, Bid.created_at)
+    join = fields.any("make", "model", "won", "vehicleStatus")
+    rows = _history_query(columns, Bid, uid, join).order_by(Bid.created_at.desc(), Bid.id.desc()).all()
+    archived = _history_query(archive.archived_columns(columns), BidArchive, uid, join).all()
+    if archived:
+        rows = sorted(rows + archived, key=lambda r: (r.created_at, r.id), reverse=True)
+    # Máxima puja de todos los lotes en una consulta (antes, una por fila)
+    tops = top_bids(list({r.vehicle_id for r in rows})) if "topAtClose" in fields else {}
+    return api_ok([fields.pick(_HISTORY_VALUES, r, tops) for r in rows])
+
+@bp.get("/users/me/bids/active")
+@jwt_required()
+def my_active_bids():
+    """Lotes activos donde pujó el usuario: un rango sobre la PK del resumen
+    (no depende de cuántas pujas haya hecho)."""
     uid = int(get_jwt_identity())
-    bids = (
-        db.session.query(Bid, Vehicle)
-        .join(Vehicle, Vehicle.id == Bid.vehicle_id)
-        .filter(Bid.bidder_id == uid)
-        .order_by(Bid.created_at.desc())
+    S = UserVehicleBidSummary
+    rows = (
+        db.session.query(S.vehicle_id, S.max_amount, S.bid_count, S.last_bid_at, S.is_leading,
+                         Vehicle.make, Vehicle.model, Vehicle.lot_code, Vehicle.auction_end_at)
+        .join(Vehicle, Vehicle.id == S.vehicle_id)
+        .filter(S.user_id == uid, Vehicle.status == "active")
+        .order_by(Vehicle.auction_end_at.asc())
         .all()
     )
-    data = []
-    for b, v in bids:
-        top = db.session.query(func.max(Bid.amount)).filter(Bid.vehicle_id == v.id).scalar()
-        won = (v.status == "closed" and v.winner_bid_id == b.id)
-        data.append({
-            "bidId": b.id,
-            "vehicleId": v.id,
-            "make": v.make,
-            "model": v.model,
-            "amount": b.amount,
-            "topAtClose": top,
-            "won": won,
-            "vehicleStatus": v.status,
-            "bidAt": b.created_at.isoformat() + "Z",
-        })
-    return api_ok(data)
+    return api_ok([{
+        "vehicleId": r.vehicle_id,
+        "make": r.make,
+        "model": r.model,
+        "lotCode": r.lot_code,
+        "myMaxAmount": r.max_amount,
+        "bidCount": r.bid_count,
+        "lastBidAt": r.last_bid_at.isoformat() + "Z",
+        "leading": r.is_leading,
+        "endsAt": r.auction_end_at.isoformat() + "Z",
+    } for r in rows])
 
 @bp.get("/users/me/notifications")
 @jwt_required()
@@ -57,12 +111,16 @@ def my_notifications():
         # Etiquetas simples
         tlabel = {
             "auction_won": "Ganaste una subasta",
+            "auction_lost": "Subasta perdida",
             "outbid": "Tu oferta fue superada",
             "reminder": "Recordatorio",
         }.get(n.type, n.type)
         desc = ""
         if n.type == "auction_won":
             desc = f"Ganaste el lote {lot_code} por ${payload.get('amount'):,}" if lot_code else "Ganaste una subasta."
+        elif n.type == "auction_lost":
+            desc = (f"El lote {lot_code} se adjudicó a otra oferta por ${payload.get('amount'):,}"
+                    if lot_code else "La subasta se adjudicó a otra oferta.")
         elif n.type == "outbid":
             desc = f"Te superaron en el lote {lot_code}" if lot_code else "Tu oferta fue superada."
         elif n.type == "reminder":
@@ -94,27 +152,24 @@ def mark_notifications_read():
 @bp.get("/users/me/agenda")
 @jwt_required()
 def my_agenda():
-    """Eventos próximos: subastas activas donde el usuario ha pujado o es vendedor."""
-    uid = get_jwt_identity()
-    # Vehículos donde el usuario pujó
-    subq = (
-        db.session.query(Bid.vehicle_id)
-        .filter(Bid.bidder_id == uid)
-        .group_by(Bid.vehicle_id)
-        .subquery()
-    )
+    """Eventos próximos: subastas activas que el usuario sigue (pujó, vende o marcó)."""
+    uid = int(get_jwt_identity())
+    # Un solo rango sobre ix_watchlist_user_end; el margen cubre lotes vencidos
+    # que el job aún no cerró ("cierra pronto").
+    since = datetime.utcnow() - Watchlist.GRACE
     items = (
         db.session.query(Vehicle)
+        .join(Watchlist, Watchlist.vehicle_id == Vehicle.id)
         .filter(
+            Watchlist.user_id == uid,
+            Watchlist.auction_end_at >= since,
             Vehicle.status == "active",
-            ((Vehicle.seller_id == uid) | (Vehicle.id.in_(subq)))
         )
-        .order_by(Vehicle.auction_end_at.asc())
+        .order_by(Watchlist.auction_end_at.asc())
         .limit(20)
         .all()
     )
     data = []
-    from datetime import datetime, timezone
     now = datetime.now(timezone.utc)
     for v in items:
         ends = v.auction_end_at.replace(tzinfo=timezone.utc)
@@ -1,24 +1,103 @@
-from time import sleep
 from flask import Blueprint, request, current_app
 from sqlalchemy import func, text
+from sqlalchemy.orm import load_only
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db, socketio
-from ..models import Vehicle, Bid, User, Notification
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from ..extensions import db
+from ..models import Vehicle, VehicleImage, Bid, User, Notification, UserVehicleBidSummary, Watchlist
 from ..utils import api_error, api_ok
-from ..sse import stream, sse_response, publish
+from ..sse import stream, stream_many, update_stream, sse_response
+from ..notify import notify_user
+from ..changefeed import stamp, visible_seq
+from ..realtime import broadcast_vehicle, price_rows
+from ..importer import detect_format, import_vehicles, is_lot_code_conflict
+from ..media import media_url, schedule_variants, small_url, store_original
+from ..idempotency import idempotent
+from ..retry import is_retryable, transactional
+from ..tracing import Phases, record_ack, stamp_event
+from ..fieldsets import ALL, FieldsetError, parse_fields
+from .. import archive, drain, ending_soon, facets
+from ..facets import FacetFilterError
 
 bp = Blueprint("vehicles", __name__)
 
+CHANGES_MAX_LIMIT = 1000
+PRICES_MAX_GET = 200      # límite práctico de la URL
+PRICES_MAX_POST = 1000
+ENDING_SOON_MAX_LIMIT = 100
+
 @bp.get("/sse/vehicles/<int:vehicle_id>")
 def sse_vehicle(vehicle_id):
     # Mantiene compatibilidad por SSE
+    if drain.is_draining():
+        return drain.refuse_stream()
     return sse_response(stream(f"vehicle:{vehicle_id}"))
 
+def _parse_ids(raw):
+    ids = []
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if part.isdigit() and int(part) not in ids:
+            ids.append(int(part))
+    return ids
+
+@bp.get("/sse")
+def sse_multiplex():
+    """
+    Un solo stream SSE para varios lotes y el canal del usuario:
+      GET /api/sse?vehicles=1,2,3&token=<JWT>
+    El token (cabecera Authorization o ?token=, EventSource no envía cabeceras)
+    es opcional; si viene, se agrega `user:{uid}`. El primer evento (`ready`)
+    trae el streamId para cambiar suscripciones sin reconectar (solo con el
+    mismo usuario; un stream anónimo se reabre para cambiar lotes).
+    """
+    if drain.is_draining():
+        return drain.refuse_stream()
+    verify_jwt_in_request(optional=True, locations=["headers", "query_string"])
+    identity = get_jwt_identity()
+    channels = [f"vehicle:{vid}" for vid in _parse_ids(request.args.get("vehicles"))]
+    if identity:
+        channels.insert(0, f"user:{int(identity)}")
+    return sse_response(stream_many(channels, owner=int(identity) if identity else None))
+
+@bp.post("/sse/streams/<stream_id>")
+@jwt_required()
+def sse_update_subscriptions(stream_id):
+    """Agrega/quita lotes de un stream abierto: {"add": [1, 2], "remove": [3]}.
+    Solo el usuario que abrió el stream; para los demás responde 404."""
+    data = request.get_json(silent=True) or {}
+    add = [f"vehicle:{vid}" for vid in _parse_ids(",".join(map(str, data.get("add") or [])))]
+    remove = [f"vehicle:{vid}" for vid in _parse_ids(",".join(map(str, data.get("remove") or [])))]
+    channels = update_stream(stream_id, int(get_jwt_identity()), add=add, remove=remove)
+    if channels is None:
+        return api_error("Stream no encontrado.", 404)
+    return api_ok({"streamId": stream_id, "channels": channels})
+
+@bp.post("/sse/acks")
+@jwt_required()
+def sse_acks():
+    """
+    Acks de clientes SSE para eventos con `ackRequested` (con el JWT del stream):
+      {"acks": [{"traceId": "...", "committedAt": 1700000000000.0, "ackToken": "..."}, ...]}
+    Se descartan los que no traen el ackToken del evento o tienen committedAt
+    futuro o más viejo que la ventana de acks (tracing.MAX_ACK_AGE_MS).
+    """
+    acks = (request.get_json(silent=True) or {}).get("acks") or []
+    if not isinstance(acks, list):
+        return api_error("acks debe ser un arreglo.", 400)
+    recorded = sum(1 for a in acks[:100] if record_ack("sse", a))
+    return api_ok({"recorded": recorded})
+
 @bp.get("/vehicles")
 def list_vehicles():
+    # ?fields=id,make,currentPrice: solo esas columnas y claves (ver fieldsets)
+    try:
+        fields = parse_fields(SUMMARY_COLUMNS)
+        lot_filters = facets.parse_filters(request.args)
+    except (FieldsetError, FacetFilterError) as e:
+        return api_error(str(e), 400)
     status = request.args.get("status", "active")
-    q = Vehicle.query
+    q = Vehicle.query.options(load_only(*fields.columns(SUMMARY_COLUMNS, Vehicle.id, Vehicle.created_at)))
     if status != "all":
         q = q.filter(Vehicle.status == status)
     text_q = request.args.get("q")
@@ -29,11 +108,112 @@ def list_vehicles():
             (Vehicle.model.ilike(like)) |
             (Vehicle.lot_code.ilike(like))
         )
+    if lot_filters:
+        # En SQL y no con el índice de facetas: ese es por proceso y puede
+        # estar atrasado hasta la próxima verificación
+        q = facets.sql_filter(q, lot_filters)
     items = q.order_by(Vehicle.created_at.desc()).all()
-    return api_ok([serialize_vehicle_summary(v) for v in items])
+    # Precio y portada de toda la página en dos consultas (sin N+1), si se piden
+    ids = [v.id for v in items]
+    tops = top_bids(ids) if "currentPrice" in fields else {}
+    covers = cover_images(ids) if fields.any("images", "cover") else {}
+    return api_ok([serialize_vehicle_summary(v, tops, covers, fields) for v in items])
+
+@bp.get("/vehicles/changes")
+def vehicle_changes():
+    """
+    Sincronización delta del catálogo:
+      GET /api/vehicles/changes?since=<seq>&limit=500
+    Devuelve los lotes activos modificados después de `since` (resumen completo)
+    y lápidas para los cerrados. El cliente guarda `seq` para la próxima llamada.
+    Los cambios con seq por encima de una transacción aún en curso salen en
+    una llamada posterior (ver changefeed: los commits pueden confirmar fuera
+    de orden).
+    """
+    since = request.args.get("since", 0, type=int)
+    limit = min(max(request.args.get("limit", 500, type=int), 1), CHANGES_MAX_LIMIT)
+    items = (
+        Vehicle.query
+        .filter(Vehicle.change_seq > since, Vehicle.change_seq <= visible_seq())
+        .order_by(Vehicle.change_seq.asc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(items) > limit
+    items = items[:limit]
+    active = [v for v in items if v.status == "active"]
+    ids = [v.id for v in active]
+    tops, covers = top_bids(ids), cover_images(ids)
+    return api_ok({
+        "vehicles": [serialize_vehicle_summary(v, tops, covers) for v in active],
+        "tombstones": [
+            {"id": v.id, "status": v.status, "winnerBidId": v.winner_bid_id}
+            for v in items if v.status != "active"
+        ],
+        "seq": items[-1].change_seq if items else since,
+        "hasMore": has_more,
+    })
+
+@bp.get("/vehicles/ending-soon")
+def vehicles_ending_soon():
+    """
+    Rail "cierra pronto" desde el índice en memoria (sin BD):
+      GET /api/vehicles/ending-soon?limit=20
+    """
+    limit = min(max(request.args.get("limit", 20, type=int), 1), ENDING_SOON_MAX_LIMIT)
+    return api_ok(ending_soon.soonest(limit))
+
+@bp.get("/vehicles/facets")
+def vehicle_facets():
+    """
+    Conteos del panel de filtros entre lotes activos (índice en memoria):
+      GET /api/vehicles/facets?make=Ford&decade=1960&min_price=10000
+    Cada faceta se cuenta con los demás filtros aplicados, no el propio.
+    """
+    try:
+        lot_filters = facets.parse_filters(request.args)
+    except FacetFilterError as e:
+        return api_error(str(e), 400)
+    return api_ok(facets.counts(lot_filters))
+
+@bp.route("/vehicles/prices", methods=["GET", "POST"])
+def vehicle_prices():
+    """
+    Refresco de la grilla en formato columnar:
+      GET  /api/vehicles/prices?ids=1,2,3
+      POST /api/vehicles/prices   {"ids": [1, 2, 3, ...]}   (listas largas)
+    Responde {ids[], prices[], statuses[], endsAt[]} en el orden pedido;
+    los ids inexistentes se omiten.
+    """
+    if request.method == "POST":
+        raw = (request.get_json(silent=True) or {}).get("ids") or []
+        if not isinstance(raw, list):
+            return api_error("ids debe ser un arreglo.", 400)
+        ids = _parse_ids(",".join(map(str, raw)))
+        max_ids = PRICES_MAX_POST
+    else:
+        ids = _parse_ids(request.args.get("ids"))
+        max_ids = PRICES_MAX_GET
+    if len(ids) > max_ids:
+        return api_error(f"Máximo {max_ids} ids por petición.", 400)
+
+    rows = {r[0]: r for r in price_rows(ids)}
+    out = {"ids": [], "prices": [], "statuses": [], "endsAt": []}
+    for vid in ids:
+        row = rows.get(vid)
+        if row is None:
+            continue
+        _, base, _, status, ends, top = row
+        out["ids"].append(vid)
+        out["prices"].append(max(base, top or 0))
+        out["statuses"].append(status)
+        out["endsAt"].append(ends.isoformat() + "Z")
+    return api_ok(out)
 
 @bp.post("/vehicles")
 @jwt_required()
+@idempotent
+@transactional("create_vehicle")
 def create_vehicle():
     """
     Crea un vehículo aceptando **POST sin body** con parámetros en query-string,
@@ -41,6 +221,7 @@ def create_vehicle():
       POST /api/vehicles?make=Ford&model=Mustang&year=1969&base_price=200000&lot_code=F54
       &description=...&images=https://a.jpg&images=https://b.jpg
     También mantiene compatibilidad con JSON en el body.
+    Con `Idempotency-Key` los reintentos reciben la respuesta original.
     """
     # (Opcional) reducir esperas por locks
     try:
@@ -101,9 +282,6 @@ def create_vehicle():
     if not isinstance(images, list):
         return api_error("images debe ser un arreglo de URLs.", 400)
 
-    if Vehicle.query.filter_by(lot_code=lot_code).first():
-        return api_error("El código de lote ya existe.", 409)
-
     # Crear entidad
     v = Vehicle(
         seller_id=uid,
@@ -118,46 +296,139 @@ def create_vehicle():
         status=pick_str("status") or "active",
     )
 
-    # Commit con reintentos ante deadlocks
-    for attempt in range(3):
+    # Los deadlocks/lock timeouts los reintenta @transactional (toda la vista)
+    try:
+        db.session.add(v)
+        db.session.flush()
+        Watchlist.ensure(uid, v)  # el vendedor sigue su propio lote (agenda)
+        stamp(v)
+        db.session.commit()
+    except OperationalError as e:
+        db.session.rollback()
+        if is_retryable(e):
+            raise
+        current_app.logger.exception("Error operacional creando vehículo")
+        return api_error("No se pudo publicar el vehículo.", 400, details=str(getattr(e, "orig", e)))
+    except IntegrityError as e:
+        # El índice único de lot_code responde el duplicado (sin SELECT previo)
+        db.session.rollback()
+        if is_lot_code_conflict(e):
+            return api_error("El código de lote ya existe.", 409, details=str(getattr(e, "orig", e)))
+        current_app.logger.exception("Restricción violada creando vehículo")
+        return api_error("No se pudo publicar el vehículo.", 400, details=str(getattr(e, "orig", e)))
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.exception("Error SQL creando vehículo")
+        return api_error("No se pudo publicar el vehículo.", 400, details=str(getattr(e, "orig", e)))
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error inesperado creando vehículo")
+        return api_error("Error interno al publicar.", 500, details=str(e))
+
+    ending_soon.add_vehicle(v)
+    facets.add_vehicle(v)
+    resp = api_ok(serialize_vehicle_detail(v))
+    # Cabecera de diagnóstico para saber de dónde vino la data
+    resp.headers["X-Vehicle-From"] = "query" if request.args else "json"
+    return resp
+
+@bp.post("/vehicles/import")
+@jwt_required()
+def import_vehicles_bulk():
+    """
+    Importación masiva en streaming (catálogos de casas de subasta):
+      POST /api/vehicles/import   Content-Type: text/csv | application/x-ndjson
+    También acepta ?format=csv|ndjson. Responde los errores por fila.
+    """
+    uid = int(get_jwt_identity())
+    user = db.session.get(User, uid)
+    if not user:
+        return api_error("Usuario no encontrado.", 404)
+    if user.role not in ("seller", "admin"):
+        return api_error("Solo vendedores o administradores pueden publicar.", 403)
+
+    fmt = detect_format(request.args.get("format"), request.content_type)
+    if not fmt:
+        return api_error("Formato no soportado (use CSV o NDJSON).", 415)
+
+    lines = (raw.decode("utf-8-sig") for raw in request.stream)
+    result = import_vehicles(
+        lines, fmt, uid,
+        min_inc_default=current_app.config.get("MIN_INCREMENT_DEFAULT", 100),
+    )
+    # Alta masiva: los índices se reconstruyen en la próxima consulta
+    ending_soon.invalidate()
+    facets.invalidate()
+    return api_ok(result)
+
+@bp.post("/vehicles/<int:vehicle_id>/images")
+@jwt_required()
+def upload_vehicle_images(vehicle_id):
+    """
+    Sube fotos al disco local (multipart, campo `file`, se puede repetir):
+      POST /api/vehicles/<id>/images
+    Responde 202: las variantes thumb/medium se generan en segundo plano.
+    """
+    uid = int(get_jwt_identity())
+    v = Vehicle.query.get_or_404(vehicle_id)
+    if v.seller_id != uid:
+        return api_error("Solo el vendedor puede subir fotos.", 403)
+
+    files = request.files.getlist("file")
+    if not files:
+        return api_error("Adjunte al menos una imagen en el campo 'file'.", 400)
+    if len(files) > current_app.config["MEDIA_MAX_FILES"]:
+        return api_error("Demasiadas imágenes en una sola petición.", 400)
+
+    root = current_app.config["MEDIA_ROOT"]
+    max_bytes = current_app.config["MEDIA_MAX_BYTES"]
+    stored = []
+    for f in files:
+        data = f.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            return api_error("Imagen demasiado grande.", 413)
         try:
-            db.session.add(v)
-            db.session.commit()
-            resp = api_ok(serialize_vehicle_detail(v))
-            # Cabecera de diagnóstico para saber de dónde vino la data
-            resp.headers["X-Vehicle-From"] = "query" if request.args else "json"
-            return resp
-        except OperationalError as e:
-            code = getattr(getattr(e, "orig", None), "args", [None])[0]
-            if code in (1205, 1213):  # lock/deadlock
-                current_app.logger.warning(f"Retry vehicles.insert por lock (intento {attempt+1})")
-                db.session.rollback()
-                sleep(0.35 * (attempt + 1))
-                continue
-            db.session.rollback()
-            current_app.logger.exception("Error operacional creando vehículo")
-            return api_error("No se pudo publicar el vehículo.", 400, details=str(getattr(e, "orig", e)))
-        except IntegrityError as e:
-            db.session.rollback()
-            return api_error("Conflicto de datos (posible lote duplicado).", 409, details=str(getattr(e, "orig", e)))
-        except SQLAlchemyError as e:
-            db.session.rollback()
-            current_app.logger.exception("Error SQL creando vehículo")
-            return api_error("No se pudo publicar el vehículo.", 400, details=str(getattr(e, "orig", e)))
-        except Exception as e:
-            db.session.rollback()
-            current_app.logger.exception("Error inesperado creando vehículo")
-            return api_error("Error interno al publicar.", 500, details=str(e))
-
-    return api_error("No se pudo publicar el vehículo (reintentos agotados).", 409)
+            stored.append(store_original(root, data))
+        except ValueError as e:
+            return api_error(str(e), 415)
+
+    # Dos subidas a la vez leerían el mismo máximo y chocarían en el índice
+    # único (vehicle_id, position): el lote queda bloqueado hasta el commit
+    # (las fotos ya están en disco, el lock dura solo los INSERT)
+    db.session.query(Vehicle.id).filter_by(id=v.id).with_for_update().one()
+    last = db.session.query(func.max(VehicleImage.position)).filter(
+        VehicleImage.vehicle_id == v.id
+    ).scalar()
+    position = 0 if last is None else last + 1
+    created = []
+    for digest, ext in stored:
+        img = VehicleImage(vehicle_id=v.id, position=position, url=media_url(digest, f"original.{ext}"))
+        db.session.add(img)
+        created.append((img, digest, ext))
+        position += 1
+    stamp(v)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    for img, digest, ext in created:
+        schedule_variants(app, img.id, digest, ext)
+    return api_ok({
+        "vehicleId": v.id,
+        "images": [{"id": img.id, "position": img.position, "url": img.url} for img, _, _ in created],
+    }), 202
 
 @bp.get("/vehicles/<int:vehicle_id>")
 def get_vehicle(vehicle_id):
-    v = Vehicle.query.get_or_404(vehicle_id)
-    return api_ok(serialize_vehicle_detail(v))
+    try:
+        fields = parse_fields(DETAIL_COLUMNS)
+    except FieldsetError as e:
+        return api_error(str(e), 400)
+    v = Vehicle.query.options(load_only(*fields.columns(DETAIL_COLUMNS, Vehicle.id))).get_or_404(vehicle_id)
+    return api_ok(serialize_vehicle_detail(v, fields))
 
 @bp.patch("/vehicles/<int:vehicle_id>/close")
 @jwt_required()
+@transactional("close_vehicle")
 def close_vehicle(vehicle_id):
     uid = int(get_jwt_identity())
     v = Vehicle.query.get_or_404(vehicle_id)
@@ -169,24 +440,55 @@ def close_vehicle(vehicle_id):
     win = v.bids.order_by(Bid.amount.desc()).first()
     if win:
         v.winner_bid_id = win.id
+    stamp(v)
     db.session.commit()
 
     payload = {"vehicleId": v.id, "winnerBidId": v.winner_bid_id, "amount": win.amount if win else None}
-    # SSE
-    publish(f"vehicle:{v.id}", "closed", payload)
-    # Socket.IO
-    socketio.emit("closed", payload, to=f"vehicle:{v.id}", namespace="/rt")
+    # SSE + Socket.IO
+    broadcast_vehicle(v.id, "closed", payload)
 
     return api_ok({"vehicleId": v.id, "status": v.status, "winnerBidId": v.winner_bid_id})
 
+@bp.post("/vehicles/<int:vehicle_id>/watch")
+@jwt_required()
+def watch_vehicle(vehicle_id):
+    uid = int(get_jwt_identity())
+    v = Vehicle.query.get_or_404(vehicle_id)
+    Watchlist.ensure(uid, v)
+    db.session.commit()
+    return api_ok({"vehicleId": v.id, "watching": True})
+
+@bp.delete("/vehicles/<int:vehicle_id>/watch")
+@jwt_required()
+def unwatch_vehicle(vehicle_id):
+    uid = int(get_jwt_identity())
+    Watchlist.query.filter_by(user_id=uid, vehicle_id=vehicle_id).delete(synchronize_session=False)
+    db.session.commit()
+    return api_ok({"vehicleId": vehicle_id, "watching": False})
+
 @bp.get("/vehicles/<int:vehicle_id>/bids")
 def list_bids(vehicle_id):
-    v = Vehicle.query.get_or_404(vehicle_id)
-    bids = v.bids.order_by(Bid.amount.desc(), Bid.created_at.asc()).all()
-    return api_ok([serialize_bid(b) for b in bids])
+    try:
+        fields = parse_fields(BID_COLUMNS)
+    except FieldsetError as e:
+        return api_error(str(e), 400)
+    v = Vehicle.query.options(load_only(Vehicle.id)).get_or_404(vehicle_id)
+    # Lote archivado: se suman las pujas de bids_archive (el orden se rehace aquí)
+    archived = archive.has_archived(vehicle_id)
+    columns = fields.columns(BID_COLUMNS, Bid.id, *((Bid.amount, Bid.created_at) if archived else ()))
+    bids = (
+        v.bids.options(load_only(*columns))
+        .order_by(Bid.amount.desc(), Bid.created_at.asc())
+        .all()
+    )
+    if archived:
+        bids = sorted(bids + archive.archived_bids(vehicle_id, columns), key=lambda b: (-b.amount, b.created_at))
+    return api_ok([serialize_bid(b, fields) for b in bids])
 
 @bp.post("/vehicles/<int:vehicle_id>/bids")
 @jwt_required()
+@idempotent  # reintentos con la misma Idempotency-Key no vuelven a pujar
+@transactional("place_bid")
 def place_bid(vehicle_id):
     # UID desde JWT
     uid_raw = get_jwt_identity()
@@ -211,6 +513,9 @@ def place_bid(vehicle_id):
         amount = amt_qs
         src = "query"
 
+    # Fases (lock_wait, insert, commit, fanout) en histogramas bid.*_ms
+    phases = Phases("bid")
+
     # Bloqueo de fila del vehículo para consistencia
     v = (
         db.session.query(Vehicle)
@@ -233,11 +538,12 @@ def place_bid(vehicle_id):
         .with_for_update()
         .first()
     )
+    phases.mark("lock_wait")
     current = max(v.base_price, top_row.amount if top_row else 0)
     min_required = current + v.min_increment
     if amount < min_required:
         # Respuesta clara para el front
-        resp = api_error(
+        resp, status = api_error(
             "La oferta es menor al mínimo requerido.",
             400,
             min_required=min_required,
@@ -245,13 +551,15 @@ def place_bid(vehicle_id):
             min_increment=v.min_increment,
         )
         resp.headers["X-Bid-From"] = src
-        return resp
+        return resp, status
 
     prev_top_bidder = top_row.bidder_id if top_row else None
 
     # Inserción de la puja
     b = Bid(vehicle_id=vehicle_id, bidder_id=uid, amount=amount)
     db.session.add(b)
+    Watchlist.ensure(uid, v)  # pujar implica seguir el lote
+    UserVehicleBidSummary.record(uid, v, amount, prev_top_bidder)
 
     if prev_top_bidder and prev_top_bidder != uid:
         db.session.add(
@@ -262,62 +570,129 @@ def place_bid(vehicle_id):
             )
         )
 
+    stamp(v)  # el precio actual cambió
+    db.session.flush()
+    phases.mark("insert")
     db.session.commit()
+    phases.mark("commit")
 
-    # Notificaciones/tiempo real
-    publish(f"vehicle:{v.id}", "top-updated", {"vehicleId": v.id, "top": amount, "bidId": b.id})
-    socketio.emit(
-        "top-updated",
-        {"vehicleId": v.id, "top": amount, "bidId": b.id},
-        to=f"vehicle:{v.id}",
-        namespace="/rt",
-    )
+    # Notificaciones/tiempo real (traceId + committedAt para medir la entrega)
+    event = stamp_event({"vehicleId": v.id, "top": amount, "bidId": b.id})
+    broadcast_vehicle(v.id, "top-updated", event)
     if prev_top_bidder and prev_top_bidder != uid:
-        socketio.emit(
-            "notification",
-            {"type": "outbid", "payload": {"vehicle_id": v.id, "amount": amount}},
-            to=f"user:{prev_top_bidder}",
-            namespace="/rt",
-        )
+        notify_user(prev_top_bidder, "outbid", {"vehicle_id": v.id, "amount": amount})
+    phases.mark("fanout")
 
     resp = api_ok(serialize_bid(b), min_required=amount + v.min_increment)
     resp.headers["X-Bid-From"] = src  # diagnóstico: 'query' o 'json'
     return resp
 
 
-def serialize_vehicle_summary(v: Vehicle):
-    current = v.base_price
-    top = v.bids.with_entities(func.max(Bid.amount)).scalar()
-    if top and top > current:
-        current = top
-    return {
-        "id": v.id,
-        "make": v.make,
-        "model": v.model,
-        "year": v.year,
-        "basePrice": v.base_price,
-        "currentPrice": current,
-        "minIncrement": v.min_increment,
-        "lotCode": v.lot_code,
-        "images": v.images or [],
-        "status": v.status,
-        "endsAt": v.auction_end_at.isoformat() + "Z",
-    }
-
-def serialize_vehicle_detail(v: Vehicle):
-    data = serialize_vehicle_summary(v)
-    data.update({
-        "description": v.description,
-        "sellerId": v.seller_id,
-        "createdAt": v.created_at.isoformat() + "Z",
-    })
+def top_bids(ids):
+    """Máxima puja por vehículo en una sola consulta agrupada."""
+    if not ids:
+        return {}
+    rows = (
+        db.session.query(Bid.vehicle_id, func.max(Bid.amount))
+        .filter(Bid.vehicle_id.in_(ids))
+        .group_by(Bid.vehicle_id)
+        .all()
+    )
+    return dict(rows)
+
+def cover_images(ids):
+    """Solo la portada (position=0) de cada vehículo, en una consulta."""
+    if not ids:
+        return {}
+    rows = VehicleImage.query.filter(
+        VehicleImage.vehicle_id.in_(ids), VehicleImage.position == 0
+    ).all()
+    return {img.vehicle_id: img for img in rows}
+
+def serialize_cover(img):
+    if img is None:
+        return None
+    return {"url": img.url, "small": small_url(img), "variants": img.variants or {}}
+
+# Campo JSON -> columnas que necesita además del id (para load_only)
+SUMMARY_COLUMNS = {
+    "id": (),
+    "make": (Vehicle.make,),
+    "model": (Vehicle.model,),
+    "year": (Vehicle.year,),
+    "basePrice": (Vehicle.base_price,),
+    "currentPrice": (Vehicle.base_price,),
+    "minIncrement": (Vehicle.min_increment,),
+    "lotCode": (Vehicle.lot_code,),
+    "images": (),
+    "cover": (),
+    "status": (Vehicle.status,),
+    "endsAt": (Vehicle.auction_end_at,),
+}
+DETAIL_COLUMNS = {
+    **SUMMARY_COLUMNS,
+    "media": (),
+    "description": (Vehicle.description,),
+    "sellerId": (Vehicle.seller_id,),
+    "createdAt": (Vehicle.created_at,),
+}
+BID_COLUMNS = {
+    "id": (),
+    "vehicleId": (Bid.vehicle_id,),
+    "bidderId": (Bid.bidder_id,),
+    "amount": (Bid.amount,),
+    "createdAt": (Bid.created_at,),
+}
+
+_SUMMARY_VALUES = {
+    "id": lambda v, current, cover: v.id,
+    "make": lambda v, current, cover: v.make,
+    "model": lambda v, current, cover: v.model,
+    "year": lambda v, current, cover: v.year,
+    "basePrice": lambda v, current, cover: v.base_price,
+    "currentPrice": lambda v, current, cover: current,
+    "minIncrement": lambda v, current, cover: v.min_increment,
+    "lotCode": lambda v, current, cover: v.lot_code,
+    # Las tarjetas del catálogo usan la miniatura, no el original
+    "images": lambda v, current, cover: [small_url(cover)] if cover else [],
+    "cover": lambda v, current, cover: serialize_cover(cover),
+    "status": lambda v, current, cover: v.status,
+    "endsAt": lambda v, current, cover: v.auction_end_at.isoformat() + "Z",
+}
+_DETAIL_VALUES = {
+    "images": lambda v: v.images,
+    "media": lambda v: [serialize_cover(img) for img in v.media],
+    "description": lambda v: v.description,
+    "sellerId": lambda v: v.seller_id,
+    "createdAt": lambda v: v.created_at.isoformat() + "Z",
+}
+_BID_VALUES = {
+    "id": lambda b: b.id,
+    "vehicleId": lambda b: b.vehicle_id,
+    "bidderId": lambda b: b.bidder_id,
+    "amount": lambda b: b.amount,
+    "createdAt": lambda b: b.created_at.isoformat() + "Z",
+}
+
+def serialize_vehicle_summary(v: Vehicle, tops=None, covers=None, fields=ALL):
+    current = cover = None
+    if "currentPrice" in fields:
+        if tops is not None:
+            top = tops.get(v.id)
+        else:
+            top = v.bids.with_entities(func.max(Bid.amount)).scalar()
+        current = max(v.base_price, top or 0)
+    if fields.any("images", "cover"):
+        if covers is None:
+            covers = cover_images([v.id])
+        cover = covers.get(v.id)
+    return fields.pick(_SUMMARY_VALUES, v, current, cover)
+
+def serialize_vehicle_detail(v: Vehicle, fields=ALL):
+    # En el detalle "images" son los originales, no la miniatura
+    data = serialize_vehicle_summary(v, fields=fields.without("images"))
+    data.update(fields.pick(_DETAIL_VALUES, v))
     return data
 
-def serialize_bid(b: Bid):
-    return {
-        "id": b.id,
-        "vehicleId": b.vehicle_id,
-        "bidderId": b.bidder_id,
-        "amount": b.amount,
-        "createdAt": b.created_at.isoformat() + "Z",
-    }
+def serialize_bid(b: Bid, fields=ALL):
+    return fields.pick(_BID_VALUES, b)
@@ -1,11 +1,21 @@
 from flask import request, current_app
-from flask_socketio import Namespace, emit, join_room, leave_room, disconnect
+from flask_socketio import ConnectionRefusedError, Namespace, emit, join_room, leave_room, disconnect
 from flask_jwt_extended import decode_token
 from typing import Optional
+from datetime import datetime
+from .extensions import db, scheduler
+from .models import Watchlist
+from .tasks import start_scheduler
+from .realtime import EPOCH, events_since, vehicle_snapshots
+from .tracing import record_ack
+from . import compact, drain
 
 # Mapeo liviano de sid -> user_id para refrescar auth
 _SID_TO_UID = {}
 
+# Tope de lotes por mensaje subscribe_vehicles (una grilla típica ronda 60)
+MAX_BULK_SUBSCRIBE = 200
+
 def _extract_uid_from_token(token: Optional[str]) -> Optional[int]:
     if not token:
         return None
@@ -18,10 +28,40 @@ def _extract_uid_from_token(token: Optional[str]) -> Optional[int]:
     except Exception:
         return None
 
+def _join(name: str):
+    """join_room respetando el protocolo de la conexión (salas `c:` si es compacta)."""
+    join_room(compact.room(name, request.sid))
+
+def _leave(name: str):
+    leave_room(compact.room(name, request.sid))
+
+def _watched_vehicle_ids(uid: int):
+    """Lotes vigentes que sigue el usuario (un rango sobre ix_watchlist_user_end)."""
+    since = datetime.utcnow() - Watchlist.GRACE
+    rows = (
+        db.session.query(Watchlist.vehicle_id)
+        .filter(Watchlist.user_id == uid, Watchlist.auction_end_at >= since)
+        .all()
+    )
+    return [r[0] for r in rows]
+
 class AuctionNamespace(Namespace):
-    def on_connect(self):
+    def on_connect(self, auth=None):
+        # Drenando: el cliente recibe connect_error con la pista de reintento
+        if drain.is_draining():
+            raise ConnectionRefusedError(drain.reconnect_hint())
+        # Un worker que solo atiende /rt también corre la elección de líder
+        if not scheduler.running:
+            start_scheduler(scheduler, current_app._get_current_object())
+        # Protocolo opcional: auth {"protocol": "compact"} o ?protocol=compact
+        protocol = request.args.get("protocol")
+        if isinstance(auth, dict):
+            protocol = auth.get("protocol") or protocol
+        if protocol == "compact":
+            compact.register(request.sid)
+
         # Token puede venir en auth (recomendado) o en query ?token=
-        token = None
+        token = auth.get("token") if isinstance(auth, dict) else None
         auth = request.args.get("auth")  # poco común
         if isinstance(auth, dict):
             token = auth.get("token")
@@ -39,11 +79,19 @@ class AuctionNamespace(Namespace):
             pass
 
         uid = _extract_uid_from_token(token)
+        watching = []
         if uid:
-            join_room(f"user:{uid}")
+            _join(f"user:{uid}")
             _SID_TO_UID[request.sid] = uid
+            # Auto-suscripción a los lotes seguidos (evita N subscribe_vehicle)
+            watching = _watched_vehicle_ids(uid)
+            for vid in watching:
+                _join(f"vehicle:{vid}")
         # Confirmamos conexión
-        emit("connected", {"ok": True, "userId": uid}, to=request.sid)
+        hello = {"ok": True, "userId": uid, "watching": watching, "protocol": "json", "epoch": EPOCH}
+        if request.sid in compact.SIDS:
+            hello.update(protocol="compact", codes=compact.codes())
+        emit("connected", hello, to=request.sid)
 
     def on_disconnect(self):
         uid = _SID_TO_UID.pop(request.sid, None)
@@ -51,9 +99,10 @@ class AuctionNamespace(Namespace):
             # No es necesario leave_room explícito (se limpia al desconectar),
             # pero mantenemos consistencia si reusamos sid.
             try:
-                leave_room(f"user:{uid}")
+                _leave(f"user:{uid}")
             except Exception:
                 pass
+        compact.unregister(request.sid)
 
     def on_auth_refresh(self, data):
         """Permite refrescar token post-login sin reconectar el socket."""
@@ -62,11 +111,11 @@ class AuctionNamespace(Namespace):
         old_uid = _SID_TO_UID.get(request.sid)
         if old_uid and old_uid != new_uid:
             try:
-                leave_room(f"user:{old_uid}")
+                _leave(f"user:{old_uid}")
             except Exception:
                 pass
         if new_uid:
-            join_room(f"user:{new_uid}")
+            _join(f"user:{new_uid}")
             _SID_TO_UID[request.sid] = new_uid
         emit("auth_refreshed", {"userId": new_uid}, to=request.sid)
 
@@ -74,14 +123,64 @@ class AuctionNamespace(Namespace):
         vid = (data or {}).get("vehicleId")
         if not vid:
             return
-        join_room(f"vehicle:{vid}")
+        _join(f"vehicle:{vid}")
         emit("subscribed", {"vehicleId": vid}, to=request.sid)
 
+    def on_subscribe_vehicles(self, data):
+        """Suscripción masiva: une a todas las salas y responde un solo snapshot."""
+        raw = (data or {}).get("vehicleIds") or []
+        if not isinstance(raw, list):
+            return
+        ids = []
+        for vid in raw[:MAX_BULK_SUBSCRIBE]:
+            try:
+                vid = int(vid)
+            except (TypeError, ValueError):
+                continue
+            if vid not in ids:
+                ids.append(vid)
+        snapshot = vehicle_snapshots(ids)
+        for item in snapshot:
+            _join(f"vehicle:{item['id']}")
+        emit("vehicles_snapshot", {"vehicles": snapshot}, to=request.sid)
+
+    def on_resume(self, data):
+        """Reconexión: {"epoch": ..., "vehicles": {vehicleId: lastSeq}} → solo los
+        eventos faltantes. Sin `epoch` o de otro arranque, todo va como snapshot.
+
+        Se une a las salas antes de leer los buffers; lo que llegue en vivo
+        mientras tanto puede repetirse en `replay` (el cliente descarta seq <= último)."""
+        pairs = (data or {}).get("vehicles") or {}
+        if not isinstance(pairs, dict):
+            return
+        epoch = data.get("epoch")
+        replay, stale = [], []
+        for vid, last in list(pairs.items())[:MAX_BULK_SUBSCRIBE]:
+            try:
+                vid, last = int(vid), int(last)
+            except (TypeError, ValueError):
+                continue
+            _join(f"vehicle:{vid}")
+            events = events_since(vid, last, epoch)
+            if events is None:
+                stale.append(vid)
+            elif events:
+                replay.append({"vehicleId": vid, "events": events})
+        emit("resumed", {"replay": replay, "snapshots": vehicle_snapshots(stale), "epoch": EPOCH},
+             to=request.sid)
+
+    def on_ack(self, data):
+        """Ack de eventos con `ackRequested`: {"traceId", "committedAt", "ackToken"}
+        o una lista de ellos."""
+        items = data if isinstance(data, list) else [data]
+        for item in items[:100]:
+            record_ack("socketio", item)
+
     def on_unsubscribe_vehicle(self, data):
         vid = (data or {}).get("vehicleId")
         if not vid:
             return
-        leave_room(f"vehicle:{vid}")
+        _leave(f"vehicle:{vid}")
         emit("unsubscribed", {"vehicleId": vid}, to=request.sid)
 
 def register_socketio(socketio):
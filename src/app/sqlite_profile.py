@@ -0,0 +1,90 @@
+# app/sqlite_profile.py
+"""Perfil SQLite de producción (DB_PROFILE=sqlite, ver `SQLiteConfig`).
+
+- PRAGMAs al conectar: WAL, busy_timeout, synchronous=NORMAL, mmap y caché.
+- Un solo escritor: el bind "writer" tiene un pool de 1 conexión y abre
+  cada transacción con BEGIN IMMEDIATE, así que las escrituras se
+  serializan en el proceso (y contra otros procesos, vía el lock de SQLite)
+  en lugar de fallar con "database is locked". En SQLite FOR UPDATE no
+  existe; BEGIN IMMEDIATE cumple ese rol.
+- Lecturas: el engine por defecto es un pool de lectores; con WAL no
+  bloquean ni son bloqueadas por el escritor.
+
+`RoutingSession` manda al escritor los INSERT/UPDATE/DELETE, los flush, los
+SELECT ... FOR UPDATE y todo lo que ocurra dentro de @transactional, hasta
+el fin de la transacción."""
+import sqlalchemy as sa
+from sqlalchemy import event
+from flask_sqlalchemy.session import Session
+
+WRITER_BIND = "writer"
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            writer = self._db.engines.get(WRITER_BIND)
+            if writer is not None and self._wants_writer(clause):
+                # Una vez en el escritor, el resto de la transacción sigue ahí
+                self.info["writer"] = True
+                return writer
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _wants_writer(self, clause):
+        if self.info.get("writer") or self._flushing:
+            return True
+        if isinstance(clause, sa.UpdateBase):
+            return True
+        return isinstance(clause, sa.Select) and clause._for_update_arg is not None
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _leave_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("writer", None)
+
+def mark_writer(session):
+    """La unidad de trabajo completa (lecturas incluidas) va al escritor."""
+    session.info["writer"] = True
+
+def _pragmas(config):
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+        # Negativo = KiB por conexión
+        f"PRAGMA cache_size=-{int(config.get('SQLITE_CACHE_SIZE_KB', 65536))}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+def configure_engine(engine, config, writer=False):
+    pragmas = _pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+        if writer:
+            # El driver no abre transacciones solo: las abre el evento "begin"
+            dbapi_connection.isolation_level = None
+
+    if writer:
+        @event.listens_for(engine, "begin")
+        def _on_begin(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def init_sqlite_profile(app, db):
+    """Aplica el perfil si DB_PROFILE=sqlite (llamar tras db.init_app)."""
+    if app.config.get("DB_PROFILE") != "sqlite":
+        return
+    with app.app_context():
+        engines = db.engines
+        if WRITER_BIND not in engines:
+            raise RuntimeError("DB_PROFILE=sqlite requiere el bind 'writer' en SQLALCHEMY_BINDS.")
+        for key, engine in engines.items():
+            configure_engine(engine, app.config, writer=key == WRITER_BIND)
+
+def write_engine(db):
+    """Engine para escrituras Core fuera de la sesión (el escritor si hay perfil)."""
+    return db.engines.get(WRITER_BIND, db.engine)
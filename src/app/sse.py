@@ -1,32 +1,129 @@
 import json
+import threading
+import uuid
 from queue import Queue
 from flask import Response, stream_with_context
+from .tracing import record_emit
 
-# Canal -> lista de colas (una por cliente conectado)
+# Canal -> conjunto de suscriptores (uno por cliente conectado).
+# Los canales vacíos se eliminan al desuscribirse el último cliente.
 CHANNELS = {}
+# streamId -> suscriptor multiplexado (para cambiar canales sin reconectar)
+STREAMS = {}
+# Suscriptores con el stream abierto (para cerrarlos al drenar el proceso)
+SUBSCRIBERS = set()
+_LOCK = threading.Lock()
+
+# Tope de canales por stream multiplexado
+MAX_CHANNELS = 200
+
+def _format(event: str, data: dict) -> str:
+    return f"event: {event}\n" + f"data: {json.dumps(data)}\n\n"
+
+class Subscriber:
+    """Cola de un cliente SSE. En modo `mux` cada evento lleva su canal:
+    data: {"channel": "vehicle:1", "data": {...}}"""
+
+    def __init__(self, mux=False, owner=None):
+        self.id = uuid.uuid4().hex
+        self.mux = mux
+        self.owner = owner  # uid que abrió el stream (None si es anónimo)
+        self.queue = Queue()
+        self.channels = set()
+
+    def subscribe(self, channel: str):
+        with _LOCK:
+            CHANNELS.setdefault(channel, set()).add(self)
+            self.channels.add(channel)
+
+    def unsubscribe(self, channel: str):
+        with _LOCK:
+            subs = CHANNELS.get(channel)
+            if subs is not None:
+                subs.discard(self)
+                if not subs:
+                    del CHANNELS[channel]
+            self.channels.discard(channel)
+
+    def close(self):
+        for channel in list(self.channels):
+            self.unsubscribe(channel)
+        STREAMS.pop(self.id, None)
 
 def publish(channel: str, event: str, data: dict):
-    payload = f"event: {event}\n" + f"data: {json.dumps(data)}\n\n"
-    queues = CHANNELS.get(channel, [])
-    for q in list(queues):
+    subs = CHANNELS.get(channel)
+    if not subs:
+        return
+    # Se serializa una vez por formato, no por cliente
+    plain = mux = None
+    committed = data.get("committedAt") if isinstance(data, dict) else None
+    for sub in list(subs):
+        if sub.mux:
+            if mux is None:
+                mux = _format(event, {"channel": channel, "data": data})
+            payload = mux
+        else:
+            if plain is None:
+                plain = _format(event, data)
+            payload = plain
         try:
-            q.put_nowait(payload)
+            sub.queue.put_nowait((payload, committed))
         except Exception:
             pass
 
-def stream(channel: str):
-    q = Queue()
-    CHANNELS.setdefault(channel, []).append(q)
+def close_stream(sub: Subscriber, event: str, data: dict, retry_ms=None):
+    """Manda un último evento (con `retry:` para EventSource) y termina el stream."""
+    payload = _format(event, data)
+    if retry_ms is not None:
+        payload = f"retry: {int(retry_ms)}\n" + payload
+    sub.queue.put_nowait((payload, None))
+    sub.queue.put_nowait((None, None))
+
+def _drain(sub: Subscriber, first: str):
+    SUBSCRIBERS.add(sub)
     try:
-        # Primer “ping” para abrir
-        yield "event: ping\ndata: {}\n\n"
+        # Primer evento para abrir
+        yield first
         while True:
-            msg = q.get()  # bloqueante
+            msg, committed = sub.queue.get()  # bloqueante
+            if msg is None:  # close_stream
+                break
+            record_emit("sse", committed)
             yield msg
     except GeneratorExit:
         pass
     finally:
-        CHANNELS[channel].remove(q)
+        SUBSCRIBERS.discard(sub)
+        sub.close()
+
+def stream(channel: str):
+    sub = Subscriber()
+    sub.subscribe(channel)
+    yield from _drain(sub, "event: ping\ndata: {}\n\n")
+
+def stream_many(channels, owner=None):
+    """Un solo stream para varios canales; el primer evento informa el streamId.
+    Solo `owner` puede cambiar sus canales después (ver update_stream)."""
+    sub = Subscriber(mux=True, owner=owner)
+    for channel in list(channels)[:MAX_CHANNELS]:
+        sub.subscribe(channel)
+    STREAMS[sub.id] = sub
+    ready = _format("ready", {"streamId": sub.id, "channels": sorted(sub.channels)})
+    yield from _drain(sub, ready)
+
+def update_stream(stream_id: str, owner, add=(), remove=()):
+    """Cambia los canales de un stream abierto; None si el stream no existe o
+    no lo abrió `owner` (los streams anónimos no se pueden cambiar)."""
+    sub = STREAMS.get(stream_id)
+    if sub is None or sub.owner is None or sub.owner != owner:
+        return None
+    for channel in remove:
+        sub.unsubscribe(channel)
+    for channel in add:
+        if len(sub.channels) >= MAX_CHANNELS:
+            break
+        sub.subscribe(channel)
+    return sorted(sub.channels)
 
 def sse_response(generator):
     return Response(
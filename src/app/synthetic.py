@@ -0,0 +1,206 @@
+# app/synthetic.py
+"""Datos sintéticos a escala de producción (`flask bench-seed` y benchmarks).
+
+La popularidad de lotes y la actividad de pujadores siguen una ley de Zipf:
+unos pocos lotes calientes concentran la mayoría de las pujas y unos pocos
+pujadores frecuentes hacen gran parte de ellas. Todo se inserta con
+INSERT executemany de Core, por lotes."""
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sqlalchemy import bindparam, func, insert, text, update
+from .extensions import bcrypt, db
+from .models import User, Vehicle, VehicleImage, Bid, Notification
+from .changefeed import allocate
+from .bid_summary import backfill
+
+BENCH_PASSWORD = "bench123"
+
+CATALOG = {
+    "Ford": ["Mustang", "Falcon", "F-100", "Bronco", "Thunderbird"],
+    "Chevrolet": ["Camaro", "Impala", "Bel Air", "Corvette", "C10"],
+    "Dodge": ["Charger", "Challenger", "Dart", "Coronet"],
+    "Volkswagen": ["Beetle", "Combi", "Golf", "Karmann Ghia"],
+    "Toyota": ["Land Cruiser", "Corolla", "Celica", "Hilux"],
+    "Porsche": ["911", "912", "356", "944"],
+    "Honda": ["Civic", "Accord", "CRX", "Prelude"],
+    "Nissan": ["Datsun 510", "240Z", "Skyline", "Tsuru"],
+}
+
+def _zipf_cum_weights(n, s):
+    return list(accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+class _Chunked:
+    """Acumula filas y las inserta con executemany cada `size`."""
+
+    def __init__(self, model, size):
+        self.model = model
+        self.size = size
+        self.rows = []
+        self.total = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            db.session.execute(insert(self.model), self.rows)
+            db.session.commit()
+            self.total += len(self.rows)
+            self.rows = []
+
+def generate(users=1000, vehicles=2000, bids=50000, batch_size=5000, skew=1.1,
+             seller_ratio=0.05, closed_ratio=0.3, notify_ratio=0.1, seed=42, echo=None):
+    """Genera usuarios, vehículos y pujas con sesgo; devuelve un resumen.
+
+    Los ids se asignan a partir del máximo actual, así que se puede ejecutar
+    varias veces sobre la misma base."""
+    echo = echo or (lambda msg: None)
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    pwd_hash = bcrypt.generate_password_hash(BENCH_PASSWORD).decode()
+
+    # --- Usuarios: un % de vendedores, el resto compradores ---
+    first_uid = _next_id(User)
+    n_sellers = max(1, int(users * seller_ratio))
+    seller_ids = list(range(first_uid, first_uid + n_sellers))
+    buyer_ids = list(range(first_uid + n_sellers, first_uid + users))
+    if not buyer_ids:
+        raise ValueError("Se necesita al menos un comprador.")
+    out = _Chunked(User, batch_size)
+    for uid in range(first_uid, first_uid + users):
+        out.add({
+            "id": uid,
+            "name": f"Bench {uid}",
+            "email": f"bench{uid}@carbid.bench",
+            "password_hash": pwd_hash,
+            "role": "seller" if uid < first_uid + n_sellers else "buyer",
+        })
+    out.flush()
+    echo(f"usuarios: {out.total}")
+
+    # --- Vehículos: parte cerrados (vencidos), parte activos ---
+    first_vid = _next_id(Vehicle)
+    vehicle_ids = list(range(first_vid, first_vid + vehicles))
+    lots = {}
+    makes = list(CATALOG)
+    seqs = allocate(vehicles)
+    out = _Chunked(Vehicle, batch_size)
+    for vid in vehicle_ids:
+        closed = rnd.random() < closed_ratio
+        if closed:
+            ends = now - timedelta(seconds=rnd.randint(3600, 30 * 86400))
+        else:
+            ends = now + timedelta(seconds=rnd.randint(60, 14 * 86400))
+        starts = ends - timedelta(days=7)
+        make = rnd.choice(makes)
+        base = rnd.randint(20, 2000) * 100
+        inc = rnd.choice((100, 500, 1000))
+        lots[vid] = {"base": base, "inc": inc, "start": starts, "end": min(ends, now),
+                     "seller": rnd.choice(seller_ids), "closed": closed}
+        out.add({
+            "id": vid,
+            "seller_id": lots[vid]["seller"],
+            "make": make,
+            "model": rnd.choice(CATALOG[make]),
+            "year": rnd.randint(1950, 2024),
+            "base_price": base,
+            "lot_code": f"BN{vid}",
+            "description": f"Vehículo sintético {vid}",
+            "status": "closed" if closed else "active",
+            "auction_start_at": starts,
+            "auction_end_at": ends,
+            "min_increment": inc,
+            "change_seq": seqs[vid - first_vid],
+        })
+    out.flush()
+    echo(f"vehículos: {out.total}")
+
+    out = _Chunked(VehicleImage, batch_size)
+    for vid in vehicle_ids:
+        for pos in range(rnd.randint(1, 6)):
+            out.add({"vehicle_id": vid, "position": pos,
+                     "url": f"https://img.carbid.bench/{vid}/{pos + 1}.jpg"})
+    out.flush()
+
+    # --- Pujas: lotes calientes y pujadores frecuentes (Zipf) ---
+    hot_order = vehicle_ids[:]
+    rnd.shuffle(hot_order)
+    power_order = buyer_ids[:]
+    rnd.shuffle(power_order)
+    lot_weights = _zipf_cum_weights(len(hot_order), skew)
+    bidder_weights = _zipf_cum_weights(len(power_order), skew)
+
+    first_bid = _next_id(Bid)
+    top = {}       # vid -> (bid_id, bidder_id, amount)
+    clock = {}     # vid -> hora de la última puja
+    out = _Chunked(Bid, batch_size)
+    notes = _Chunked(Notification, batch_size)
+    bid_id = first_bid
+    remaining = bids
+    while remaining > 0:
+        k = min(remaining, batch_size)
+        picks = rnd.choices(hot_order, cum_weights=lot_weights, k=k)
+        bidders = rnd.choices(power_order, cum_weights=bidder_weights, k=k)
+        for vid, uid in zip(picks, bidders):
+            lot = lots[vid]
+            prev = top.get(vid)
+            current = prev[2] if prev else lot["base"]
+            amount = current + lot["inc"] * rnd.choice((1, 1, 1, 2, 5))
+            at = clock.get(vid, lot["start"]) + timedelta(seconds=rnd.expovariate(1 / 600))
+            at = min(at, lot["end"])
+            clock[vid] = at
+            out.add({"id": bid_id, "vehicle_id": vid, "bidder_id": uid, "amount": amount,
+                     "created_at": at, "updated_at": at})
+            if prev and prev[1] != uid and rnd.random() < notify_ratio:
+                notes.add({"user_id": prev[1], "type": "outbid",
+                           "payload": {"vehicle_id": vid, "amount": amount},
+                           "created_at": at, "updated_at": at})
+            top[vid] = (bid_id, uid, amount)
+            bid_id += 1
+        remaining -= k
+        if remaining == 0 or (bids - remaining) % (batch_size * 20) == 0:
+            echo(f"pujas: {bids - remaining}/{bids}")
+    out.flush()
+    notes.flush()
+
+    # --- Ganadores de los lotes cerrados ---
+    winners = [{"vid": vid, "wid": t[0]} for vid, t in top.items() if lots[vid]["closed"]]
+    stmt = update(Vehicle.__table__).where(Vehicle.__table__.c.id == bindparam("vid")).values(
+        winner_bid_id=bindparam("wid")
+    )
+    for i in range(0, len(winners), batch_size):
+        db.session.execute(stmt, winners[i:i + batch_size])
+        db.session.commit()
+
+    # --- Watchlist: pujadores y vendedores de los lotes nuevos (INSERT ... SELECT) ---
+    db.session.execute(text("""
+        INSERT INTO watchlist (user_id, vehicle_id, auction_end_at, created_at, updated_at)
+        SELECT DISTINCT b.bidder_id, b.vehicle_id, v.auction_end_at, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM bids b JOIN vehicles v ON v.id = b.vehicle_id
+        WHERE b.id >= :first_bid
+    """), {"first_bid": first_bid})
+    db.session.execute(text("""
+        INSERT INTO watchlist (user_id, vehicle_id, auction_end_at, created_at, updated_at)
+        SELECT v.seller_id, v.id, v.auction_end_at, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM vehicles v WHERE v.id >= :first_vid
+    """), {"first_vid": first_vid})
+    db.session.commit()
+
+    # --- Resumen por usuario y lote de los lotes nuevos ---
+    backfill(batch_size=batch_size, first_vid=first_vid, echo=echo)
+
+    return {
+        "users": users,
+        "vehicles": vehicles,
+        "bids": bids,
+        "notifications": notes.total,
+        "hot_vehicle_ids": hot_order[:10],
+        "power_bidder_ids": power_order[:10],
+        "password": BENCH_PASSWORD,
+    }
@@ -1,66 +1,240 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import current_app
-from .extensions import db, socketio
-from .models import Vehicle, Bid, Notification
-from .sse import publish
+from sqlalchemy import select, union, or_
+from apscheduler.schedulers import SchedulerAlreadyRunningError
+from .extensions import db
+from .models import Vehicle, Bid, Watchlist
+from .realtime import broadcast_vehicle
+from .changefeed import prune as prune_change_log, stamp
+from .notify import bulk_insert_notifications, emit_notifications
+from .leader import leader
+from .idempotency import purge_expired
+from .retry import transactional
+from .archive import archive_closed_bids
+from . import ending_soon, facets
+
+CLOSE_CHUNK = 200
+
+@transactional("close_expired_auctions")
+def _close_chunk(ids):
+    """Cierra un grupo de lotes vencidos en una transacción.
+
+    Ganador y perdedores se notifican con un solo INSERT multi-fila; los
+    perdedores salen de un SELECT DISTINCT por grupo. Devuelve
+    ([(vid, bid_id, monto)], filas de notificación) para emitir tras el commit."""
+    to_close = Vehicle.query.filter(
+        Vehicle.id.in_(ids),
+        Vehicle.status == "active",
+    ).with_for_update().all()
+    if not to_close:
+        return [], []
+
+    closed, rows, winners = [], [], {}
+    for v in to_close:
+        win = v.bids.order_by(Bid.amount.desc()).first()
+        v.status = "closed"
+        if win:
+            v.winner_bid_id = win.id
+            winners[v.id] = (win.bidder_id, win.amount)
+            rows.append({"user_id": win.bidder_id, "type": "auction_won",
+                         "payload": {"vehicle_id": v.id, "amount": win.amount}})
+        closed.append((v.id, win.id if win else None, win.amount if win else None))
+
+    if winners:
+        pairs = db.session.execute(
+            select(Bid.vehicle_id, Bid.bidder_id).distinct().where(Bid.vehicle_id.in_(list(winners)))
+        ).all()
+        rows.extend(
+            {"user_id": uid, "type": "auction_lost",
+             "payload": {"vehicle_id": vid, "amount": winners[vid][1]}}
+            for vid, uid in pairs if uid != winners[vid][0]
+        )
+    bulk_insert_notifications(rows)
+    stamp(*to_close)
+    db.session.commit()
+    return closed, rows
 
 def close_expired_auctions(app=None):
-    """Cierra subastas vencidas (con contexto de app y sesión limpia)."""
+    """Cierra subastas vencidas por grupos (con contexto de app y sesión limpia).
+    Los eventos salen después de cada commit: un reintento no los duplica."""
     if app is None:
         app = current_app._get_current_object()
     with app.app_context():
         try:
-            now = datetime.utcnow()
-            to_close = Vehicle.query.filter(
+            due = [vid for (vid,) in db.session.query(Vehicle.id).filter(
                 Vehicle.status == "active",
-                Vehicle.auction_end_at <= now
-            ).with_for_update(read=True).all()
-
-            changed = False
-            for v in to_close:
-                win = v.bids.order_by(Bid.amount.desc()).first()
-                v.status = "closed"
-                if win:
-                    v.winner_bid_id = win.id
-                    # Notifica ganador
-                    db.session.add(Notification(
-                        user_id=win.bidder_id,
-                        type="auction_won",
-                        payload={"vehicle_id": v.id, "amount": win.amount}
-                    ))
-                    # SSE
-                    publish(f"vehicle:{v.id}", "closed", {
-                        "vehicleId": v.id, "winnerBidId": win.id, "amount": win.amount
-                    })
-                    # Socket.IO
-                    socketio.emit("closed", {
-                        "vehicleId": v.id, "winnerBidId": win.id, "amount": win.amount
-                    }, to=f"vehicle:{v.id}", namespace="/rt")
-                    socketio.emit("notification", {
-                        "type": "auction_won",
-                        "payload": {"vehicle_id": v.id, "amount": win.amount}
-                    }, to=f"user:{win.bidder_id}", namespace="/rt")
-                else:
-                    publish(f"vehicle:{v.id}", "closed", {
-                        "vehicleId": v.id, "winnerBidId": None
-                    })
-                    socketio.emit("closed", {
-                        "vehicleId": v.id, "winnerBidId": None
-                    }, to=f"vehicle:{v.id}", namespace="/rt")
-                changed = True
-
-            if changed:
-                db.session.commit()
+                Vehicle.auction_end_at <= datetime.utcnow(),
+            ).order_by(Vehicle.id).all()]
+            db.session.rollback()
+            total = 0
+            for i in range(0, len(due), CLOSE_CHUNK):
+                closed, rows = _close_chunk(due[i:i + CLOSE_CHUNK])
+                # SSE + Socket.IO
+                for vid, bid_id, amount in closed:
+                    payload = {"vehicleId": vid, "winnerBidId": bid_id}
+                    if bid_id is not None:
+                        payload["amount"] = amount
+                    broadcast_vehicle(vid, "closed", payload)
+                # Un frame por usuario (ganó y/o perdió), cediendo cada lote de usuarios
+                emit_notifications(rows)
+                total += len(closed)
+            return total
         finally:
             db.session.remove()
 
+REMINDER_CHUNK = 500
+
+def _remind_chunk(chunk, minutes):
+    """Destinatarios distintos (pujadores ∪ seguidores) de un grupo de lotes, en una consulta."""
+    lots = dict(chunk)
+    ids = list(lots)
+    pairs = db.session.execute(union(
+        select(Watchlist.user_id, Watchlist.vehicle_id).where(Watchlist.vehicle_id.in_(ids)),
+        select(Bid.bidder_id, Bid.vehicle_id).where(Bid.vehicle_id.in_(ids)),
+    )).all()
+    rows = [{
+        "user_id": uid,
+        "type": "reminder",
+        "payload": {
+            "vehicle_id": vid,
+            "minutes": minutes,
+            "message": f"El lote {lots[vid]} cierra en {minutes} min",
+        },
+    } for uid, vid in pairs]
+    bulk_insert_notifications(rows)
+    # Marca del horizonte en la misma transacción: re-ejecutar no duplica
+    Vehicle.query.filter(Vehicle.id.in_(ids)).update(
+        {Vehicle.reminded_minutes: minutes}, synchronize_session=False
+    )
+    return rows
+
+def dispatch_reminders(app=None, now=None):
+    """Recordatorios de cierre por cubetas de `auction_end_at` (p. ej. 10 y 60 min)."""
+    if app is None:
+        app = current_app._get_current_object()
+    with app.app_context():
+        try:
+            now = now or datetime.utcnow()
+            total = 0
+            # Del horizonte menor al mayor: un lote que entra directo en 10 min
+            # no recibe además el de 60.
+            for minutes in sorted(app.config.get("REMINDER_HORIZONS_MINUTES", [60, 10])):
+                lots = db.session.query(Vehicle.id, Vehicle.lot_code).filter(
+                    Vehicle.status == "active",
+                    Vehicle.auction_end_at > now,
+                    Vehicle.auction_end_at <= now + timedelta(minutes=minutes),
+                    or_(Vehicle.reminded_minutes.is_(None), Vehicle.reminded_minutes > minutes),
+                ).all()
+                for i in range(0, len(lots), REMINDER_CHUNK):
+                    rows = _remind_chunk(lots[i:i + REMINDER_CHUNK], minutes)
+                    db.session.commit()
+                    emit_notifications(rows)
+                    total += len(rows)
+            return total
+        finally:
+            db.session.remove()
+
+def run_as_leader(func, app):
+    """Ejecuta el job solo en el proceso que tiene el liderazgo."""
+    if not leader.is_leader:
+        return None
+    return func(app)
+
 def schedule_jobs(scheduler, app):
+    # Elección de líder: arranca de inmediato y se repite cada pocos segundos
+    # para que otro proceso tome el relevo si el líder muere.
+    scheduler.add_job(
+        id="leader_heartbeat",
+        func=leader.heartbeat,
+        trigger="interval",
+        seconds=app.config.get("LEADER_HEARTBEAT_SECONDS", 5),
+        args=[app],
+        next_run_time=datetime.now(),
+        coalesce=True,
+        max_instances=1,
+    )
     scheduler.add_job(
         id="close_auctions",
-        func=close_expired_auctions,
+        func=run_as_leader,
         trigger="interval",
         seconds=30,
+        args=[close_expired_auctions, app],
+        coalesce=True,
+        max_instances=1,
+    )
+
+    scheduler.add_job(
+        id="dispatch_reminders",
+        func=run_as_leader,
+        trigger="interval",
+        seconds=60,
+        args=[dispatch_reminders, app],
+        coalesce=True,
+        max_instances=1,
+    )
+
+    scheduler.add_job(
+        id="prune_change_log",
+        func=run_as_leader,
+        trigger="interval",
+        minutes=60,
+        args=[prune_change_log, app],
+        coalesce=True,
+        max_instances=1,
+    )
+
+    if app.config.get("BID_ARCHIVE_ENABLED", True):
+        scheduler.add_job(
+            id="archive_closed_bids",
+            func=run_as_leader,
+            trigger="interval",
+            seconds=app.config.get("BID_ARCHIVE_INTERVAL_SECONDS", 3600),
+            args=[archive_closed_bids, app],
+            coalesce=True,
+            max_instances=1,
+        )
+
+    # Índice local de cada proceso (no solo el líder); el primer run lo arma
+    scheduler.add_job(
+        id="verify_ending_soon",
+        func=ending_soon.verify,
+        trigger="interval",
+        seconds=app.config.get("ENDING_SOON_VERIFY_SECONDS", 300),
+        args=[app],
+        next_run_time=datetime.now(),
+        coalesce=True,
+        max_instances=1,
+    )
+
+    scheduler.add_job(
+        id="verify_facets",
+        func=facets.verify,
+        trigger="interval",
+        seconds=app.config.get("FACETS_VERIFY_SECONDS", 300),
         args=[app],
+        next_run_time=datetime.now(),
         coalesce=True,
         max_instances=1,
     )
+
+    if app.config.get("IDEMPOTENCY_BACKEND") == "db":
+        scheduler.add_job(
+            id="purge_idempotency_keys",
+            func=run_as_leader,
+            trigger="interval",
+            minutes=10,
+            args=[purge_expired, app],
+            coalesce=True,
+            max_instances=1,
+        )
+
+def start_scheduler(scheduler, app):
+    """Arranque perezoso: al servir la primera petición o conexión /rt, o desde
+    post_worker_init en gunicorn. Nunca en create_app: los comandos `flask`
+    no lanzan threads ni entran a la elección de líder."""
+    if scheduler.running or not app.config.get("SCHEDULER_ENABLED", True):
+        return
+    try:
+        scheduler.start()
+    except SchedulerAlreadyRunningError:
+        pass
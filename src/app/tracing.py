@@ -0,0 +1,81 @@
+# app/tracing.py
+"""Trazas de latencia de pujas: commit → emit → ack, por transporte.
+
+Cada `top-updated` lleva `traceId` y `committedAt` (epoch en ms, reloj del
+servidor). Se registran en histogramas de `metrics`:
+
+- bid.<fase>_ms: lock_wait, insert, commit, fanout dentro de place_bid.
+- latency.<socketio|sse>.commit_to_emit: del commit a entregar el frame
+  (Socket.IO: al encolarlo en la sala; SSE: al escribirlo en el stream).
+- latency.<socketio|sse>.commit_to_ack: del commit al ack del cliente.
+  Solo una muestra de eventos (TRACE_ACK_SAMPLE_RATE) pide ack con
+  `ackRequested: true` y un `ackToken` (HMAC de traceId y committedAt); el
+  cliente responde con el evento `ack` (Socket.IO) o POST /api/sse/acks
+  (con JWT), devolviendo traceId, committedAt y ackToken. Sin token válido,
+  con committedAt futuro o más viejo que MAX_ACK_AGE_MS, el ack se descarta:
+  así un cliente no puede inventar latencias."""
+import hashlib
+import hmac
+import random
+import time
+import uuid
+from flask import current_app, has_app_context
+from . import metrics
+
+TRANSPORTS = ("socketio", "sse")
+# Acks más viejos que esto se descartan (relojes o clientes rotos)
+MAX_ACK_AGE_MS = 60_000
+
+def now_ms():
+    return time.time() * 1000
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+def ack_token(trace_id, committed_at):
+    """Firma de (traceId, committedAt): sin estado, vale en cualquier worker."""
+    msg = f"{trace_id}:{float(committed_at)!r}".encode()
+    key = current_app.config["SECRET_KEY"].encode()
+    return hmac.new(key, msg, hashlib.sha256).hexdigest()[:32]
+
+def stamp_event(payload):
+    """Agrega traceId/committedAt (llamar justo después del commit)."""
+    payload["traceId"] = new_trace_id()
+    payload["committedAt"] = round(now_ms(), 3)
+    rate = current_app.config.get("TRACE_ACK_SAMPLE_RATE", 0.0) if has_app_context() else 0.0
+    if rate and random.random() < rate:
+        payload["ackRequested"] = True
+        payload["ackToken"] = ack_token(payload["traceId"], payload["committedAt"])
+    return payload
+
+def record_emit(transport, committed_at):
+    if committed_at:
+        metrics.observe(f"latency.{transport}.commit_to_emit", now_ms() - committed_at)
+
+def record_ack(transport, ack):
+    """Registra un ack ({"traceId", "committedAt", "ackToken"}); False si se descartó."""
+    if transport not in TRANSPORTS or not isinstance(ack, dict):
+        return False
+    committed_at, token = ack.get("committedAt"), ack.get("ackToken")
+    try:
+        age = now_ms() - float(committed_at)
+    except (TypeError, ValueError):
+        return False
+    if not 0 <= age <= MAX_ACK_AGE_MS or not isinstance(token, str):
+        return False
+    if not hmac.compare_digest(token, ack_token(ack.get("traceId"), committed_at)):
+        return False
+    metrics.observe(f"latency.{transport}.commit_to_ack", age)
+    return True
+
+class Phases:
+    """Cronómetro por fases: cada `mark(fase)` registra el tramo desde la anterior."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._t = time.perf_counter()
+
+    def mark(self, phase):
+        t = time.perf_counter()
+        metrics.observe(f"{self.prefix}.{phase}_ms", (t - self._t) * 1000)
+        self._t = t
@@ -0,0 +1,70 @@
+# benchmarks/bench_archive.py
+"""Archivo en frío de pujas: throughput del job (pujas/s, ms por grupo) y
+efecto en la tabla caliente (filas de `bids`), en el listado de pujas de un
+lote archivado y en el historial del pujador más frecuente.
+
+Uso: python -m benchmarks.bench_archive [--users 2000] [--vehicles 5000] [--bids 500000] [--closed-ratio 0.6]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_app, percentile
+from app import archive, metrics
+from app.extensions import db
+from app.models import Bid, Vehicle
+from app.synthetic import generate
+from flask_jwt_extended import create_access_token
+
+def timed(client, path, headers, reps):
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        assert client.get(path, headers=headers).status_code == 200
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return round(percentile(samples, 50), 2)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--vehicles", type=int, default=5000)
+    ap.add_argument("--bids", type=int, default=500_000)
+    ap.add_argument("--closed-ratio", type=float, default=0.6)
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seeded = generate(users=args.users, vehicles=args.vehicles, bids=args.bids, closed_ratio=args.closed_ratio)
+        # Los lotes cerrados pasan a ser viejos
+        Vehicle.query.filter_by(status="closed").update(
+            {Vehicle.auction_end_at: datetime.utcnow() - timedelta(days=365)}, synchronize_session=False)
+        db.session.commit()
+        lot = next(vid for vid in seeded["hot_vehicle_ids"]
+                   if db.session.get(Vehicle, vid).status == "closed")
+        uid = seeded["power_bidder_ids"][0]
+        token = {"Authorization": f"Bearer {create_access_token(identity=str(uid))}"}
+        hot_before = db.session.query(Bid).count()
+    client = app.test_client()
+    paths = {"list_bids": f"/api/vehicles/{lot}/bids", "my_history": "/api/users/me/history"}
+    before = {name: timed(client, path, token, args.reps) for name, path in paths.items()}
+    same = {name: client.get(path, headers=token).get_json() for name, path in paths.items()}
+
+    archive.archive_closed_bids(app, limit=0)
+    run = archive.stats()["lastRun"]
+    chunk = metrics.snapshot()["histograms"]["archive.chunk_ms"]
+    for name, path in paths.items():
+        assert client.get(path, headers=token).get_json() == same[name], name
+    after = {name: timed(client, path, token, args.reps) for name, path in paths.items()}
+    with app.app_context():
+        hot_after = db.session.query(Bid).count()
+
+    print(json.dumps({"bench": "archive", "bids": args.bids, "closed_ratio": args.closed_ratio,
+                      "hot_rows": {"before": hot_before, "after": hot_after}, "run": run,
+                      "chunk_ms": {k: chunk[k] for k in ("count", "p50Ms", "p99Ms")},
+                      "p50_ms": {"before": before, "after": after}}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_bid_summary.py
+""""Mis pujas activas" de los pujadores más frecuentes: agregando `bids`
+(máximo, cantidad y última puja por lote, más el máximo del lote para saber
+si lidera) frente al rango sobre user_vehicle_bid_summary. También mide el
+backfill completo.
+
+Uso: python -m benchmarks.bench_bid_summary [--users 2000] [--vehicles 5000] [--bids 500000] [--reps 50]
+"""
+import argparse
+import json
+import time
+from sqlalchemy import func
+
+from benchmarks.common import make_app, percentile
+from app.bid_summary import backfill
+from app.extensions import db
+from app.models import Bid, UserVehicleBidSummary as S, Vehicle
+from app.synthetic import generate
+
+def from_bids(uid):
+    mine = (
+        db.session.query(Bid.vehicle_id, func.max(Bid.amount).label("mine"), func.count(Bid.id).label("n"),
+                         func.max(Bid.created_at).label("last"))
+        .filter(Bid.bidder_id == uid).group_by(Bid.vehicle_id).subquery()
+    )
+    top = (
+        db.session.query(Bid.vehicle_id, func.max(Bid.amount).label("top"))
+        .filter(Bid.vehicle_id.in_(db.session.query(mine.c.vehicle_id)))
+        .group_by(Bid.vehicle_id).subquery()
+    )
+    rows = (
+        db.session.query(mine.c.vehicle_id, mine.c.mine, mine.c.n, mine.c.last, top.c.top)
+        .join(Vehicle, Vehicle.id == mine.c.vehicle_id)
+        .join(top, top.c.vehicle_id == mine.c.vehicle_id)
+        .filter(Vehicle.status == "active")
+        .all()
+    )
+    return sorted((vid, m, n, m == t) for vid, m, n, _, t in rows)
+
+def from_summary(uid):
+    rows = (
+        db.session.query(S.vehicle_id, S.max_amount, S.bid_count, S.is_leading)
+        .join(Vehicle, Vehicle.id == S.vehicle_id)
+        .filter(S.user_id == uid, Vehicle.status == "active")
+        .all()
+    )
+    return sorted((vid, m, n, bool(lead)) for vid, m, n, lead in rows)
+
+def timed(fn, reps):
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {"p50_ms": round(percentile(samples, 50), 3), "p99_ms": round(percentile(samples, 99), 3)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--vehicles", type=int, default=5000)
+    ap.add_argument("--bids", type=int, default=500_000)
+    ap.add_argument("--reps", type=int, default=50)
+    args = ap.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seeded = generate(users=args.users, vehicles=args.vehicles, bids=args.bids)
+        t0 = time.perf_counter()
+        rows = backfill()
+        backfill_s = round(time.perf_counter() - t0, 2)
+        results = []
+        for uid in seeded["power_bidder_ids"][:3]:
+            assert from_bids(uid) == from_summary(uid)
+            raw = db.session.query(func.count(Bid.id)).filter(Bid.bidder_id == uid).scalar()
+            results.append({"user": uid, "raw_bids": raw, "active_lots": len(from_summary(uid)),
+                            "bids_ms": timed(lambda: from_bids(uid), args.reps),
+                            "summary_ms": timed(lambda: from_summary(uid), args.reps)})
+
+    print(json.dumps({"bench": "bid_summary", "bids": args.bids, "summary_rows": rows,
+                      "backfill_seconds": backfill_s, "users": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_close.py
+"""Cierre de un lote con 5.000 pujadores distintos: notificaciones
+`auction_lost` fila por fila (ORM + un emit por usuario) frente al cierre
+por grupos (SELECT DISTINCT + INSERT multi-fila + frames por lote).
+
+Uso: python -m benchmarks.bench_close [--bidders 5000] [--lots 200]
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, update
+
+from benchmarks.common import make_app, measure
+from app.extensions import db, socketio
+from app.models import Bid, Notification, User, Vehicle
+from app.notify import notify_user
+from app.tasks import close_expired_auctions
+
+def seed(app, bidders, lots):
+    past = datetime.utcnow() - timedelta(minutes=1)
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"id": i, "name": f"U{i}", "email": f"u{i}@bench.local", "password_hash": "x",
+             "role": "seller" if i == 1 else "buyer"}
+            for i in range(1, bidders + 2)
+        ])
+        db.session.execute(insert(Vehicle), [
+            {"id": i, "seller_id": 1, "make": "Ford", "model": "T", "year": 1990,
+             "base_price": 1000, "lot_code": f"CL{i}", "min_increment": 100, "auction_end_at": past}
+            for i in range(1, lots + 1)
+        ])
+        # Lote 1: una puja por pujador; el resto: 10 pujadores cada uno
+        bids = [{"vehicle_id": 1, "bidder_id": uid, "amount": 1000 + uid * 100}
+                for uid in range(2, bidders + 2)]
+        bids += [{"vehicle_id": vid, "bidder_id": 2 + (vid * 7 + k) % bidders, "amount": 1100 + k * 100}
+                 for vid in range(2, lots + 1) for k in range(10)]
+        db.session.execute(insert(Bid), bids)
+        db.session.commit()
+
+def reset(app):
+    with app.app_context():
+        db.session.execute(update(Vehicle).values(status="active", winner_bid_id=None))
+        db.session.execute(delete(Notification))
+        db.session.commit()
+
+def close_row_by_row(app):
+    """Referencia: cada lote y cada perdedor por separado."""
+    with app.app_context():
+        for v in Vehicle.query.filter(Vehicle.status == "active").all():
+            win = v.bids.order_by(Bid.amount.desc()).first()
+            v.status = "closed"
+            v.winner_bid_id = win.id
+            db.session.add(Notification(user_id=win.bidder_id, type="auction_won",
+                                        payload={"vehicle_id": v.id, "amount": win.amount}))
+            losers = {b.bidder_id for b in v.bids} - {win.bidder_id}
+            for uid in losers:
+                db.session.add(Notification(user_id=uid, type="auction_lost",
+                                            payload={"vehicle_id": v.id, "amount": win.amount}))
+            db.session.commit()
+            notify_user(win.bidder_id, "auction_won", {"vehicle_id": v.id, "amount": win.amount})
+            for uid in losers:
+                notify_user(uid, "auction_lost", {"vehicle_id": v.id, "amount": win.amount})
+        db.session.remove()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bidders", type=int, default=5000)
+    ap.add_argument("--lots", type=int, default=200)
+    args = ap.parse_args()
+
+    app = make_app()
+    seed(app, args.bidders, args.lots)
+
+    frames = [0]
+    emit = socketio.emit
+
+    def counting_emit(*a, **kw):
+        frames[0] += 1
+        return emit(*a, **kw)
+
+    socketio.emit = counting_emit
+    results = {}
+    for name, run in (("row_by_row", close_row_by_row), ("chunked", close_expired_auctions)):
+        reset(app)
+        frames[0] = 0
+        with measure(app) as stats:
+            run(app)
+        with app.app_context():
+            stats["notifications"] = Notification.query.count()
+        # closed/broadcast de cada lote + frames a usuarios
+        stats["socketio_frames"] = frames[0]
+        results[name] = stats
+    socketio.emit = emit
+
+    print(json.dumps({"bench": "close", "bidders_on_hot_lot": args.bidders, "lots": args.lots,
+                      **results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_edge.py
+"""Borde HTTP: bytes de `list_vehicles`/`list_bids` con y sin gzip, y
+preflights por minuto de un navegador con y sin Access-Control-Max-Age.
+
+Sin Max-Age el navegador guarda el preflight 5 s (Chromium/Firefox), así
+que un cliente que llama a la API cada pocos segundos repite el OPTIONS
+casi siempre. Se simula un minuto de uso con ese caché y se cuentan los
+OPTIONS que llegan a la app (métrica `preflight`).
+
+Uso: python -m benchmarks.bench_edge [--vehicles 2000] [--bids 20000] [--interval 2]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import make_app
+from app import metrics
+from app.extensions import db
+from app.synthetic import generate
+from flask_jwt_extended import create_access_token
+
+ORIGIN = "https://cbid.click"
+BROWSER_DEFAULT_MAX_AGE = 5
+
+def _bytes(client, path, headers, repeat=20):
+    plain = client.get(path, headers=headers)
+    gz_headers = {**headers, "Accept-Encoding": "gzip, deflate, br"}
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        gz = client.get(path, headers=gz_headers)
+    ms = (time.perf_counter() - t0) * 1000 / repeat
+    return {"plain_bytes": len(plain.data), "gzip_bytes": len(gz.data),
+            "saved_pct": round(100 * (1 - len(gz.data) / len(plain.data)), 1),
+            "gzip_request_ms": round(ms, 2)}
+
+def _preflights_per_minute(client, calls, interval, honour_max_age):
+    """Simula 60 s de llamadas autenticadas con el caché de preflight del navegador."""
+    metrics.reset()
+    cache = {}   # (método, ruta) -> vence en (segundos simulados)
+    for second in range(0, 60, interval):
+        for method, path in calls:
+            if cache.get((method, path), -1) > second:
+                continue
+            r = client.options(path, headers={
+                "Origin": ORIGIN,
+                "Access-Control-Request-Method": method,
+                "Access-Control-Request-Headers": "authorization",
+            })
+            max_age = int(r.headers.get("Access-Control-Max-Age", 0)) if honour_max_age else 0
+            cache[(method, path)] = second + (max_age or BROWSER_DEFAULT_MAX_AGE)
+    return metrics.COUNTERS.get("preflight", 0)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vehicles", type=int, default=2000)
+    ap.add_argument("--bids", type=int, default=20000)
+    ap.add_argument("--interval", type=int, default=2, help="Segundos entre rondas de llamadas.")
+    args = ap.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seeded = generate(users=300, vehicles=args.vehicles, bids=args.bids)
+        db.session.remove()
+        token = create_access_token(identity=str(seeded["power_bidder_ids"][0]))
+    hot = seeded["hot_vehicle_ids"][0]
+    client = app.test_client()
+    auth = {"Authorization": f"Bearer {token}"}
+
+    calls = [("GET", "/api/users/me/notifications"), ("GET", f"/api/vehicles/{hot}/bids"),
+             ("POST", f"/api/vehicles/{hot}/bids")]
+    print(json.dumps({
+        "bench": "edge",
+        "vehicles": args.vehicles,
+        "bids": args.bids,
+        "list_vehicles": _bytes(client, "/api/vehicles", {}),
+        "list_bids": _bytes(client, f"/api/vehicles/{hot}/bids", auth),
+        "preflights_per_minute": {
+            "before": _preflights_per_minute(client, calls, args.interval, honour_max_age=False),
+            "after": _preflights_per_minute(client, calls, args.interval, honour_max_age=True),
+        },
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
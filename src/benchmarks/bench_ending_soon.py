@@ -0,0 +1,84 @@
+# benchmarks/bench_ending_soon.py
+"""Rail "cierra pronto": consulta ordenada por auction_end_at (sobre
+ix_vehicles_status_end, con el precio agrupado de las pujas) frente al
+índice en memoria. También mide la reconstrucción completa (verificación).
+
+Uso: python -m benchmarks.bench_ending_soon [--vehicles 100000] [--limit 20] [--reps 200]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert
+
+from benchmarks.common import make_app, percentile
+from app.extensions import db
+from app.models import Bid, User, Vehicle
+from app import ending_soon
+
+def seed(app, vehicles):
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"id": 1, "name": "S", "email": "s@bench.local", "password_hash": "x", "role": "seller"},
+            {"id": 2, "name": "B", "email": "b@bench.local", "password_hash": "x", "role": "buyer"},
+        ])
+        db.session.execute(insert(Vehicle), [
+            {"id": i, "seller_id": 1, "make": "Ford", "model": "T", "year": 1990, "base_price": 1000,
+             "lot_code": f"ES{i}", "min_increment": 100,
+             "auction_end_at": now + timedelta(seconds=(i * 7919) % (14 * 86400))}
+            for i in range(1, vehicles + 1)
+        ])
+        db.session.execute(insert(Bid), [
+            {"vehicle_id": 1 + (k * 31) % vehicles, "bidder_id": 2, "amount": 1100 + k}
+            for k in range(vehicles)
+        ])
+        db.session.commit()
+
+def from_db(limit):
+    """Lo que haría el endpoint sin índice: lotes + precio actual, ordenados."""
+    rows = (
+        db.session.query(Vehicle.id, Vehicle.base_price, Vehicle.auction_end_at)
+        .filter(Vehicle.status == "active", Vehicle.auction_end_at >= datetime.utcnow())
+        .order_by(Vehicle.auction_end_at.asc())
+        .limit(limit)
+        .all()
+    )
+    ids = [r.id for r in rows]
+    tops = dict(
+        db.session.query(Bid.vehicle_id, func.max(Bid.amount))
+        .filter(Bid.vehicle_id.in_(ids)).group_by(Bid.vehicle_id).all()
+    )
+    return [(r.id, max(r.base_price, tops.get(r.id) or 0)) for r in rows]
+
+def timed(fn, reps):
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {"p50_ms": round(percentile(samples, 50), 4), "p99_ms": round(percentile(samples, 99), 4)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vehicles", type=int, default=100000)
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--reps", type=int, default=200)
+    args = ap.parse_args()
+
+    app = make_app()
+    seed(app, args.vehicles)
+    with app.app_context():
+        t0 = time.perf_counter()
+        ending_soon.build()
+        rebuild_s = round(time.perf_counter() - t0, 3)
+        db_stats = timed(lambda: from_db(args.limit), args.reps)
+        assert [e["id"] for e in ending_soon.soonest(args.limit)] == [vid for vid, _ in from_db(args.limit)]
+    index_stats = timed(lambda: ending_soon.soonest(args.limit), args.reps)
+
+    print(json.dumps({"bench": "ending_soon", "vehicles": args.vehicles, "limit": args.limit,
+                      "db": db_stats, "index": index_stats, "rebuild_seconds": rebuild_s}, indent=2))
+
+if __name__ == "__main__":
+    main()
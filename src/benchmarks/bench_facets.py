@@ -0,0 +1,127 @@
+# benchmarks/bench_facets.py
+"""Facetas del catálogo a 500k lotes activos: conteos en vivo (un GROUP BY
+por faceta sobre vehicles unido al máximo de pujas, con los demás filtros)
+frente al índice incremental, que es lo que sirve GET /api/vehicles/facets;
+y el listado filtrado por make/año/precio en SQL, como lo resuelve
+list_vehicles. También mide la construcción.
+
+Uso: python -m benchmarks.bench_facets [--vehicles 500000] [--reps 5]
+"""
+import argparse
+import json
+import resource
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import case, func, insert
+
+from benchmarks.common import make_app, percentile
+from app.extensions import db
+from app.models import Bid, User, Vehicle
+from app import facets
+
+MAKES = [f"Marca{i:02d}" for i in range(40)]
+SCENARIOS = {
+    "none": {},
+    "make": {"make": "Marca07"},
+    "make_decade_price": {"make": "Marca07", "decade": 1970, "min_price": 50_000},
+}
+
+def seed(app, vehicles, batch=50_000):
+    end = datetime.utcnow() + timedelta(days=7)
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"id": 1, "name": "S", "email": "s@bench.local", "password_hash": "x", "role": "seller"},
+            {"id": 2, "name": "B", "email": "b@bench.local", "password_hash": "x", "role": "buyer"},
+        ])
+        for start in range(1, vehicles + 1, batch):
+            ids = range(start, min(start + batch, vehicles + 1))
+            db.session.execute(insert(Vehicle), [
+                {"id": i, "seller_id": 1, "make": MAKES[i % 40], "model": f"M{i % 400}",
+                 "year": 1950 + (i * 7) % 71, "base_price": 1000 + (i * 7919) % 2_000_000,
+                 "lot_code": f"FC{i}", "min_increment": 100, "auction_end_at": end}
+                for i in ids
+            ])
+            # Un lote de cada tres tiene pujas
+            db.session.execute(insert(Bid), [
+                {"vehicle_id": i, "bidder_id": 2, "amount": 1000 + (i * 7919) % 2_000_000 + 500}
+                for i in ids if i % 3 == 0
+            ])
+        db.session.commit()
+
+def _price_expr(top):
+    return case((top.c.top > Vehicle.base_price, top.c.top), else_=Vehicle.base_price)
+
+def live_counts(filters):
+    """Lo que haría el endpoint sin índice: un GROUP BY por faceta."""
+    result = {}
+    for name in facets.FACETS:
+        others = {k: v for k, v in filters.items() if facets.FILTER_GROUPS[k] != name}
+        top = (
+            db.session.query(Bid.vehicle_id, func.max(Bid.amount).label("top"))
+            .group_by(Bid.vehicle_id).subquery()
+        )
+        price = _price_expr(top)
+        key = {
+            "make": Vehicle.make,
+            "model": Vehicle.model,
+            "decade": (Vehicle.year / 10) * 10,
+            "priceBand": case(*[(price >= b, b) for b in reversed(facets.PRICE_BANDS[1:])], else_=0),
+        }[name]
+        q = (
+            db.session.query(key, func.count())
+            .select_from(Vehicle)
+            .outerjoin(top, top.c.vehicle_id == Vehicle.id)
+            .filter(Vehicle.status == "active")
+        )
+        if others:
+            q = facets.sql_filter(q, others)
+        result[name] = dict(q.group_by(key).all())
+    return result
+
+def live_ids(filters):
+    q = db.session.query(Vehicle.id).filter(Vehicle.status == "active")
+    return {vid for (vid,) in facets.sql_filter(q, filters).all()}
+
+def timed(fn, reps):
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return round(percentile(samples, 50), 2)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vehicles", type=int, default=500_000)
+    ap.add_argument("--reps", type=int, default=5)
+    args = ap.parse_args()
+
+    app = make_app()
+    seed(app, args.vehicles)
+    results = {}
+    with app.app_context():
+        rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        t0 = time.perf_counter()
+        facets.build()
+        build_s = round(time.perf_counter() - t0, 2)
+        rss_mb = round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0) / 1024, 1)
+        for name, filters in SCENARIOS.items():
+            results[name] = {
+                "filters": filters,
+                "facet_counts_ms": {"sql": timed(lambda: live_counts(filters), args.reps),
+                                    "index": timed(lambda: facets.counts(filters), args.reps)},
+            }
+            if filters:
+                results[name]["list_ids_ms"] = timed(lambda: live_ids(filters), args.reps)
+        # Mantenimiento incremental: una puja que cambia de banda
+        t0 = time.perf_counter()
+        for vid in range(1, 1001):
+            facets.on_event(vid, "top-updated", {"top": 5_000_000 + vid})
+        event_us = round((time.perf_counter() - t0) * 1000, 1)
+
+    print(json.dumps({"bench": "facets", "vehicles": args.vehicles, "build_seconds": build_s,
+                      "build_rss_mb": rss_mb, "rebid_1000_events_ms": event_us, **results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_fields.py
+"""Representación completa frente a `?fields=` con el set típico de la app
+móvil, en catálogo, detalle, pujas de un lote e historial del usuario.
+
+Por endpoint: bytes leídos de la BD (valores de las filas devueltas por el
+driver), sentencias, CPU por petición y tamaño del JSON.
+
+Uso: python -m benchmarks.bench_fields [--vehicles 2000] [--bids 500] [--reps 20]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert
+from flask_jwt_extended import create_access_token
+
+from benchmarks.common import make_app
+from app.extensions import db
+from app.models import Bid, User, Vehicle, VehicleImage
+
+MOBILE = {
+    "list": "id,make,model,currentPrice,images,endsAt",
+    "detail": "id,make,model,currentPrice,minIncrement,endsAt,images",
+    "bids": "amount,createdAt",
+    "history": "vehicleId,make,model,amount,won",
+}
+
+def seed(app, vehicles, bids):
+    end = datetime.utcnow() + timedelta(days=3)
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"id": 1, "name": "S", "email": "s@bench.local", "password_hash": "x", "role": "seller"},
+            {"id": 2, "name": "B", "email": "b@bench.local", "password_hash": "x", "role": "buyer"},
+        ])
+        db.session.execute(insert(Vehicle), [
+            {"id": i, "seller_id": 1, "make": "Ford", "model": f"Modelo {i % 40}", "year": 1960 + i % 60,
+             "base_price": 1000 + i, "lot_code": f"FS{i}", "min_increment": 100, "auction_end_at": end,
+             "description": "Unico dueño, papeles al día, motor revisado. " * 20}
+            for i in range(1, vehicles + 1)
+        ])
+        db.session.execute(insert(VehicleImage), [
+            {"vehicle_id": i, "position": p, "url": f"/media/{i:064x}/original.jpg",
+             "variants": {"thumb": {"url": f"/media/{i:064x}/thumb.jpg", "w": 320, "h": 240},
+                          "medium": {"url": f"/media/{i:064x}/medium.jpg", "w": 1024, "h": 768}}}
+            for i in range(1, vehicles + 1) for p in range(3)
+        ])
+        # Lote 1 caliente; el usuario 2 puja en muchos lotes
+        db.session.execute(insert(Bid), [
+            {"vehicle_id": 1 + (k % 50) * (k % 2), "bidder_id": 2, "amount": 2000 + k * 100}
+            for k in range(bids)
+        ])
+        db.session.commit()
+        return create_access_token(identity="2")
+
+def _value_bytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, str)):
+        return len(value if isinstance(value, bytes) else value.encode())
+    return 8
+
+def measure_db_bytes(app, client, url, headers):
+    """Repite cada SELECT en una conexión aparte y suma el tamaño de lo devuelto."""
+    stats = {"db_bytes": 0, "queries": 0}
+    with app.app_context():
+        engine = db.engine
+
+    def _count(conn, cursor, statement, params, context, executemany):
+        stats["queries"] += 1
+        raw = conn.connection.dbapi_connection.cursor()
+        for row in raw.execute(statement, params):
+            stats["db_bytes"] += sum(_value_bytes(v) for v in row)
+        raw.close()
+
+    event.listen(engine, "after_cursor_execute", _count)
+    try:
+        client.get(url, headers=headers)
+    finally:
+        event.remove(engine, "after_cursor_execute", _count)
+    return stats
+
+def bench(app, client, url, headers, reps):
+    stats = measure_db_bytes(app, client, url, headers)
+    payload = len(client.get(url, headers=headers).get_data())
+    t0 = time.process_time()
+    for _ in range(reps):
+        client.get(url, headers=headers)
+    stats["cpu_ms"] = round((time.process_time() - t0) * 1000 / reps, 2)
+    stats["payload_bytes"] = payload
+    return stats
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vehicles", type=int, default=2000)
+    ap.add_argument("--bids", type=int, default=500)
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+
+    app = make_app()
+    token = seed(app, args.vehicles, args.bids)
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+    urls = {
+        "list": "/api/vehicles",
+        "detail": "/api/vehicles/1",
+        "bids": "/api/vehicles/1/bids",
+        "history": "/api/users/me/history",
+    }
+    results = {}
+    for name, url in urls.items():
+        full = bench(app, client, url, headers, args.reps)
+        lean = bench(app, client, f"{url}?fields={MOBILE[name]}", headers, args.reps)
+        results[name] = {
+            "fields": MOBILE[name], "full": full, "mobile": lean,
+            "db_bytes_saved_pct": round(100 * (1 - lean["db_bytes"] / full["db_bytes"]), 1),
+            "cpu_saved_pct": round(100 * (1 - lean["cpu_ms"] / full["cpu_ms"]), 1),
+            "payload_saved_pct": round(100 * (1 - lean["payload_bytes"] / full["payload_bytes"]), 1),
+        }
+
+    print(json.dumps({"bench": "fields", "vehicles": args.vehicles, "bids": args.bids,
+                      **results}, indent=2))
+
+if __name__ == "__main__":
+    main()
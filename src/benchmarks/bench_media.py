@@ -0,0 +1,108 @@
+# benchmarks/bench_media.py
+"""Listado del catálogo: bytes leídos de la BD y tamaño de respuesta,
+antes (arreglo JSON `images` + `description` en cada fila) y después
+(`vehicle_images` normalizado, solo portada, `description` diferida).
+
+Uso: python -m benchmarks.bench_media [--vehicles 2000] [--images 6]
+"""
+import argparse
+import json
+from sqlalchemy import event, insert, text
+
+from benchmarks.common import make_app, measure
+from app.extensions import db
+from app.models import User, Vehicle, VehicleImage
+
+URL = "https://images.unsplash.com/photo-{n:013d}-7e6692767b70?auto=format&fit=crop&w=1600&q=80"
+
+def _row_bytes(rows):
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+def seed(app, vehicles, images):
+    with app.app_context():
+        db.session.execute(insert(User), [{"id": 1, "name": "S", "email": "s@bench.local",
+                                           "password_hash": "x", "role": "seller"}])
+        db.session.execute(insert(Vehicle), [
+            {"id": i, "seller_id": 1, "make": "Ford", "model": "Mustang", "year": 1969,
+             "base_price": 100000, "lot_code": f"M{i}", "min_increment": 100,
+             "description": "Vehículo en excelente estado. " * 50}
+            for i in range(1, vehicles + 1)
+        ])
+        db.session.execute(insert(VehicleImage), [
+            {"vehicle_id": i, "position": p, "url": URL.format(n=i * 10 + p)}
+            for i in range(1, vehicles + 1) for p in range(images)
+        ])
+        db.session.commit()
+
+def before(app):
+    """Reconstruye la lectura del esquema anterior: SELECT vehicles.* con el JSON
+    completo y un máximo de puja por fila (el N+1 del serializador de entonces).
+    Las consultas se cuentan de verdad con `measure`."""
+    with app.app_context():
+        # El arreglo `images` vivía en la fila: se arma fuera de la medición
+        urls = {}
+        for vid, url in db.session.execute(text(
+            "SELECT vehicle_id, url FROM vehicle_images ORDER BY vehicle_id, position"
+        )):
+            urls.setdefault(vid, []).append(url)
+    with measure(app) as stats, app.app_context():
+        rows = db.session.execute(text(
+            "SELECT * FROM vehicles WHERE status = 'active' ORDER BY created_at DESC"
+        )).fetchall()
+        tops = {r.id: db.session.execute(
+            text("SELECT MAX(amount) FROM bids WHERE vehicle_id = :vid"), {"vid": r.id}
+        ).scalar() for r in rows}
+    db_bytes = (_row_bytes(rows) + sum(len(json.dumps(u)) for u in urls.values())
+                + _row_bytes([(top,) for top in tops.values()]))
+    payload = {"ok": True, "data": [{
+        "id": r.id, "make": r.make, "model": r.model, "year": r.year,
+        "basePrice": r.base_price, "currentPrice": max(r.base_price, tops[r.id] or 0),
+        "minIncrement": r.min_increment, "lotCode": r.lot_code,
+        "images": urls.get(r.id, []), "status": r.status,
+        "endsAt": str(r.auction_end_at) + "Z",
+    } for r in rows]}
+    return {"db_bytes": db_bytes, "queries": stats["queries"],
+            "response_bytes": len(json.dumps(payload, separators=(",", ":")))}
+
+def after(app):
+    """Ejecuta el endpoint real y vuelve a leer exactamente las mismas sentencias."""
+    captured = []
+    with app.app_context():
+        engine = db.engine
+
+    def _capture(conn, cursor, statement, params, context, executemany):
+        captured.append((statement, params))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        resp = app.test_client().get("/api/vehicles")
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    db_bytes = 0
+    with engine.connect() as conn:
+        for statement, params in captured:
+            db_bytes += _row_bytes(conn.exec_driver_sql(statement, params).fetchall())
+    return {"db_bytes": db_bytes, "queries": len(captured), "response_bytes": len(resp.data)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vehicles", type=int, default=2000)
+    ap.add_argument("--images", type=int, default=6)
+    args = ap.parse_args()
+
+    app = make_app()
+    seed(app, args.vehicles, args.images)
+    b, a = before(app), after(app)
+    print(json.dumps({
+        "bench": "media",
+        "vehicles": args.vehicles,
+        "images_per_vehicle": args.images,
+        "before": b,
+        "after": a,
+        "db_bytes_saved_pct": round(100 * (1 - a["db_bytes"] / b["db_bytes"]), 1),
+        "response_bytes_saved_pct": round(100 * (1 - a["response_bytes"] / b["response_bytes"]), 1),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
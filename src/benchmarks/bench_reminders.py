@@ -0,0 +1,66 @@
+# benchmarks/bench_reminders.py
+"""10k subastas que cierran dentro de la misma hora → dispatch_reminders.
+
+Uso: python -m benchmarks.bench_reminders [--auctions 10000] [--users 2000] [--watchers 3]
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+
+from benchmarks.common import make_app, measure
+from app.extensions import db
+from app.models import User, Vehicle, Watchlist, Notification
+from app.tasks import dispatch_reminders
+
+def seed(app, auctions, users, watchers):
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"id": i, "name": f"U{i}", "email": f"u{i}@bench.local", "password_hash": "x", "role": "buyer"}
+            for i in range(1, users + 1)
+        ])
+        db.session.execute(insert(Vehicle), [
+            {"id": i, "seller_id": 1, "make": "Ford", "model": "T", "year": 1990,
+             "base_price": 1000, "lot_code": f"B{i}", "min_increment": 100,
+             "auction_end_at": now + timedelta(seconds=rnd.randint(60, 3540))}
+            for i in range(1, auctions + 1)
+        ])
+        rows = {}
+        for vid in range(1, auctions + 1):
+            for uid in rnd.sample(range(2, users + 1), watchers):
+                rows[(uid, vid)] = {"user_id": uid, "vehicle_id": vid,
+                                    "auction_end_at": now + timedelta(hours=1)}
+        db.session.execute(insert(Watchlist), list(rows.values()))
+        db.session.commit()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--auctions", type=int, default=10000)
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--watchers", type=int, default=3)
+    args = ap.parse_args()
+
+    app = make_app()
+    seed(app, args.auctions, args.users, args.watchers)
+
+    with measure(app) as first:
+        sent = dispatch_reminders(app)
+    with measure(app) as again:
+        resent = dispatch_reminders(app)
+    with app.app_context():
+        stored = Notification.query.filter_by(type="reminder").count()
+
+    print(json.dumps({
+        "bench": "reminders",
+        "auctions": args.auctions,
+        "notifications": sent,
+        "stored": stored,
+        "first_run": first,
+        "idempotent_rerun": {**again, "notifications": resent},
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_sqlite.py
+"""Pujas sostenidas sobre SQLite en archivo con hilos reales: configuración
+por defecto (journal de rollback, pool sin escritor único) frente al perfil
+de producción (DB_PROFILE=sqlite: WAL, un escritor con BEGIN IMMEDIATE,
+lectores en pool). En paralelo, lectores consultan el catálogo.
+
+Cada pujador tiene su lote (no hay rechazos de negocio por carreras) pero
+todos compiten por el mismo archivo. Pujas aceptadas/s, errores 5xx
+("database is locked" / reintentos agotados) y latencias.
+
+Uso: python -m benchmarks.bench_sqlite [--bidders 16] [--readers 4] [--duration 10]
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from sqlalchemy import insert
+from flask_jwt_extended import create_access_token
+
+from benchmarks.common import make_app, percentile
+from app.extensions import db
+from app.models import User, Vehicle
+
+def seed(app, bidders, lots):
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"id": i, "name": f"U{i}", "email": f"u{i}@bench.local", "password_hash": "x",
+             "role": "seller" if i == 1 else "buyer"}
+            for i in range(1, bidders + 2)
+        ])
+        db.session.execute(insert(Vehicle), [
+            {"id": i, "seller_id": 1, "make": "Ford", "model": "T", "year": 1990,
+             "base_price": 1000, "lot_code": f"SQ{i}", "min_increment": 1}
+            for i in range(1, lots + 1)
+        ])
+        db.session.commit()
+        return [create_access_token(identity=str(uid)) for uid in range(2, bidders + 2)]
+
+def run(app, tokens, readers, duration):
+    lock = threading.Lock()
+    stop = threading.Event()
+    result = {"accepted": 0, "rejected": 0, "errors": 0, "reads": 0}
+    latencies = []
+
+    def bidder(n, token):
+        client = app.test_client()
+        headers = {"Authorization": f"Bearer {token}"}
+        vid = 1 + n
+        for amount in itertools.count(1001):
+            if stop.is_set():
+                break
+            t0 = time.perf_counter()
+            status = client.post(f"/api/vehicles/{vid}/bids?amount={amount}", headers=headers).status_code
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(ms)
+                key = "accepted" if status == 200 else "errors" if status >= 500 else "rejected"
+                result[key] += 1
+
+    def reader():
+        client = app.test_client()
+        while not stop.is_set():
+            client.get("/api/vehicles?page=1&per_page=20")
+            with lock:
+                result["reads"] += 1
+
+    threads = [threading.Thread(target=bidder, args=(n, t)) for n, t in enumerate(tokens)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    return {
+        **result,
+        "accepted_per_s": round(result["accepted"] / duration, 1),
+        "reads_per_s": round(result["reads"] / duration, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bidders", type=int, default=16)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--duration", type=float, default=10)
+    args = ap.parse_args()
+
+    results = {}
+    for name in ("default", "profile"):
+        app = make_app(sqlite_profile=name == "profile")
+        tokens = seed(app, args.bidders, args.bidders)
+        results[name] = run(app, tokens, args.readers, args.duration)
+
+    print(json.dumps({"bench": "sqlite", "bidders": args.bidders, "readers": args.readers,
+                      "duration_s": args.duration,
+                      **results}, indent=2))
+
+if __name__ == "__main__":
+    main()
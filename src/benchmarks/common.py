@@ -0,0 +1,62 @@
+# benchmarks/common.py
+"""Utilidades compartidas por los benchmarks (app sobre SQLite temporal)."""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+
+def make_app(sqlite_profile=False, **config):
+    """App de benchmark: SQLite en un directorio temporal, sin scheduler.
+    Con `sqlite_profile`, el perfil de producción (WAL, un escritor)."""
+    tmp = tempfile.mkdtemp(prefix="carbid-bench-")
+    url = f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"
+    if sqlite_profile:
+        config = {
+            "DB_PROFILE": "sqlite",
+            "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": 8, "max_overflow": 0},
+            "SQLALCHEMY_BINDS": {"writer": {"url": url, "pool_size": 1, "max_overflow": 0}},
+            **config,
+        }
+    app = create_app({
+        "TESTING": True,
+        "SCHEDULER_ENABLED": False,
+        "SQLALCHEMY_DATABASE_URI": url,
+        "SQLALCHEMY_ENGINE_OPTIONS": {},
+        "LEADER_LOCK_FILE": os.path.join(tmp, "jobs.lock"),
+        **config,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+def percentile(ordered, pct):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+@contextmanager
+def measure(app):
+    """Cuenta sentencias SQL y tiempo de pared del bloque."""
+    stats = {"queries": 0, "seconds": 0.0}
+    with app.app_context():
+        engine = db.engine
+
+    def _count(conn, cursor, statement, params, context, executemany):
+        stats["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    t0 = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["seconds"] = round(time.perf_counter() - t0, 4)
+        event.remove(engine, "before_cursor_execute", _count)
@@ -0,0 +1,32 @@
+# benchmarks/compare.py
+"""Compara dos resultados de benchmarks.run (p. ej. entre commits).
+
+Uso: python -m benchmarks.compare antes.json despues.json"""
+import json
+import sys
+
+METRICS = ("rps", "p50_ms", "p99_ms")
+
+def _delta(a, b):
+    if not a:
+        return "   n/a"
+    return f"{(b - a) / a * 100:+6.1f}%"
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        raise SystemExit(__doc__)
+    with open(argv[0]) as fh:
+        before = json.load(fh)
+    with open(argv[1]) as fh:
+        after = json.load(fh)
+    print(f"{before['meta']['commit']} → {after['meta']['commit']}")
+    for name, a in before["scenarios"].items():
+        b = after["scenarios"].get(name)
+        if not b:
+            continue
+        cols = "  ".join(f"{m}: {a[m]:>9} → {b[m]:>9} ({_delta(a[m], b[m])})" for m in METRICS)
+        print(f"{name:>14}  {cols}")
+
+if __name__ == "__main__":
+    main()
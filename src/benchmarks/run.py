@@ -0,0 +1,336 @@
+# benchmarks/run.py
+"""Suite de carga sobre la app WSGI real bajo gevent.
+
+Por defecto levanta la app en proceso (gevent.pywsgi) sobre un SQLite con
+datos de `app.synthetic`; con --url apunta a un servidor ya desplegado
+(mismo .env, para firmar tokens y descubrir lotes calientes en la BD).
+
+Uso:
+  python -m benchmarks.run
+  python -m benchmarks.run --scenarios catalog,bidding --concurrency 100 --duration 20
+  python -m benchmarks.run --url http://127.0.0.1:8000
+  python -m benchmarks.run --scenarios drain --drain-clients 500 --drain-window 10
+  python -m benchmarks.compare results/A.json results/B.json
+
+Los resultados se guardan en benchmarks/results/<fecha>-<commit>.json."""
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import http.client  # noqa: E402
+import itertools  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import time  # noqa: E402
+from datetime import datetime  # noqa: E402
+from urllib.parse import urlsplit  # noqa: E402
+
+import gevent  # noqa: E402
+import gevent.event  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+
+from benchmarks.common import make_app, percentile  # noqa: E402
+from app import create_app, drain  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import Bid, Vehicle  # noqa: E402
+from app.synthetic import generate  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SCENARIOS = ("catalog", "bidding", "history", "notifications", "sse")
+# Opt-in (no entra en la lista por defecto); solo en proceso
+EXTRA_SCENARIOS = ("drain",)
+
+class Target:
+    """Datos para generar peticiones: lotes calientes activos y tokens de pujadores frecuentes."""
+
+    def __init__(self, app, host, port):
+        self.host, self.port = host, port
+        with app.app_context():
+            hot = (
+                db.session.query(Bid.vehicle_id, func.count(Bid.id).label("n"))
+                .join(Vehicle, Vehicle.id == Bid.vehicle_id)
+                .filter(Vehicle.status == "active")
+                .group_by(Bid.vehicle_id)
+                .order_by(func.count(Bid.id).desc())
+                .limit(5)
+                .all()
+            )
+            self.hot_vehicles = [vid for vid, _ in hot]
+            power = (
+                db.session.query(Bid.bidder_id, func.count(Bid.id))
+                .group_by(Bid.bidder_id)
+                .order_by(func.count(Bid.id).desc())
+                .limit(20)
+                .all()
+            )
+            self.tokens = [create_access_token(identity=str(uid)) for uid, _ in power]
+            top = db.session.query(func.max(Bid.amount)).scalar() or 0
+        self._amount = itertools.count(top + 1_000_000, 10_000)
+        self._rr = itertools.count()
+
+    def auth(self):
+        return {"Authorization": f"Bearer {self.tokens[next(self._rr) % len(self.tokens)]}"}
+
+    def next_amount(self):
+        return next(self._amount)
+
+def _scenario_request(name, t: Target):
+    if name == "catalog":
+        return "GET", "/api/vehicles", {}
+    if name == "history":
+        return "GET", "/api/users/me/history", t.auth()
+    if name == "notifications":
+        return "GET", "/api/users/me/notifications", t.auth()
+    if name == "bidding":
+        vid = t.hot_vehicles[next(t._rr) % len(t.hot_vehicles)]
+        return "POST", f"/api/vehicles/{vid}/bids?amount={t.next_amount()}", t.auth()
+    raise ValueError(name)
+
+def run_load(name, t: Target, concurrency, duration):
+    """`concurrency` greenlets con conexión keep-alive durante `duration` segundos."""
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        conn = http.client.HTTPConnection(t.host, t.port, timeout=30)
+        while time.perf_counter() < deadline:
+            method, path, headers = _scenario_request(name, t)
+            t0 = time.perf_counter()
+            try:
+                conn.request(method, path, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                code = resp.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(t.host, t.port, timeout=30)
+                code = "error"
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[str(code)] = statuses.get(str(code), 0) + 1
+        conn.close()
+
+    started = time.perf_counter()
+    gevent.joinall([gevent.spawn(worker) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return _summary(latencies, elapsed, statuses=statuses)
+
+def run_sse(t: Target, clients, bids):
+    """Fan-out SSE: `clients` streams sobre un lote caliente; latencia POST → recepción."""
+    vid = t.hot_vehicles[0]
+    sent = {}          # monto -> instante del envío (el evento puede llegar antes que la respuesta)
+    latencies = []
+    ready = gevent.event.Event()
+    opened = [0]
+
+    def listener():
+        conn = http.client.HTTPConnection(t.host, t.port, timeout=60)
+        conn.request("GET", f"/api/sse/vehicles/{vid}")
+        resp = conn.getresponse()
+        opened[0] += 1
+        if opened[0] == clients:
+            ready.set()
+        event = None
+        got = 0
+        while got < bids:
+            line = resp.fp.readline()
+            if not line:
+                break
+            line = line.decode().strip()
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:") and event == "top-updated":
+                data = json.loads(line[5:])
+                t0 = sent.get(data.get("top"))
+                if t0 is not None:
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                got += 1
+        conn.close()
+
+    group = [gevent.spawn(listener) for _ in range(clients)]
+    ready.wait(timeout=30)
+    gevent.sleep(0.2)
+    conn = http.client.HTTPConnection(t.host, t.port, timeout=30)
+    started = time.perf_counter()
+    accepted = 0
+    for _ in range(bids):
+        amount = t.next_amount()
+        sent[amount] = time.perf_counter()
+        conn.request("POST", f"/api/vehicles/{vid}/bids?amount={amount}", headers=t.auth())
+        resp = conn.getresponse()
+        resp.read()
+        accepted += resp.status == 200
+        gevent.sleep(0.05)
+    gevent.joinall(group, timeout=10)
+    gevent.killall(group)
+    elapsed = time.perf_counter() - started
+    return _summary(latencies, elapsed, clients=clients, bids=accepted,
+                    delivered=len(latencies), expected=accepted * clients)
+
+def _drain_round(app, t: Target, clients, window, min_ms, max_ms):
+    """Un reinicio: `clients` streams SSE, drenado y reconexión según la pista.
+
+    El reemplazo del worker se simula saliendo del modo drenado al terminar
+    la ventana; hasta entonces los reintentos reciben 503 + Retry-After."""
+    vid = t.hot_vehicles[0]
+    app.config.update(DRAIN_RECONNECT_MIN_MS=min_ms, DRAIN_RECONNECT_MAX_MS=max_ms)
+    attempts, delays = [], []   # instantes de cada intento; cierre -> reconexión (ms)
+    refused = [0]
+    ready = gevent.event.Event()
+    opened = [0]
+    started = [None]
+
+    def connect():
+        conn = http.client.HTTPConnection(t.host, t.port, timeout=60)
+        conn.request("GET", f"/api/sse/vehicles/{vid}")
+        return conn, conn.getresponse()
+
+    def listener():
+        conn, resp = connect()
+        opened[0] += 1
+        if opened[0] == clients:
+            ready.set()
+        retry_ms, event = None, None
+        while True:
+            line = resp.fp.readline()
+            if not line:
+                break
+            line = line.decode().strip()
+            if line.startswith("retry:"):
+                retry_ms = int(line[6:])
+            elif line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:") and event == "reconnect":
+                break
+        conn.close()
+        closed = time.perf_counter()
+        wait_ms = retry_ms or 0
+        while True:
+            gevent.sleep(wait_ms / 1000)
+            attempts.append(time.perf_counter() - started[0])
+            conn, resp = connect()
+            if resp.status == 200:
+                delays.append((time.perf_counter() - closed) * 1000)
+                conn.close()
+                return
+            refused[0] += 1
+            body = json.loads(resp.read() or b"{}")
+            wait_ms = body.get("error", {}).get("retryAfterMs", 1000)
+            conn.close()
+
+    group = [gevent.spawn(listener) for _ in range(clients)]
+    ready.wait(timeout=30)
+    gevent.sleep(0.2)
+    started[0] = time.perf_counter()
+    drain.start(app, window=window)
+    gevent.sleep(window)
+    drain.reset()
+    gevent.joinall(group, timeout=window + max_ms / 1000 + 30)
+    gevent.killall(group)
+
+    per_second = {}
+    for at in attempts:
+        per_second[int(at)] = per_second.get(int(at), 0) + 1
+    return _summary(sorted(delays), time.perf_counter() - started[0], clients=clients,
+                    reconnected=len(delays), refused=refused[0],
+                    peak_attempts_per_second=max(per_second.values(), default=0),
+                    attempts_per_second=[per_second.get(s, 0) for s in range(max(per_second, default=-1) + 1)])
+
+def run_drain(app, t: Target, clients, window, min_ms, max_ms):
+    """Curva de reconexión: corte abrupto (sin ventana ni jitter) frente a drenado escalonado."""
+    return {
+        "abrupt": _drain_round(app, t, clients, 0, 0, 0),
+        "gradual": _drain_round(app, t, clients, window, min_ms, max_ms),
+    }
+
+def _summary(latencies, elapsed, **extra):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p99_ms": round(percentile(ordered, 99), 2),
+        **extra,
+    }
+
+def _git_sha():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="Servidor ya desplegado (si se omite, se levanta en proceso).")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--sse-clients", type=int, default=200)
+    ap.add_argument("--sse-bids", type=int, default=20)
+    ap.add_argument("--drain-clients", type=int, default=300)
+    ap.add_argument("--drain-window", type=float, default=5.0)
+    ap.add_argument("--drain-min-ms", type=int, default=500)
+    ap.add_argument("--drain-max-ms", type=int, default=5000)
+    ap.add_argument("--users", type=int, default=500)
+    ap.add_argument("--vehicles", type=int, default=1000)
+    ap.add_argument("--bids", type=int, default=20000)
+    ap.add_argument("--out", help="Archivo JSON de salida.")
+    args = ap.parse_args()
+
+    server = None
+    if args.url:
+        app = create_app({"SCHEDULER_ENABLED": False})
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+        seeded = None
+    else:
+        app = make_app()
+        with app.app_context():
+            seeded = generate(users=args.users, vehicles=args.vehicles, bids=args.bids)
+        server = WSGIServer(("127.0.0.1", 0), app, log=None)
+        server.start()
+        host, port = "127.0.0.1", server.server_port
+
+    target = Target(app, host, port)
+    results = {}
+    for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+        if name == "sse":
+            results[name] = run_sse(target, args.sse_clients, args.sse_bids)
+        elif name == "drain":
+            if args.url:
+                print("drain: solo en proceso (en un servidor desplegado, enviar DRAIN_SIGNAL al worker)")
+                continue
+            results[name] = run_drain(app, target, args.drain_clients, args.drain_window,
+                                      args.drain_min_ms, args.drain_max_ms)
+        else:
+            results[name] = run_load(name, target, args.concurrency, args.duration)
+        print(f"{name:>14}: {json.dumps(results[name])}", flush=True)
+
+    if server is not None:
+        server.stop()
+
+    report = {
+        "meta": {
+            "commit": _git_sha(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "target": args.url or "in-process",
+            "params": {k: v for k, v in vars(args).items() if k != "out"},
+            "seed": {k: seeded[k] for k in ("users", "vehicles", "bids")} if seeded else None,
+        },
+        "scenarios": results,
+    }
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['commit']}.json")
+    with open(out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Resultados: {out}")
+
+if __name__ == "__main__":
+    main()
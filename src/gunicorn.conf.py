@@ -0,0 +1,15 @@
+# src/gunicorn.conf.py
+# Gunicorn lo carga solo (--chdir src). Ver app/drain.py.
+import os
+
+# El apagado espera a las conexiones abiertas: debe cubrir la ventana de drenado
+graceful_timeout = int(float(os.getenv("DRAIN_WINDOW_SECONDS", "20"))) + 10
+
+def post_worker_init(worker):
+    # Después de init_signals del worker: el drenado se encadena a su handle_exit
+    from app.drain import install_signal_handler
+    from app.extensions import scheduler
+    from app.tasks import start_scheduler
+    install_signal_handler(worker.wsgi)
+    # Jobs desde el arranque del worker, sin esperar la primera petición
+    start_scheduler(scheduler, worker.wsgi)
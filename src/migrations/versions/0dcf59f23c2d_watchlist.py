@@ -0,0 +1,55 @@
+"""watchlist
+
+Revision ID: 0dcf59f23c2d
+Revises: 4560b3029a3d
+Create Date: 2026-10-19 09:12:31.418203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0dcf59f23c2d'
+down_revision = '4560b3029a3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'watchlist',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('vehicle_id', sa.Integer(), nullable=False),
+        sa.Column('auction_end_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'vehicle_id')
+    )
+    with op.batch_alter_table('watchlist', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_watchlist_vehicle_id'), ['vehicle_id'], unique=False)
+        batch_op.create_index('ix_watchlist_user_end', ['user_id', 'auction_end_at', 'vehicle_id'], unique=False)
+
+    # Backfill: lotes donde el usuario ya pujó + lotes que vende
+    op.execute(sa.text("""
+        INSERT INTO watchlist (user_id, vehicle_id, auction_end_at, created_at, updated_at)
+        SELECT DISTINCT b.bidder_id, b.vehicle_id, v.auction_end_at, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM bids b JOIN vehicles v ON v.id = b.vehicle_id
+    """))
+    op.execute(sa.text("""
+        INSERT INTO watchlist (user_id, vehicle_id, auction_end_at, created_at, updated_at)
+        SELECT v.seller_id, v.id, v.auction_end_at, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM vehicles v
+        WHERE NOT EXISTS (
+            SELECT 1 FROM watchlist w WHERE w.user_id = v.seller_id AND w.vehicle_id = v.id
+        )
+    """))
+
+
+def downgrade():
+    with op.batch_alter_table('watchlist', schema=None) as batch_op:
+        batch_op.drop_index('ix_watchlist_user_end')
+        batch_op.drop_index(batch_op.f('ix_watchlist_vehicle_id'))
+    op.drop_table('watchlist')
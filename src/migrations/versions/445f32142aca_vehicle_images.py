@@ -0,0 +1,83 @@
+"""vehicle images
+
+Revision ID: 445f32142aca
+Revises: 446dc04e5e21
+Create Date: 2026-10-19 13:48:10.604127
+
+"""
+import json
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '445f32142aca'
+down_revision = '446dc04e5e21'
+branch_labels = None
+depends_on = None
+
+BATCH = 1000
+
+
+def upgrade():
+    images = op.create_table(
+        'vehicle_images',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('vehicle_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(length=1024), nullable=False),
+        sa.Column('variants', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('vehicle_images', schema=None) as batch_op:
+        batch_op.create_index('ix_vehicle_images_vehicle_position', ['vehicle_id', 'position'], unique=True)
+
+    # Mueve el arreglo JSON vehicles.images a filas, por lotes
+    conn = op.get_bind()
+    now = datetime.utcnow()
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT id, images FROM vehicles WHERE id > :last ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": BATCH}).fetchall()
+        if not rows:
+            break
+        out = []
+        for vid, raw in rows:
+            # NULL, 'null' u otro JSON que no sea un arreglo: lote sin fotos
+            urls = (json.loads(raw) if isinstance(raw, str) else raw) or []
+            if not isinstance(urls, list):
+                continue
+            for pos, url in enumerate(u for u in urls if isinstance(u, str) and u):
+                out.append({"vehicle_id": vid, "position": pos, "url": url[:1024],
+                            "variants": None, "created_at": now, "updated_at": now})
+        if out:
+            op.bulk_insert(images, out)
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_column('images')
+
+
+def downgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('images', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT vehicle_id, url FROM vehicle_images ORDER BY vehicle_id, position"
+    )).fetchall()
+    by_vehicle = {}
+    for vid, url in rows:
+        by_vehicle.setdefault(vid, []).append(url)
+    for vid, urls in by_vehicle.items():
+        conn.execute(sa.text("UPDATE vehicles SET images = :images WHERE id = :id"),
+                     {"images": json.dumps(urls), "id": vid})
+
+    with op.batch_alter_table('vehicle_images', schema=None) as batch_op:
+        batch_op.drop_index('ix_vehicle_images_vehicle_position')
+    op.drop_table('vehicle_images')
@@ -0,0 +1,41 @@
+"""vehicle change_seq
+
+Revision ID: 446dc04e5e21
+Revises: f0437d40c6a4
+Create Date: 2026-10-19 13:02:44.871395
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '446dc04e5e21'
+down_revision = 'f0437d40c6a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'change_counters',
+        sa.Column('name', sa.String(length=40), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+        batch_op.create_index(batch_op.f('ix_vehicles_change_seq'), ['change_seq'], unique=False)
+
+    # Punto de partida: cada vehículo existente "cambió" en el orden de su id
+    op.execute(sa.text("UPDATE vehicles SET change_seq = id"))
+    op.execute(sa.text(
+        "INSERT INTO change_counters (name, value) SELECT 'vehicles', COALESCE(MAX(id), 0) FROM vehicles"
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicles_change_seq'))
+        batch_op.drop_column('change_seq')
+    op.drop_table('change_counters')
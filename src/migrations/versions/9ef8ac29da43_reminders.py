@@ -0,0 +1,28 @@
+"""reminders
+
+Revision ID: 9ef8ac29da43
+Revises: 0dcf59f23c2d
+Create Date: 2026-10-19 10:03:54.220917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9ef8ac29da43'
+down_revision = '0dcf59f23c2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reminded_minutes', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_vehicles_status_end', ['status', 'auction_end_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index('ix_vehicles_status_end')
+        batch_op.drop_column('reminded_minutes')
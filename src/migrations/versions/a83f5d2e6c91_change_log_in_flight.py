@@ -0,0 +1,29 @@
+"""change log in-flight markers
+
+Revision ID: a83f5d2e6c91
+Revises: e5a90b3d7c14
+Create Date: 2026-10-20 16:02:37.480915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a83f5d2e6c91'
+down_revision = 'e5a90b3d7c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filas existentes: ya confirmadas
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('committed', sa.Boolean(), nullable=False, server_default=sa.true()))
+        batch_op.create_index('ix_change_log_committed_id', ['committed', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_change_log_committed_id')
+        batch_op.drop_column('committed')
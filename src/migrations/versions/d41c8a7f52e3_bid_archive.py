@@ -0,0 +1,55 @@
+"""bid archive
+
+Revision ID: d41c8a7f52e3
+Revises: b7d2e94c1a06
+Create Date: 2026-10-19 19:05:12.884120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c8a7f52e3'
+down_revision = 'b7d2e94c1a06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'bids_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('vehicle_id', sa.Integer(), nullable=False),
+        sa.Column('bidder_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        mysql_row_format='COMPRESSED'
+    )
+    with op.batch_alter_table('bids_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_bids_archive_bidder_id'), ['bidder_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_bids_archive_vehicle_id'), ['vehicle_id'], unique=False)
+
+    op.create_table(
+        'archived_bid_summaries',
+        sa.Column('vehicle_id', sa.Integer(), nullable=False),
+        sa.Column('bid_count', sa.Integer(), nullable=False),
+        sa.Column('bidder_count', sa.Integer(), nullable=False),
+        sa.Column('top_amount', sa.Integer(), nullable=True),
+        sa.Column('first_bid_at', sa.DateTime(), nullable=True),
+        sa.Column('last_bid_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.Column('restored_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+        sa.PrimaryKeyConstraint('vehicle_id')
+    )
+
+
+def downgrade():
+    op.drop_table('archived_bid_summaries')
+    with op.batch_alter_table('bids_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_bids_archive_vehicle_id'))
+        batch_op.drop_index(batch_op.f('ix_bids_archive_bidder_id'))
+    op.drop_table('bids_archive')
@@ -0,0 +1,44 @@
+"""change log replaces change counter
+
+Revision ID: e5a90b3d7c14
+Revises: d41c8a7f52e3
+Create Date: 2026-10-20 10:14:52.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a90b3d7c14'
+down_revision = 'd41c8a7f52e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # El autoincremental sigue desde el último valor del contador
+    op.execute(sa.text(
+        "INSERT INTO change_log (id, created_at) "
+        "SELECT value, CURRENT_TIMESTAMP FROM change_counters WHERE name = 'vehicles' AND value > 0"
+    ))
+    op.drop_table('change_counters')
+
+
+def downgrade():
+    op.create_table(
+        'change_counters',
+        sa.Column('name', sa.String(length=40), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute(sa.text(
+        "INSERT INTO change_counters (name, value) SELECT 'vehicles', COALESCE(MAX(change_seq), 0) FROM vehicles"
+    ))
+    op.drop_table('change_log')
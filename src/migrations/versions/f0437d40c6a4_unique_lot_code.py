@@ -0,0 +1,45 @@
+"""unique lot_code
+
+Revision ID: f0437d40c6a4
+Revises: 9ef8ac29da43
+Create Date: 2026-10-19 11:21:07.538112
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0437d40c6a4'
+down_revision = '9ef8ac29da43'
+branch_labels = None
+depends_on = None
+
+
+def _check_duplicates():
+    """Los lot_code repetidos romperían el índice a mitad de camino: se listan
+    y se aborta antes de tocar la tabla."""
+    if context.is_offline_mode():
+        return
+    dupes = op.get_bind().execute(sa.text(
+        "SELECT lot_code, COUNT(*) FROM vehicles WHERE lot_code IS NOT NULL "
+        "GROUP BY lot_code HAVING COUNT(*) > 1 ORDER BY lot_code LIMIT 20"
+    )).all()
+    if dupes:
+        listed = ", ".join(f"{code} ({n} lotes)" for code, n in dupes)
+        raise RuntimeError(
+            "No se puede crear el índice único de vehicles.lot_code: hay códigos "
+            f"repetidos: {listed}. Corregirlos (p. ej. agregando el id del lote al "
+            "código de los repetidos) y volver a correr la migración."
+        )
+
+
+def upgrade():
+    _check_duplicates()
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicles_lot_code'), ['lot_code'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicles_lot_code'))
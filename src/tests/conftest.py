@@ -2,31 +2,33 @@
 import os
 import pytest
 from app import create_app
-from app.extensions import db, scheduler
+from app.extensions import db
 
 # Importa los modelos para que SQLAlchemy conozca las tablas
 from app import models  # noqa
 
 @pytest.fixture(scope="session")
-def app_instance(monkeypatch, tmp_path_factory):
+def app_instance(tmp_path_factory):
     """
     Crea una instancia de la app para pruebas:
-    - Deshabilita el scheduler.
-    - Usa SQLite en archivo temporal.
+    - Deshabilita el scheduler (no arranca threads).
+    - Usa SQLite en archivo temporal con el perfil de producción
+      (WAL, un escritor, lectores en pool).
     """
-    # Evitar que el scheduler arranque threads en tests
-    monkeypatch.setattr(scheduler, "start", lambda *a, **k: None)
-
-    # Crea la app
-    application = create_app()
-
-    # Cambia la DB a SQLite para pruebas
     db_path = tmp_path_factory.mktemp("db") / "test.sqlite"
-    application.config.update(
-        TESTING=True,
-        SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}",
-        SQLALCHEMY_TRACK_MODIFICATIONS=False,
-    )
+    application = create_app({
+        "TESTING": True,
+        "SCHEDULER_ENABLED": False,
+        "DB_PROFILE": "sqlite",
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {},
+        "SQLALCHEMY_BINDS": {"writer": {"url": f"sqlite:///{db_path}", "pool_size": 1, "max_overflow": 0}},
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "LEADER_LOCK_FILE": str(db_path.with_suffix(".lock")),
+        "MEDIA_ROOT": str(tmp_path_factory.mktemp("media")),
+        # Los tests leen /api/metrics sin token (ver test_metrics_require_admin)
+        "METRICS_PUBLIC": True,
+    })
 
     # Crea las tablas
     with application.app_context():
@@ -96,4 +98,18 @@ def seller_headers(client):
     assert r.status_code == 200
     token = r.get_json()["data"]["token"]
     return {"Authorization": f"Bearer {token}"}
-d
\ No newline at end of file
+
+@pytest.fixture()
+def make_seller(client):
+    """
+    Seller propio por test: no llena la agenda (limitada a 20) del seller compartido.
+    """
+    def _mk(email, password="seller123"):
+        creds = {"email": email, "password": password}
+        r = client.post("/api/auth/login", json=creds)
+        if r.status_code == 401:
+            client.post("/api/auth/register", json={"name": "Seller", "role": "seller", **creds})
+            r = client.post("/api/auth/login", json=creds)
+        assert r.status_code == 200
+        return {"Authorization": f"Bearer {r.get_json()['data']['token']}"}
+    return _mk
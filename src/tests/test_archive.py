@@ -0,0 +1,54 @@
+# tests/test_archive.py
+from datetime import datetime, timedelta
+from app import archive
+from app.bid_summary import backfill
+from app.extensions import db
+from app.models import ArchivedBidSummary, Bid, BidArchive, UserVehicleBidSummary, Vehicle
+
+def test_archive_is_transparent_and_restorable(app_instance, client, make_seller, auth_headers):
+    seller = make_seller("seller-ar@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Peugeot", "model": "404", "year": 1966, "base_price": 7000,
+        "lot_code": "TST-AR01", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"]
+    ana = auth_headers("ana-ar@test.local", "ana123")
+    leo = auth_headers("leo-ar@test.local", "leo123")
+    for who, amount in ((ana, 7100), (leo, 7300), (ana, 7600), (leo, 8000)):
+        assert client.post(f"/api/vehicles/{vid}/bids?amount={amount}", headers=who).status_code == 200
+    assert client.patch(f"/api/vehicles/{vid}/close", headers=seller).status_code == 200
+    with app_instance.app_context():
+        db.session.get(Vehicle, vid).auction_end_at = datetime.utcnow() - timedelta(days=120)
+        db.session.commit()
+
+    def views():
+        bids = client.get(f"/api/vehicles/{vid}/bids").get_json()["data"]
+        history = [h for h in client.get("/api/users/me/history", headers=ana).get_json()["data"]
+                   if h["vehicleId"] == vid]
+        return bids, history
+
+    before = views()
+    assert archive.archive_closed_bids(app_instance) == 3
+    assert views() == before
+    assert [b["amount"] for b in client.get(f"/api/vehicles/{vid}/bids?fields=amount").get_json()["data"]] \
+        == [8000, 7600, 7300, 7100]
+    with app_instance.app_context():
+        # La ganadora queda en `bids`; el resto en el archivo con su resumen
+        assert [b.amount for b in Bid.query.filter_by(vehicle_id=vid)] == [8000]
+        summary = db.session.get(ArchivedBidSummary, vid)
+        assert (summary.bid_count, summary.bidder_count, summary.top_amount) == (3, 2, 7600)
+        # El resumen por usuario se reconstruye igual con pujas archivadas
+        rows = lambda: sorted((r.user_id, r.max_amount, r.bid_count, r.is_leading)
+                              for r in UserVehicleBidSummary.query.filter_by(vehicle_id=vid))
+        expected = rows()
+        backfill()
+        assert rows() == expected
+    stats = client.get("/api/metrics").get_json()["data"]["bidArchive"]
+    assert stats["lastRun"]["bids"] == 3 and stats["lagSeconds"] == 0
+    assert archive.archive_closed_bids(app_instance) == 0  # ya archivado
+
+    with app_instance.app_context():
+        assert archive.restore([vid]) == 3
+        assert Bid.query.filter_by(vehicle_id=vid).count() == 4
+        assert BidArchive.query.filter_by(vehicle_id=vid).count() == 0
+    assert views() == before
+    assert archive.archive_closed_bids(app_instance) == 0  # restaurado: fuera del job
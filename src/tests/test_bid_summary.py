@@ -0,0 +1,60 @@
+# tests/test_bid_summary.py
+from app.bid_summary import backfill
+from app.extensions import db
+from app.models import UserVehicleBidSummary
+
+def _active(client, headers):
+    r = client.get("/api/users/me/bids/active", headers=headers)
+    assert r.status_code == 200
+    return {b["vehicleId"]: b for b in r.get_json()["data"]}
+
+def test_summary_maintained_by_bids_and_backfill(app_instance, client, make_seller, auth_headers):
+    seller = make_seller("seller-bs@test.local")
+    a, b = (client.post("/api/vehicles", json={
+        "make": "Citroen", "model": "2CV", "year": 1965, "base_price": 5000,
+        "lot_code": lot, "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"] for lot in ("TST-BS01", "TST-BS02"))
+    ana = auth_headers("ana-bs@test.local", "ana123")
+    leo = auth_headers("leo-bs@test.local", "leo123")
+    for vid, who, amount in ((a, ana, 5100), (a, leo, 5200), (a, ana, 5500), (b, leo, 6000)):
+        assert client.post(f"/api/vehicles/{vid}/bids?amount={amount}", headers=who).status_code == 200
+
+    mine = _active(client, ana)
+    assert set(mine) == {a}
+    assert mine[a]["myMaxAmount"] == 5500 and mine[a]["bidCount"] == 2 and mine[a]["leading"] is True
+    theirs = _active(client, leo)
+    assert theirs[a]["leading"] is False and theirs[a]["bidCount"] == 1
+    assert theirs[b]["leading"] is True and theirs[b]["myMaxAmount"] == 6000
+
+    # Cerrado: sale de la vista
+    assert client.patch(f"/api/vehicles/{b}/close", headers=seller).status_code == 200
+    assert set(_active(client, leo)) == {a}
+
+    # El backfill desde `bids` llega al mismo resultado
+    with app_instance.app_context():
+        def snapshot():
+            rows = UserVehicleBidSummary.query.filter(UserVehicleBidSummary.vehicle_id.in_([a, b])).all()
+            return sorted((r.user_id, r.vehicle_id, r.max_amount, r.bid_count, r.is_leading) for r in rows)
+        before = snapshot()
+        UserVehicleBidSummary.query.filter_by(vehicle_id=a).delete()
+        db.session.commit()
+        assert len(snapshot()) == 1
+        assert backfill(batch_size=3) > 0
+        assert snapshot() == before
+
+def test_first_summary_row_counts_bids_from_before_the_table(app_instance, client, make_seller, auth_headers):
+    seller = make_seller("seller-bs2@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Citroen", "model": "Ami", "year": 1968, "base_price": 5000,
+        "lot_code": "TST-BS03", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"]
+    eva = auth_headers("eva-bs@test.local", "eva123")
+    for amount in (5100, 5300):
+        assert client.post(f"/api/vehicles/{vid}/bids?amount={amount}", headers=eva).status_code == 200
+    # Como si esas pujas fueran anteriores al resumen (migración sin backfill)
+    with app_instance.app_context():
+        UserVehicleBidSummary.query.filter_by(vehicle_id=vid).delete()
+        db.session.commit()
+    assert client.post(f"/api/vehicles/{vid}/bids?amount=5500", headers=eva).status_code == 200
+    mine = _active(client, eva)[vid]
+    assert mine["bidCount"] == 3 and mine["myMaxAmount"] == 5500 and mine["leading"] is True
@@ -0,0 +1,42 @@
+# tests/test_close.py
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Vehicle, Notification
+from app.tasks import close_expired_auctions
+
+def test_close_notifies_winner_and_distinct_losers(app_instance, client, make_seller, auth_headers):
+    seller = make_seller("seller-cl@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Toyota", "model": "Celica", "year": 1978,
+        "base_price": 4000, "lot_code": "TST-L01", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"]
+
+    a = auth_headers("loser-a@test.local", "lose123")
+    b = auth_headers("loser-b@test.local", "lose123")
+    w = auth_headers("winner-l@test.local", "win123")
+    for headers, amount in ((a, 4100), (b, 4200), (a, 4300), (w, 4400)):
+        assert client.post(f"/api/vehicles/{vid}/bids?amount={amount}", headers=headers).status_code == 200
+
+    with app_instance.app_context():
+        db.session.get(Vehicle, vid).auction_end_at = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+
+    assert close_expired_auctions(app_instance) >= 1
+    with app_instance.app_context():
+        notes = [n for n in Notification.query.filter(
+            Notification.type.in_(("auction_won", "auction_lost"))).all()
+            if n.payload["vehicle_id"] == vid]
+        assert sorted(n.type for n in notes) == ["auction_lost", "auction_lost", "auction_won"]
+        assert len({n.user_id for n in notes}) == 3
+        assert db.session.get(Vehicle, vid).status == "closed"
+
+    # Re-ejecutar no vuelve a notificar
+    close_expired_auctions(app_instance)
+    with app_instance.app_context():
+        assert len([n for n in Notification.query.filter_by(type="auction_lost").all()
+                    if n.payload["vehicle_id"] == vid]) == 2
+
+    r = client.get("/api/users/me/notifications", headers=a)
+    lost = [n for n in r.get_json()["data"] if n["type"] == "auction_lost"]
+    assert lost[0]["typeLabel"] == "Subasta perdida"
+    assert "TST-L01" in lost[0]["description"]
@@ -0,0 +1,42 @@
+# tests/test_drain.py
+import json
+from app import drain, sse
+from app.extensions import socketio
+
+def test_drain_closes_streams_with_reconnect_hint(app_instance, client):
+    app_instance.config.update(DRAIN_RECONNECT_MIN_MS=2000, DRAIN_RECONNECT_MAX_MS=4000)
+    r = client.get("/api/sse/vehicles/424242")
+    chunks = iter(r.response)
+    next(chunks)  # ping
+    sio = socketio.test_client(app_instance, namespace="/rt")
+    sio.get_received("/rt")
+    try:
+        drain.start(app_instance, window=0.05).join()
+        assert drain.stats()["closed"] >= 2
+
+        # SSE: último evento con retry: y fin del stream
+        lines = next(chunks)
+        lines = lines.decode() if isinstance(lines, bytes) else lines
+        retry, event, data = lines.strip().split("\n")
+        hint = json.loads(data[len("data: "):])
+        assert event == "event: reconnect" and hint["reason"] == "draining"
+        assert 2000 <= hint["retryAfterMs"] <= 4000 and retry == f"retry: {hint['retryAfterMs']}"
+        assert next(chunks, None) is None
+        assert not sse.SUBSCRIBERS
+
+        # Socket.IO: `reconnect` y desconexión desde el servidor
+        assert not sio.is_connected("/rt")
+        events = [e for e in sio.queue if e["namespace"] == "/rt" and e["name"] == "reconnect"]
+        assert len(events) == 1 and 2000 <= events[0]["args"][0]["retryAfterMs"] <= 4000
+
+        # Mientras drena no se abren streams nuevos
+        r = client.get("/api/sse?vehicles=1")
+        assert r.status_code == 503 and 2 <= int(r.headers["Retry-After"]) <= 4
+        assert r.get_json()["error"]["reason"] == "draining"
+        refused = socketio.test_client(app_instance, namespace="/rt")
+        assert not refused.is_connected("/rt")
+        assert client.get("/api/metrics").get_json()["data"]["drain"]["draining"] is True
+    finally:
+        drain.reset()
+        app_instance.config.update(DRAIN_RECONNECT_MIN_MS=1000, DRAIN_RECONNECT_MAX_MS=15000)
+    assert client.get("/api/sse/vehicles/424242").status_code == 200
@@ -0,0 +1,73 @@
+# tests/test_edge.py
+import gzip
+import json
+
+def _other_seller(client):
+    # Vendedor propio: no llena la agenda (limitada) del seller compartido
+    creds = {"email": "seller-gz@test.local", "password": "seller123"}
+    client.post("/api/auth/register", json={"name": "Seller GZ", "role": "seller", **creds})
+    token = client.post("/api/auth/login", json=creds).get_json()["data"]["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def test_json_gzip_negotiation_and_reuse(client):
+    seller_headers = _other_seller(client)
+    for i in range(1, 6):
+        client.post("/api/vehicles", json={
+            "make": "Renault", "model": "Torino", "year": 1970,
+            "base_price": 9000, "lot_code": f"TST-GZ{i}", "min_increment": 100,
+        }, headers=seller_headers)
+
+    plain = client.get("/api/vehicles")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    before = client.get("/api/metrics").get_json()["data"]["compression"]
+    r = client.get("/api/vehicles", headers={"Accept-Encoding": "gzip, br"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(r.data)) == plain.get_json()
+    assert len(r.data) < len(plain.data)
+
+    # Mismo cuerpo: se reutiliza el gzip ya calculado
+    client.get("/api/vehicles", headers={"Accept-Encoding": "gzip"})
+    after = client.get("/api/metrics").get_json()["data"]["compression"]
+    assert after["responses"] == before["responses"] + 2
+    assert after["cacheHits"] >= before["cacheHits"] + 1
+    assert after["bytesSaved"] > before["bytesSaved"]
+
+    # q=0 y respuestas chicas van sin comprimir
+    r = client.get("/api/vehicles", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in r.headers
+    r = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in r.headers
+
+def test_sse_is_never_compressed(client):
+    r = client.get("/api/sse/vehicles/1", headers={"Accept-Encoding": "gzip"}, buffered=False)
+    assert r.mimetype == "text/event-stream"
+    assert "Content-Encoding" not in r.headers
+    r.close()
+
+def test_preflight_is_cacheable_and_counted(client):
+    before = client.get("/api/metrics").get_json()["data"]["counters"].get("preflight", 0)
+    r = client.options("/api/vehicles", headers={
+        "Origin": "https://cbid.click",
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "Authorization, Content-Type",
+    })
+    assert r.headers["Access-Control-Max-Age"] == "7200"
+    data = client.get("/api/metrics").get_json()["data"]
+    assert data["counters"]["preflight"] == before + 1
+    assert data["preflightPerMinute"][-1][1] >= 1
+
+def test_metrics_require_admin(app_instance, client, make_seller):
+    app_instance.config["METRICS_PUBLIC"] = False
+    try:
+        assert client.get("/api/metrics").status_code == 401
+        seller = make_seller("seller-mt@test.local")
+        assert client.get("/api/metrics", headers=seller).status_code == 403
+        creds = {"email": "admin-mt@test.local", "password": "admin123"}
+        client.post("/api/auth/register", json={"name": "Admin", "role": "admin", **creds})
+        token = client.post("/api/auth/login", json=creds).get_json()["data"]["token"]
+        r = client.get("/api/metrics", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200 and "histograms" in r.get_json()["data"]
+    finally:
+        app_instance.config["METRICS_PUBLIC"] = True
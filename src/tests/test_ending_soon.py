@@ -0,0 +1,80 @@
+# tests/test_ending_soon.py
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Vehicle
+from app import ending_soon
+
+def _rail(client, ids):
+    data = client.get("/api/vehicles/ending-soon?limit=100").get_json()["data"]
+    ends = [d["endsAt"] for d in data]
+    assert ends == sorted(ends)
+    return [d for d in data if d["id"] in ids]
+
+def test_ending_soon_index(app_instance, client, make_seller, auth_headers):
+    ending_soon.verify(app_instance)
+    seller = make_seller("seller-es@test.local")
+    ids = [client.post("/api/vehicles", json={
+        "make": "Peugeot", "model": "504", "year": 1979,
+        "base_price": 3000, "lot_code": f"TST-ES0{i}", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"] for i in range(2)]
+    a, b = ids
+    assert [d["id"] for d in _rail(client, ids)] == [a, b]
+
+    buyer = auth_headers("buyer-es@test.local", "buyer123")
+    assert client.post(f"/api/vehicles/{b}/bids?amount=3500", headers=buyer).status_code == 200
+
+    # La consulta no toca la BD
+    statements = []
+    def _count(*args):
+        statements.append(args[2])
+    with app_instance.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _count)
+    try:
+        rail = _rail(client, ids)
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", _count)
+    assert statements == []
+    assert rail[1]["currentPrice"] == 3500
+
+    # Cambio por fuera de los eventos: la verificación lo detecta y corrige
+    with app_instance.app_context():
+        db.session.get(Vehicle, b).auction_end_at = datetime.utcnow() + timedelta(minutes=5)
+        db.session.commit()
+    assert ending_soon.verify(app_instance) >= 1
+    assert [d["id"] for d in _rail(client, ids)] == [b, a]
+    assert client.get("/api/metrics").get_json()["data"]["endingSoon"]["lastDrift"] >= 1
+
+    assert client.patch(f"/api/vehicles/{b}/close", headers=seller).status_code == 200
+    assert [d["id"] for d in _rail(client, ids)] == [a]
+    assert ending_soon.verify(app_instance) == 0
+
+def test_cold_index_builds_once_for_concurrent_requests(app_instance, monkeypatch):
+    import threading
+    import time
+    index = ending_soon._INDEX
+    loads = []
+    load = index._load
+
+    def slow_load():
+        loads.append(1)
+        time.sleep(0.2)
+        return load()
+
+    monkeypatch.setattr(index, "_load", slow_load)
+    index.invalidate()
+
+    def worker():
+        with app_instance.app_context():
+            ending_soon.soonest(5)
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads == [1] and index.built
@@ -0,0 +1,57 @@
+# tests/test_facets.py
+from app import facets
+
+def _ids(client, query):
+    r = client.get(f"/api/vehicles?{query}&fields=id")
+    assert r.status_code == 200
+    return sorted(v["id"] for v in r.get_json()["data"])
+
+def _counts(data, name):
+    return {f["value"]: f["count"] for f in data["facets"][name]}
+
+def test_facets_and_filters(app_instance, client, make_seller, auth_headers):
+    facets.verify(app_instance)
+    seller = make_seller("seller-fc@test.local")
+    ids = [client.post("/api/vehicles", json={
+        "make": "Zastava", "model": model, "year": year,
+        "base_price": price, "lot_code": f"TST-FC0{i}", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"]
+        for i, (model, year, price) in enumerate((("750", 1968, 8000), ("101", 1975, 20000), ("101", 1979, 60000)))]
+    a, b, c = ids
+
+    data = client.get("/api/vehicles/facets?make=Zastava").get_json()["data"]
+    assert data["total"] == 3
+    assert _counts(data, "decade") == {1960: 1, 1970: 2}
+    assert _counts(data, "model") == {"750": 1, "101": 2}
+    assert _counts(data, "priceBand") == {0: 1, 10000: 1, 50000: 1}
+    # Cada faceta aplica los demás filtros, no el propio
+    data = client.get("/api/vehicles/facets?make=Zastava&decade=1960").get_json()["data"]
+    assert data["total"] == 1
+    assert _counts(data, "make")["Zastava"] == 1
+    assert _counts(data, "decade") == {1960: 1, 1970: 2}
+
+    assert _ids(client, "make=Zastava&decade=1970") == [b, c]
+    assert _ids(client, "make=Zastava&year=1968") == [a]
+    assert _ids(client, "make=Zastava&min_price=50000") == [c]
+
+    # Una puja mueve el lote de banda sin reconstruir el índice
+    buyer = auth_headers("buyer-fc@test.local", "buyer123")
+    assert client.post(f"/api/vehicles/{b}/bids?amount=55000", headers=buyer).status_code == 200
+    assert _ids(client, "make=Zastava&min_price=50000") == [b, c]
+    data = client.get("/api/vehicles/facets?make=Zastava&price_band=50000").get_json()["data"]
+    assert data["total"] == 2 and _counts(data, "priceBand") == {0: 1, 50000: 2}
+    # El camino SQL (estados fuera del índice) da lo mismo
+    assert _ids(client, "status=all&make=Zastava&min_price=50000") == [b, c]
+    assert _ids(client, "status=all&make=Zastava&price_band=50000") == [b, c]
+    # El listado no depende del índice (por proceso, puede estar atrasado)
+    with facets._INDEX.lock:
+        facets._unindex(c)
+    assert _ids(client, "make=Zastava&min_price=50000") == [b, c]
+    assert facets.verify(app_instance) == 1
+
+    assert client.patch(f"/api/vehicles/{c}/close", headers=seller).status_code == 200
+    assert client.get("/api/vehicles/facets?make=Zastava").get_json()["data"]["total"] == 2
+    assert facets.verify(app_instance) == 0
+
+    assert client.get("/api/vehicles/facets?price_band=123").status_code == 400
+    assert client.get("/api/vehicles?year=abc").status_code == 400
@@ -0,0 +1,57 @@
+# tests/test_fields.py
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.extensions import db
+
+@contextmanager
+def capture_selects(app):
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def _capture(conn, cursor, statement, params, context, executemany):
+        if statement.startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+def test_sparse_fieldsets(app_instance, client, make_seller, auth_headers):
+    seller = make_seller("seller-fs@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Renault", "model": "12", "year": 1976, "description": "x" * 500,
+        "base_price": 2000, "lot_code": "TST-FS01", "min_increment": 50,
+    }, headers=seller).get_json()["data"]["id"]
+    buyer = auth_headers("buyer-fs@test.local", "buyer123")
+    assert client.post(f"/api/vehicles/{vid}/bids?amount=2100", headers=buyer).status_code == 200
+
+    with capture_selects(app_instance) as selects:
+        r = client.get("/api/vehicles?q=TST-FS01&fields=id,make,currentPrice")
+    assert r.get_json()["data"] == [{"id": vid, "make": "Renault", "currentPrice": 2100}]
+    # Ni columnas no pedidas ni la consulta de portadas
+    listed = [s.split("FROM")[0] for s in selects if "FROM vehicles" in s]
+    assert listed and "vehicles.make" in listed[0]
+    assert "vehicles.lot_code" not in listed[0] and "vehicles.auction_end_at" not in listed[0]
+    assert not any("vehicle_images" in s for s in selects)
+
+    r = client.get(f"/api/vehicles/{vid}?fields=id,description")
+    assert r.get_json()["data"] == {"id": vid, "description": "x" * 500}
+    full = client.get(f"/api/vehicles/{vid}").get_json()["data"]
+    assert {"images", "media", "cover", "createdAt", "currentPrice"} <= set(full)
+
+    with capture_selects(app_instance) as selects:
+        r = client.get(f"/api/vehicles/{vid}/bids?fields=amount")
+    assert r.get_json()["data"] == [{"amount": 2100}]
+    assert not any("bids.created_at" in s.split("FROM")[0] for s in selects)
+
+    r = client.get("/api/users/me/history?fields=vehicleId,amount,topAtClose,won", headers=buyer)
+    assert r.get_json()["data"] == [{"vehicleId": vid, "amount": 2100, "topAtClose": 2100, "won": False}]
+    full = client.get("/api/users/me/history", headers=buyer).get_json()["data"][0]
+    assert full["make"] == "Renault" and full["vehicleStatus"] == "active" and full["bidAt"].endswith("Z")
+
+    r = client.get("/api/vehicles?fields=id,price")
+    assert r.status_code == 400
+    assert "price" in r.get_json()["error"]["message"]
@@ -0,0 +1,83 @@
+# tests/test_idempotency.py
+import threading
+from app.idempotency import DatabaseStore, MemoryStore
+
+def test_bid_retry_with_same_key_is_replayed(client, seller_headers, auth_headers):
+    r = client.post("/api/vehicles", json={
+        "make": "Ford", "model": "Falcon", "year": 1972,
+        "base_price": 5000, "lot_code": "TST-ID01", "min_increment": 100,
+    }, headers={**seller_headers, "Idempotency-Key": "veh-ID01"})
+    assert r.status_code == 200
+    vid = r.get_json()["data"]["id"]
+    # Reintento del alta: misma respuesta, no 409 por lote duplicado
+    r2 = client.post("/api/vehicles", json={
+        "make": "Ford", "model": "Falcon", "year": 1972,
+        "base_price": 5000, "lot_code": "TST-ID01", "min_increment": 100,
+    }, headers={**seller_headers, "Idempotency-Key": "veh-ID01"})
+    assert r2.status_code == 200
+    assert r2.headers["Idempotent-Replayed"] == "true"
+    assert r2.get_json()["data"]["id"] == vid
+
+    buyer = auth_headers("buyer@test.local", "buyer123")
+    headers = {**buyer, "Idempotency-Key": "bid-1"}
+    first = client.post(f"/api/vehicles/{vid}/bids?amount=5100", headers=headers)
+    assert first.status_code == 200
+    again = client.post(f"/api/vehicles/{vid}/bids?amount=5100", headers=headers)
+    assert again.status_code == 200
+    assert again.get_json() == first.get_json()
+    assert again.headers["X-Bid-From"] == "query"
+    assert len(client.get(f"/api/vehicles/{vid}/bids").get_json()["data"]) == 1
+
+    # Misma clave con otro cuerpo: error explícito
+    r = client.post(f"/api/vehicles/{vid}/bids?amount=9000", headers=headers)
+    assert r.status_code == 422
+
+    # La clave es por usuario
+    other = auth_headers("other-id@test.local", "other123")
+    r = client.post(f"/api/vehicles/{vid}/bids?amount=5200", headers={**other, "Idempotency-Key": "bid-1"})
+    assert r.status_code == 200
+    assert "Idempotent-Replayed" not in r.headers
+
+def test_memory_store_collapses_in_flight_duplicates():
+    store = MemoryStore(ttl_seconds=60, max_keys=10)
+    assert store.claim("k", "fp", 1) == ("owner", None)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(store.claim("k", "fp", 5)))
+    waiter.start()
+    store.complete("k", {"status": 200, "headers": [], "body": b"{}"})
+    waiter.join(5)
+    assert results == [("replay", {"status": 200, "headers": [], "body": b"{}"})]
+
+    # Si la original falla, el duplicado en espera pasa a ejecutarse
+    assert store.claim("k2", "fp", 1)[0] == "owner"
+    results.clear()
+    waiter = threading.Thread(target=lambda: results.append(store.claim("k2", "fp", 5)))
+    waiter.start()
+    store.release("k2")
+    waiter.join(5)
+    assert results == [("owner", None)]
+
+def test_database_store(app_ctx):
+    store = DatabaseStore(ttl_seconds=60)
+    assert store.claim("db-key", "fp", 0) == ("owner", None)
+    assert store.claim("db-key", "fp", 0) == ("busy", None)
+    store.complete("db-key", {"status": 201, "headers": [["X-A", "1"]], "body": b"ok"})
+    assert store.claim("db-key", "fp", 0) == ("replay", {"status": 201, "headers": [["X-A", "1"]], "body": b"ok"})
+    assert store.claim("db-key", "other", 0) == ("mismatch", None)
+    store.release("db-key")
+    assert store.claim("db-key", "fp", 0) == ("owner", None)
+
+def test_rejected_bid_with_db_store_does_not_wait_for_writer(app_instance, client, make_seller, auth_headers, monkeypatch):
+    # Perfil sqlite: la sesión aún tiene el escritor (SELECT ... FOR UPDATE sin commit)
+    monkeypatch.setitem(app_instance.extensions, "idempotency", DatabaseStore(3600))
+    seller = make_seller("seller-idw@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Ford", "model": "Taunus", "year": 1976,
+        "base_price": 5000, "lot_code": "TST-ID03", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"]
+    headers = {**auth_headers("buyer-idw@test.local", "buyer123"), "Idempotency-Key": "low-1"}
+    r = client.post(f"/api/vehicles/{vid}/bids?amount=10", headers=headers)
+    assert r.status_code == 400
+    again = client.post(f"/api/vehicles/{vid}/bids?amount=10", headers=headers)
+    assert again.status_code == 400 and again.headers["Idempotent-Replayed"] == "true"
+    assert client.post(f"/api/vehicles/{vid}/bids?amount=5100", headers={**headers, "Idempotency-Key": "ok-1"}).status_code == 200
@@ -0,0 +1,69 @@
+# tests/test_import.py
+import json
+
+def test_import_csv_with_row_errors(client, seller_headers):
+    body = (
+        "make,model,year,base_price,lot_code,images\n"
+        "Ford,Falcon,1965,50000,IMP-001,https://a.jpg|https://b.jpg\n"
+        "Ford,Falcon,1800,50000,IMP-002,\n"          # año inválido
+        "Fiat,600,1970,9000,IMP-001,\n"               # duplicado en el archivo
+        "Volkswagen,Beetle,1972,12000,IMP-003,\n"
+    )
+    r = client.post("/api/vehicles/import", data=body,
+                    content_type="text/csv", headers=seller_headers)
+    assert r.status_code == 200
+    res = r.get_json()["data"]
+    assert res["inserted"] == 2
+    assert [e["row"] for e in res["errors"]] == [2, 3]
+
+    r = client.get("/api/vehicles?q=IMP-001")
+    item = r.get_json()["data"][0]
+    assert item["images"] == ["https://a.jpg"]  # el listado solo trae la portada
+    r = client.get(f"/api/vehicles/{item['id']}")
+    assert r.get_json()["data"]["images"] == ["https://a.jpg", "https://b.jpg"]
+
+    # el 409 de create_vehicle lo respalda el índice único
+    r = client.post("/api/vehicles", json={
+        "make": "Ford", "model": "Falcon", "year": 1965,
+        "base_price": 50000, "lot_code": "IMP-003",
+    }, headers=seller_headers)
+    assert r.status_code == 409
+
+def test_import_ndjson_reports_existing_lots(client, seller_headers):
+    lines = [
+        {"make": "Jeep", "model": "CJ5", "year": 1980, "base_price": 20000, "lot_code": "IMP-010"},
+        {"make": "Jeep", "model": "CJ7", "year": 1982, "base_price": 22000, "lot_code": "IMP-001"},
+    ]
+    body = "\n".join(json.dumps(x) for x in lines) + "\nno-json\n"
+    r = client.post("/api/vehicles/import?format=ndjson", data=body, headers=seller_headers)
+    res = r.get_json()["data"]
+    assert res["inserted"] == 1
+    assert [(e["row"], e["lotCode"]) for e in res["errors"]] == [(2, "IMP-001"), (3, None)]
+
+    r = client.post("/api/vehicles/import", data=body, content_type="text/plain", headers=seller_headers)
+    assert r.status_code == 415
+
+def test_lot_code_races_are_reported_not_raised(client, make_seller, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+    from app import importer
+    from app.models import Watchlist
+    seller = make_seller("seller-im@test.local")
+    body = "make,model,year,base_price,lot_code\nFord,Falcon,1965,50000,TST-IM1\n"
+    assert client.post("/api/vehicles/import", data=body, content_type="text/csv",
+                       headers=seller).get_json()["data"]["inserted"] == 1
+
+    # La consulta previa nunca ve el lote (otro import lo inserta en el medio)
+    monkeypatch.setattr(importer, "_existing_lot_codes", lambda codes: set())
+    r = client.post("/api/vehicles/import", data=body, content_type="text/csv", headers=seller)
+    assert r.status_code == 200
+    res = r.get_json()["data"]
+    assert res["inserted"] == 0 and [(e["row"], e["lotCode"]) for e in res["errors"]] == [(1, "TST-IM1")]
+
+    # Otra restricción (no lot_code) no se informa como lote duplicado
+    def fk_error(*args):
+        raise IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed"))
+    monkeypatch.setattr(Watchlist, "ensure", staticmethod(fk_error))
+    r = client.post("/api/vehicles", json={
+        "make": "Ford", "model": "Falcon", "year": 1965, "base_price": 50000, "lot_code": "TST-IM2",
+    }, headers=seller)
+    assert r.status_code == 400
@@ -0,0 +1,38 @@
+# tests/test_leader.py
+from app.extensions import scheduler
+from app.leader import LeaderElector
+
+def test_scheduler_is_lazy(client):
+    r = client.get("/api/health")
+    assert r.status_code == 200
+    # SCHEDULER_ENABLED=False en tests: nunca arranca threads
+    assert not scheduler.running
+
+def test_scheduler_starts_on_first_request_not_in_create_app(tmp_path, monkeypatch):
+    from app import create_app
+    started = []
+    monkeypatch.setattr(scheduler, "start", lambda *a, **k: started.append(1))
+    app = create_app({
+        "TESTING": True,
+        "SCHEDULER_ENABLED": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'lazy.sqlite'}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {},
+        "LEADER_LOCK_FILE": str(tmp_path / "jobs.lock"),
+    })
+    # create_app (y con ella cualquier comando `flask`) no arranca jobs
+    assert started == []
+    app.test_client().get("/api/health")
+    assert started
+
+def test_single_leader_and_takeover(app_instance):
+    a, b = LeaderElector(), LeaderElector()
+    assert a.heartbeat(app_instance) is True
+    assert b.heartbeat(app_instance) is False
+    # sigue siendo líder en el siguiente latido
+    assert a.heartbeat(app_instance) is True
+
+    # el líder "muere": el otro proceso toma el relevo
+    a.release()
+    assert b.heartbeat(app_instance) is True
+    assert a.heartbeat(app_instance) is False
+    b.release()
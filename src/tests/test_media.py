@@ -0,0 +1,66 @@
+# tests/test_media.py
+import io
+import time
+from PIL import Image
+
+def _png(w, h):
+    buf = io.BytesIO()
+    Image.new("RGB", (w, h), (200, 30, 30)).save(buf, "PNG")
+    return buf.getvalue()
+
+def _wait_media(client, vid, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        media = client.get(f"/api/vehicles/{vid}").get_json()["data"]["media"]
+        if media and all(m["variants"] for m in media):
+            return media
+        time.sleep(0.05)
+    raise AssertionError("Las variantes no se generaron a tiempo")
+
+def test_upload_builds_variants_and_serves_immutable(client, seller_headers, auth_headers):
+    r = client.post("/api/vehicles", json={
+        "make": "Fiat", "model": "600", "year": 1965,
+        "base_price": 3000, "lot_code": "TST-MD01", "min_increment": 100,
+    }, headers=seller_headers)
+    vid = r.get_json()["data"]["id"]
+
+    buyer = auth_headers("buyer@test.local", "buyer123")
+    r = client.post(f"/api/vehicles/{vid}/images", headers=buyer,
+                    data={"file": (io.BytesIO(_png(10, 10)), "a.png")})
+    assert r.status_code == 403
+
+    r = client.post(f"/api/vehicles/{vid}/images", headers=seller_headers,
+                    data={"file": (io.BytesIO(b"no es una imagen"), "a.txt")})
+    assert r.status_code == 415
+
+    r = client.post(f"/api/vehicles/{vid}/images", headers=seller_headers,
+                    data={"file": [(io.BytesIO(_png(2000, 1000)), "a.png"),
+                                   (io.BytesIO(_png(400, 300)), "b.png")]})
+    assert r.status_code == 202
+    uploaded = r.get_json()["data"]["images"]
+    assert [img["position"] for img in uploaded] == [0, 1]
+    assert uploaded[0]["url"].endswith("/original.png")
+
+    media = _wait_media(client, vid)
+    thumb = media[0]["variants"]["thumb"]
+    assert (thumb["w"], thumb["h"]) == (320, 160)
+    assert media[0]["variants"]["medium"]["w"] == 1024
+    # No se amplía una foto más chica que la caja
+    assert media[1]["variants"]["medium"]["w"] == 400
+
+    # El catálogo referencia la miniatura, no el original
+    items = client.get("/api/vehicles").get_json()["data"]
+    card = next(it for it in items if it["id"] == vid)
+    assert card["images"] == [thumb["url"]]
+
+    r = client.get(thumb["url"])
+    assert r.status_code == 200
+    assert r.mimetype == "image/jpeg"
+    assert "immutable" in r.headers["Cache-Control"]
+    etag = r.headers["ETag"]
+    r.close()
+    r = client.get(thumb["url"], headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    r.close()
+
+    assert client.get(thumb["url"].replace("thumb.jpg", "../etc.jpg")).status_code == 404
@@ -0,0 +1,78 @@
+# tests/test_migrations.py
+import os
+import sqlite3
+from flask_migrate import upgrade
+from app import create_app
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+def test_vehicle_images_migration_tolerates_null_images(tmp_path):
+    # Tabla vehicles como la dejó 446dc04e5e21 (solo las columnas que lee la migración)
+    path = tmp_path / "old.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE vehicles (id INTEGER PRIMARY KEY, images JSON)")
+    conn.executemany("INSERT INTO vehicles (id, images) VALUES (?, ?)", [
+        (1, '["https://a.jpg", "", 5, "https://b.jpg"]'),
+        (2, "null"),
+        (3, None),
+        (4, '{"url": "https://c.jpg"}'),
+    ])
+    conn.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)")
+    conn.execute("INSERT INTO alembic_version VALUES ('446dc04e5e21')")
+    conn.commit()
+    conn.close()
+
+    app = create_app({
+        "TESTING": True,
+        "SCHEDULER_ENABLED": False,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {},
+    })
+    with app.app_context():
+        upgrade(directory=MIGRATIONS, revision="445f32142aca")
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT vehicle_id, position, url FROM vehicle_images ORDER BY id").fetchall()
+    columns = [r[1] for r in conn.execute("PRAGMA table_info(vehicles)")]
+    conn.close()
+    assert rows == [(1, 0, "https://a.jpg"), (1, 1, "https://b.jpg")]
+    assert "images" not in columns
+
+def test_bid_summary_migration_backfills_existing_bids(tmp_path):
+    path = tmp_path / "bids.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE vehicles (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE bids (id INTEGER PRIMARY KEY, vehicle_id INTEGER, bidder_id INTEGER, "
+                 "amount INTEGER, created_at DATETIME)")
+    conn.executemany("INSERT INTO bids (vehicle_id, bidder_id, amount, created_at) VALUES (?, ?, ?, ?)", [
+        (1, 10, 100, "2026-01-01 10:00:00"),
+        (1, 11, 200, "2026-01-01 11:00:00"),
+        (1, 10, 300, "2026-01-01 12:00:00"),
+        (2, 11, 500, "2026-01-02 10:00:00"),
+    ])
+    conn.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)")
+    conn.execute("INSERT INTO alembic_version VALUES ('972588e0c025')")
+    conn.commit()
+    conn.close()
+
+    app = create_app({
+        "TESTING": True,
+        "SCHEDULER_ENABLED": False,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {},
+    })
+    with app.app_context():
+        upgrade(directory=MIGRATIONS, revision="b7d2e94c1a06")
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT user_id, vehicle_id, max_amount, bid_count, last_bid_at, is_leading "
+        "FROM user_vehicle_bid_summary ORDER BY vehicle_id, user_id"
+    ).fetchall()
+    conn.close()
+    assert rows == [
+        (10, 1, 300, 2, "2026-01-01 12:00:00", 1),
+        (11, 1, 200, 1, "2026-01-01 11:00:00", 0),
+        (11, 2, 500, 1, "2026-01-02 10:00:00", 1),
+    ]
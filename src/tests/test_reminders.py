@@ -0,0 +1,42 @@
+# tests/test_reminders.py
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Vehicle, Notification
+from app.tasks import dispatch_reminders
+
+def test_reminders_by_bucket_are_idempotent(app_instance, client, seller_headers, auth_headers):
+    r = client.post("/api/vehicles", json={
+        "make": "Porsche", "model": "911", "year": 1973,
+        "base_price": 90000, "lot_code": "TST-R01", "min_increment": 1000,
+    }, headers=seller_headers)
+    vid = r.get_json()["data"]["id"]
+
+    bidder = auth_headers("bidder-r@test.local", "bid123")
+    watcher = auth_headers("watcher-r@test.local", "watch123")
+    assert client.post(f"/api/vehicles/{vid}/bids", json={"amount": 91000}, headers=bidder).status_code == 200
+    assert client.post(f"/api/vehicles/{vid}/watch", headers=watcher).status_code == 200
+
+    with app_instance.app_context():
+        db.session.get(Vehicle, vid).auction_end_at = datetime.utcnow() + timedelta(minutes=30)
+        db.session.commit()
+
+    def reminders():
+        with app_instance.app_context():
+            return [n for n in Notification.query.filter_by(type="reminder").all()
+                    if n.payload["vehicle_id"] == vid]
+
+    # vendedor + pujador + seguidor, una vez cada uno
+    dispatch_reminders(app_instance)
+    assert len(reminders()) == 3
+    assert {n.payload["minutes"] for n in reminders()} == {60}
+
+    dispatch_reminders(app_instance)
+    assert len(reminders()) == 3
+
+    # entra en la cubeta de 10 minutos
+    dispatch_reminders(app_instance, now=datetime.utcnow() + timedelta(minutes=25))
+    assert sorted(n.payload["minutes"] for n in reminders()) == [10, 10, 10, 60, 60, 60]
+
+    r = client.get("/api/users/me/notifications", headers=watcher)
+    labels = [n["typeLabel"] for n in r.get_json()["data"] if n["type"] == "reminder"]
+    assert labels == ["Recordatorio", "Recordatorio"]
@@ -0,0 +1,71 @@
+# tests/test_retry.py
+import random
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.sqlite_profile import write_engine
+
+class _Deadlock(Exception):
+    """Imita el error de PyMySQL: args = (código, mensaje)."""
+
+@contextmanager
+def inject_deadlocks(app, prefix, rate, seed=7):
+    rnd = random.Random(seed)
+    with app.app_context():
+        engine = write_engine(db)
+
+    def _maybe_fail(conn, cursor, statement, params, context, executemany):
+        if statement.startswith(prefix) and rnd.random() < rate:
+            raise OperationalError(statement, params, _Deadlock(1213, "Deadlock found when trying to get lock"))
+
+    event.listen(engine, "before_cursor_execute", _maybe_fail)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", _maybe_fail)
+
+@pytest.fixture()
+def fast_retries(app_instance):
+    saved = {k: app_instance.config[k] for k in ("TX_RETRY_BASE_DELAY", "TX_RETRY_ATTEMPTS", "TX_RETRY_BUDGET")}
+    app_instance.config.update(TX_RETRY_BASE_DELAY=0.001, TX_RETRY_ATTEMPTS=6, TX_RETRY_BUDGET=10)
+    yield
+    app_instance.config.update(saved)
+
+def _counters(client):
+    return client.get("/api/metrics").get_json()["data"]["counters"]
+
+def test_bids_survive_injected_deadlocks(app_instance, client, make_seller, auth_headers, fast_retries):
+    seller_headers = make_seller("seller-rt@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Dodge", "model": "Dart", "year": 1974,
+        "base_price": 1000, "lot_code": "TST-RT01", "min_increment": 10,
+    }, headers=seller_headers).get_json()["data"]["id"]
+    buyer = auth_headers("buyer@test.local", "buyer123")
+    retries_before = _counters(client).get("tx.retries.place_bid", 0)
+
+    ok = 0
+    with inject_deadlocks(app_instance, "INSERT INTO bids", rate=0.3):
+        for i in range(1, 41):
+            r = client.post(f"/api/vehicles/{vid}/bids?amount={1000 + i * 10}", headers=buyer)
+            ok += r.status_code == 200
+    assert ok / 40 == 1.0
+    assert len(client.get(f"/api/vehicles/{vid}/bids").get_json()["data"]) == 40
+    assert _counters(client)["tx.retries.place_bid"] > retries_before
+
+def test_persistent_deadlock_gives_up_with_503(app_instance, client, make_seller, auth_headers, fast_retries):
+    seller_headers = make_seller("seller-rt@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Dodge", "model": "Dart", "year": 1974,
+        "base_price": 1000, "lot_code": "TST-RT02", "min_increment": 10,
+    }, headers=seller_headers).get_json()["data"]["id"]
+    buyer = auth_headers("buyer@test.local", "buyer123")
+    giveups_before = _counters(client).get("tx.giveups.place_bid", 0)
+
+    with inject_deadlocks(app_instance, "INSERT INTO bids", rate=1.0):
+        r = client.post(f"/api/vehicles/{vid}/bids?amount=1010", headers=buyer)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+    assert _counters(client)["tx.giveups.place_bid"] == giveups_before + 1
+    assert client.get(f"/api/vehicles/{vid}/bids").get_json()["data"] == []
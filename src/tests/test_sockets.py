@@ -0,0 +1,173 @@
+# tests/test_sockets.py
+from app.extensions import socketio
+
+def _mk_vehicle(client, headers, lot_code, base_price):
+    r = client.post("/api/vehicles", json={
+        "make": "Fiat", "model": "128", "year": 1975,
+        "base_price": base_price, "lot_code": lot_code, "min_increment": 500,
+    }, headers=headers)
+    return r.get_json()["data"]["id"]
+
+def test_subscribe_vehicles_returns_snapshot(app_instance, client, seller_headers, auth_headers):
+    from app import realtime
+    a = _mk_vehicle(client, seller_headers, "TST-S01", 10000)
+    b = _mk_vehicle(client, seller_headers, "TST-S02", 20000)
+    buyer = auth_headers("sock@test.local", "sock123")
+    assert client.post(f"/api/vehicles/{a}/bids", json={"amount": 12000}, headers=buyer).status_code == 200
+
+    sio = socketio.test_client(app_instance, namespace="/rt")
+    sio.get_received("/rt")
+    sio.emit("subscribe_vehicles", {"vehicleIds": [a, b, str(a), 999999]}, namespace="/rt")
+    events = [e for e in sio.get_received("/rt") if e["name"] == "vehicles_snapshot"]
+    assert len(events) == 1
+    snap = {v["id"]: v for v in events[0]["args"][0]["vehicles"]}
+    assert set(snap) == {a, b}
+    assert snap[a]["currentPrice"] == 12000 and snap[a]["seq"] == 1
+    assert snap[b]["currentPrice"] == 20000 and snap[b]["seq"] == 0
+    assert snap[a]["minIncrement"] == 500 and snap[a]["status"] == "active"
+    assert snap[a]["epoch"] == realtime.EPOCH
+
+    # ya está en la sala: recibe la siguiente puja con seq consecutivo
+    assert client.post(f"/api/vehicles/{a}/bids", json={"amount": 13000}, headers=buyer).status_code == 200
+    tops = [e["args"][0] for e in sio.get_received("/rt") if e["name"] == "top-updated"]
+    assert len(tops) == 1 and len(tops[0].pop("traceId")) == 16 and tops[0].pop("committedAt") > 0
+    assert tops == [{"vehicleId": a, "top": 13000, "bidId": tops[0]["bidId"], "seq": 2,
+                     "epoch": realtime.EPOCH}]
+    sio.disconnect(namespace="/rt")
+
+def test_resume_replays_gap_or_sends_snapshot(app_instance, client, seller_headers, auth_headers, monkeypatch):
+    from app import realtime
+    a = _mk_vehicle(client, seller_headers, "TST-S03", 10000)
+    b = _mk_vehicle(client, seller_headers, "TST-S04", 10000)
+    buyer = auth_headers("sock@test.local", "sock123")
+    for amount in (11000, 12000, 13000):
+        assert client.post(f"/api/vehicles/{a}/bids", json={"amount": amount}, headers=buyer).status_code == 200
+
+    # b pierde su historial: el buffer solo guarda los 2 últimos
+    monkeypatch.setattr(realtime, "BUFFER_SIZE", 2)
+    for amount in (11000, 12000, 13000):
+        assert client.post(f"/api/vehicles/{b}/bids", json={"amount": amount}, headers=buyer).status_code == 200
+
+    sio = socketio.test_client(app_instance, namespace="/rt")
+    sio.get_received("/rt")
+    sio.emit("resume", {"epoch": realtime.EPOCH, "vehicles": {str(a): 1, str(b): 0}}, namespace="/rt")
+    resumed = [e["args"][0] for e in sio.get_received("/rt") if e["name"] == "resumed"][0]
+
+    assert [r["vehicleId"] for r in resumed["replay"]] == [a]
+    events = resumed["replay"][0]["events"]
+    assert [(e["event"], e["data"]["seq"], e["data"]["top"]) for e in events] == [
+        ("top-updated", 2, 12000), ("top-updated", 3, 13000),
+    ]
+    assert [(s["id"], s["seq"], s["currentPrice"]) for s in resumed["snapshots"]] == [(b, 3, 13000)]
+
+    # al día: nada que reponer
+    sio.emit("resume", {"epoch": realtime.EPOCH, "vehicles": {str(a): 3}}, namespace="/rt")
+    resumed = [e["args"][0] for e in sio.get_received("/rt") if e["name"] == "resumed"][0]
+    assert resumed == {"replay": [], "snapshots": [], "epoch": realtime.EPOCH}
+
+    # seqs de otro arranque (o sin epoch): snapshot aunque el número coincida
+    for epoch in ("otro-arranque", None):
+        sio.emit("resume", {"epoch": epoch, "vehicles": {str(a): 3}}, namespace="/rt")
+        resumed = [e["args"][0] for e in sio.get_received("/rt") if e["name"] == "resumed"][0]
+        assert resumed["replay"] == [] and [s["id"] for s in resumed["snapshots"]] == [a]
+    sio.disconnect(namespace="/rt")
+
+def test_bid_trace_and_ack_histograms(app_instance, client, make_seller, auth_headers):
+    seller = make_seller("seller-tr@test.local")
+    vid = _mk_vehicle(client, seller, "TST-S05", 1000)
+    buyer = auth_headers("trace@test.local", "trace123")
+
+    def hist(name):
+        h = client.get("/api/metrics").get_json()["data"]["histograms"]
+        return h.get(name, {}).get("count", 0)
+
+    before = {n: hist(n) for n in ("latency.socketio.commit_to_ack", "latency.sse.commit_to_ack",
+                                   "latency.socketio.commit_to_emit", "bid.commit_ms")}
+    sio = socketio.test_client(app_instance, namespace="/rt")
+    sio.emit("subscribe_vehicles", {"vehicleIds": [vid]}, namespace="/rt")
+    sio.get_received("/rt")
+
+    app_instance.config["TRACE_ACK_SAMPLE_RATE"] = 1.0
+    try:
+        assert client.post(f"/api/vehicles/{vid}/bids?amount=1500", headers=buyer).status_code == 200
+    finally:
+        app_instance.config["TRACE_ACK_SAMPLE_RATE"] = 0.0
+    event = next(e["args"][0] for e in sio.get_received("/rt") if e["name"] == "top-updated")
+    assert event["ackRequested"] is True
+    ack = {k: event[k] for k in ("traceId", "committedAt", "ackToken")}
+
+    sio.emit("ack", ack, namespace="/rt")
+    acks = [
+        ack,
+        {"traceId": "x", "committedAt": "no-es-numero"},
+        # Timestamps inventados: sin token, futuro o fuera de la ventana
+        {**ack, "ackToken": None},
+        {**ack, "committedAt": event["committedAt"] + 3_600_000},
+        {**ack, "committedAt": event["committedAt"] - 3_600_000},
+    ]
+    assert client.post("/api/sse/acks", json={"acks": acks}).status_code == 401
+    r = client.post("/api/sse/acks", json={"acks": acks}, headers=buyer)
+    assert r.get_json()["data"]["recorded"] == 1
+    sio.disconnect(namespace="/rt")
+
+    assert hist("latency.socketio.commit_to_ack") == before["latency.socketio.commit_to_ack"] + 1
+    assert hist("latency.sse.commit_to_ack") == before["latency.sse.commit_to_ack"] + 1
+    assert hist("latency.socketio.commit_to_emit") == before["latency.socketio.commit_to_emit"] + 1
+    assert hist("bid.commit_ms") == before["bid.commit_ms"] + 1
+    phases = client.get("/api/metrics").get_json()["data"]["histograms"]
+    assert {"bid.lock_wait_ms", "bid.insert_ms", "bid.fanout_ms"} <= set(phases)
+
+def test_compact_protocol_batches_one_binary_frame_per_tick(app_instance, client, make_seller, auth_headers):
+    import msgpack
+    from app import compact
+
+    seller = make_seller("seller-cp@test.local")
+    vid = _mk_vehicle(client, seller, "TST-S06", 1000)
+    buyer = auth_headers("compact@test.local", "compact123")
+
+    app_instance.config["RT_COMPACT_TICK_MS"] = 600_000  # el test hace flush() a mano
+    plain = socketio.test_client(app_instance, namespace="/rt")
+    fast = socketio.test_client(app_instance, namespace="/rt", auth={"protocol": "compact"})
+    hello = [e["args"][0] for e in fast.get_received("/rt") if e["name"] == "connected"][0]
+    assert hello["protocol"] == "compact" and hello["codes"]["events"]["top-updated"] == 1
+    for sio in (plain, fast):
+        sio.emit("subscribe_vehicles", {"vehicleIds": [vid]}, namespace="/rt")
+        sio.get_received("/rt")
+
+    for amount in (1500, 2000):
+        assert client.post(f"/api/vehicles/{vid}/bids?amount={amount}", headers=buyer).status_code == 200
+    assert [e["name"] for e in plain.get_received("/rt")] == ["top-updated", "top-updated"]
+    assert fast.get_received("/rt") == []
+
+    assert compact.flush() == 1
+    frames = [e for e in fast.get_received("/rt") if e["name"] == "f"]
+    assert len(frames) == 1
+    events = msgpack.unpackb(frames[0]["args"][0])
+    assert [(code, ev["v"], ev["t"]) for code, ev in events] == [(1, vid, 1500), (1, vid, 2000)]
+    assert events[1][1]["s"] == events[0][1]["s"] + 1
+    assert plain.get_received("/rt") == []
+
+    fast.disconnect(namespace="/rt")
+    plain.disconnect(namespace="/rt")
+    app_instance.config["RT_COMPACT_TICK_MS"] = 50
+    assert not compact.SIDS
+
+def test_snapshot_seq_is_read_before_the_price(app_instance, client, make_seller, auth_headers, monkeypatch):
+    from app import realtime
+    seller = make_seller("seller-snap@test.local")
+    vid = _mk_vehicle(client, seller, "TST-S07", 1000)
+    buyer = auth_headers("snap@test.local", "snap123")
+    assert client.post(f"/api/vehicles/{vid}/bids?amount=1500", headers=buyer).status_code == 200
+    before = realtime.current_seq(vid)
+
+    # Una puja confirmada mientras corre la consulta: su evento (seq + 1) no
+    # puede quedar cubierto por el snapshot
+    query = realtime.price_rows
+    def racing(ids):
+        realtime.broadcast_vehicle(vid, "top-updated", {"vehicleId": vid, "amount": 2000})
+        return query(ids)
+    monkeypatch.setattr(realtime, "price_rows", racing)
+    with app_instance.app_context():
+        [snap] = realtime.vehicle_snapshots([vid])
+    assert snap["seq"] == before
+    assert [e["data"]["seq"] for e in realtime.events_since(vid, snap["seq"], realtime.EPOCH)] == [before + 1]
@@ -0,0 +1,48 @@
+# tests/test_sqlite_profile.py
+import threading
+from sqlalchemy import insert, select
+from app.extensions import db
+from app.models import Bid, Vehicle
+from app.sqlite_profile import WRITER_BIND
+
+def test_pragmas_and_routing(app_instance):
+    with app_instance.app_context():
+        writer = db.engines[WRITER_BIND]
+        for engine in (db.engine, writer):
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+                assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+                assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+        assert db.session.get_bind(clause=select(Vehicle)) is db.engine
+        assert db.session.get_bind(clause=select(Vehicle).with_for_update()) is writer
+        assert db.session.get_bind(clause=insert(Bid)) is writer
+        # Una vez en el escritor, el resto de la transacción se queda ahí
+        db.session.execute(select(Vehicle.id).with_for_update()).all()
+        assert db.session.get_bind(clause=select(Vehicle)) is writer
+        db.session.rollback()
+        assert db.session.get_bind(clause=select(Vehicle)) is db.engine
+
+def test_concurrent_bids_do_not_hit_database_locked(app_instance, client, make_seller, auth_headers):
+    seller = make_seller("seller-sq@test.local")
+    vids = [client.post("/api/vehicles", json={
+        "make": "Fiat", "model": "128", "year": 1975,
+        "base_price": 1000, "lot_code": f"TST-SQ{i:02d}", "min_increment": 10,
+    }, headers=seller).get_json()["data"]["id"] for i in range(6)]
+    buyer = auth_headers("buyer-sq@test.local", "buyer123")
+    giveups = lambda: client.get("/api/metrics").get_json()["data"]["counters"].get("tx.giveups.place_bid", 0)
+    giveups_before = giveups()
+
+    statuses = []
+    def _bidder(vid):
+        c = app_instance.test_client()
+        for i in range(1, 11):
+            statuses.append(c.post(f"/api/vehicles/{vid}/bids?amount={1000 + i * 10}", headers=buyer).status_code)
+
+    threads = [threading.Thread(target=_bidder, args=(vid,)) for vid in vids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert statuses.count(200) == 60
+    assert giveups() == giveups_before
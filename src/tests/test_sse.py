@@ -18,3 +18,72 @@ def test_sse_endpoint_available(client, seller_headers):
     # Nota: el test client no mantiene el stream, pero sí valida headers
     assert r.status_code == 200
     assert r.mimetype == "text/event-stream"
+    r.close()  # cierra el generador dentro de su contexto
+
+def test_sse_multiplexed_stream(client, seller_headers, auth_headers):
+    import json
+    from app.sse import CHANNELS
+
+    def vehicle(lot):
+        r = client.post("/api/vehicles", json={
+            "make": "Renault", "model": "12", "year": 1978, "base_price": 8000,
+            "lot_code": lot, "min_increment": 500,
+        }, headers=seller_headers)
+        return r.get_json()["data"]["id"]
+
+    a, b = vehicle("TST-M01"), vehicle("TST-M02")
+    watcher = auth_headers("mux@test.local", "mux123")
+    other = auth_headers("mux2@test.local", "mux123")
+    token = watcher["Authorization"].split()[1]
+
+    r = client.get(f"/api/sse?vehicles={a}&token={token}")
+    assert r.mimetype == "text/event-stream"
+    chunks = iter(r.response)
+
+    def next_event():
+        lines = next(chunks)
+        lines = lines.decode() if isinstance(lines, bytes) else lines
+        event, data = lines.strip().split("\n")
+        return event[len("event: "):], json.loads(data[len("data: "):])
+
+    event, ready = next_event()
+    assert event == "ready"
+    me = client.get("/api/auth/me", headers=watcher).get_json()["data"]["id"]
+    assert ready["channels"] == sorted([f"user:{me}", f"vehicle:{a}"])
+
+    # otro usuario (o sin token) no puede cambiar el stream aunque sepa el id
+    url = f"/api/sse/streams/{ready['streamId']}"
+    assert client.post(url, json={"add": [b], "remove": [a]}).status_code == 401
+    assert client.post(url, json={"add": [b], "remove": [a]}, headers=other).status_code == 404
+    assert ready["channels"] == sorted([f"user:{me}", f"vehicle:{a}"])
+
+    # cambio de suscripción sin reconectar
+    r2 = client.post(url, json={"add": [b], "remove": [a]}, headers=watcher)
+    assert r2.get_json()["data"]["channels"] == sorted([f"user:{me}", f"vehicle:{b}"])
+    assert f"vehicle:{a}" not in CHANNELS  # canal vacío eliminado
+
+    # puja del watcher en b y luego otro lo supera: ambos eventos por el mismo stream
+    assert client.post(f"/api/vehicles/{b}/bids", json={"amount": 8500}, headers=watcher).status_code == 200
+    assert client.post(f"/api/vehicles/{b}/bids", json={"amount": 9000}, headers=other).status_code == 200
+    got = [next_event() for _ in range(3)]
+    assert [(e, d["channel"]) for e, d in got] == [
+        ("top-updated", f"vehicle:{b}"),
+        ("top-updated", f"vehicle:{b}"),
+        ("notification", f"user:{me}"),
+    ]
+    assert got[2][1]["data"]["type"] == "outbid"
+
+    r.close()
+    assert f"vehicle:{b}" not in CHANNELS and f"user:{me}" not in CHANNELS
+    assert client.post(url, json={"add": [a]}, headers=watcher).status_code == 404
+
+def test_sse_anonymous_stream_cannot_be_retargeted(client, auth_headers):
+    import json
+    r = client.get("/api/sse?vehicles=1")
+    data = next(iter(r.response))
+    data = data.decode() if isinstance(data, bytes) else data
+    ready = json.loads(data.strip().split("\n")[1][len("data: "):])
+    headers = auth_headers("mux3@test.local", "mux123")
+    r2 = client.post(f"/api/sse/streams/{ready['streamId']}", json={"add": [2]}, headers=headers)
+    assert r2.status_code == 404
+    r.close()
@@ -0,0 +1,24 @@
+# tests/test_synthetic.py
+from sqlalchemy import func
+from app.extensions import db
+from app.models import Bid, User
+
+def test_bench_seed_generates_skewed_volume(app_instance):
+    runner = app_instance.test_cli_runner()
+    r = runner.invoke(args=["bench-seed", "--users", "40", "--vehicles", "30",
+                            "--bids", "600", "--batch-size", "100"])
+    assert r.exit_code == 0, r.output
+    assert "600 pujas" in r.output
+
+    with app_instance.app_context():
+        assert User.query.filter(User.email.like("%@carbid.bench")).count() == 40
+        per_lot = sorted(
+            (n for _, n in db.session.query(Bid.vehicle_id, func.count(Bid.id))
+             .join(User, User.id == Bid.bidder_id)
+             .filter(User.email.like("%@carbid.bench"))
+             .group_by(Bid.vehicle_id).all()),
+            reverse=True,
+        )
+        assert sum(per_lot) == 600
+        # lotes calientes: el más pujado supera con holgura a la mediana
+        assert per_lot[0] > 3 * per_lot[len(per_lot) // 2]
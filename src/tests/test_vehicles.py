@@ -48,3 +48,141 @@ def test_create_vehicle_and_bid_flow(client, seller_headers, auth_headers):
                     headers=buyer_headers)
     assert r.status_code == 400
     assert r.get_json()["error"]["min_required"] == 202000
+
+def test_vehicle_changes_feed(client, seller_headers, auth_headers):
+    r = client.get("/api/vehicles/changes?since=0&limit=1000")
+    since = r.get_json()["data"]["seq"]
+
+    ids = []
+    for lot in ("TST-C01", "TST-C02"):
+        r = client.post("/api/vehicles", json={
+            "make": "Peugeot", "model": "504", "year": 1976,
+            "base_price": 7000, "lot_code": lot, "min_increment": 500,
+        }, headers=seller_headers)
+        ids.append(r.get_json()["data"]["id"])
+
+    r = client.get(f"/api/vehicles/changes?since={since}")
+    feed = r.get_json()["data"]
+    assert [v["id"] for v in feed["vehicles"]] == ids
+    assert feed["tombstones"] == [] and feed["hasMore"] is False
+    since = feed["seq"]
+
+    # nada nuevo
+    r = client.get(f"/api/vehicles/changes?since={since}")
+    assert r.get_json()["data"] == {"vehicles": [], "tombstones": [], "seq": since, "hasMore": False}
+
+    # una puja en el primero y el cierre del segundo
+    buyer = auth_headers("feed@test.local", "feed123")
+    assert client.post(f"/api/vehicles/{ids[0]}/bids", json={"amount": 7500}, headers=buyer).status_code == 200
+    assert client.patch(f"/api/vehicles/{ids[1]}/close", headers=seller_headers).status_code == 200
+
+    r = client.get(f"/api/vehicles/changes?since={since}&limit=1")
+    feed = r.get_json()["data"]
+    assert [(v["id"], v["currentPrice"]) for v in feed["vehicles"]] == [(ids[0], 7500)]
+    assert feed["hasMore"] is True
+
+    r = client.get(f"/api/vehicles/changes?since={feed['seq']}")
+    feed = r.get_json()["data"]
+    assert feed["vehicles"] == []
+    assert feed["tombstones"] == [{"id": ids[1], "status": "closed", "winnerBidId": None}]
+
+def test_vehicle_changes_wait_for_slow_commit(app_instance, client, make_seller):
+    from datetime import datetime, timedelta
+    from app.changefeed import MARKERS
+    from app.extensions import db
+    from app.models import ChangeLog
+    seller = make_seller("seller-cw@test.local")
+    since = client.get("/api/vehicles/changes?since=0&limit=1000").get_json()["data"]["seq"]
+
+    # Otra transacción (otro worker) reservó su seq y todavía no confirma
+    with app_instance.app_context():
+        marker = ChangeLog(committed=False)
+        db.session.add(marker)
+        db.session.commit()
+        marker_id = marker.id
+    vid = client.post("/api/vehicles", json={
+        "make": "Seat", "model": "600", "year": 1964,
+        "base_price": 3000, "lot_code": "TST-C03", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"]
+    # El lote nuevo queda detrás de la marca, tarde lo que tarde el commit lento
+    feed = client.get(f"/api/vehicles/changes?since={since}").get_json()["data"]
+    assert feed["vehicles"] == [] and feed["seq"] == since
+
+    # La transacción lenta confirma: el feed avanza sin haber saltado nada
+    with app_instance.app_context():
+        db.session.get(ChangeLog, marker_id).committed = True
+        db.session.commit()
+    feed = client.get(f"/api/vehicles/changes?since={since}").get_json()["data"]
+    assert [v["id"] for v in feed["vehicles"]] == [vid]
+
+    with app_instance.app_context():
+        # Marca de un proceso caído: se deja de esperar pasado el timeout
+        db.session.add(ChangeLog(committed=False, created_at=datetime.utcnow() - timedelta(hours=1)))
+        # Un rollback borra la marca de su transacción
+        rolled_back = ChangeLog(committed=False)
+        db.session.add(rolled_back)
+        db.session.commit()
+        rolled_back_id = rolled_back.id
+        db.session.info[MARKERS] = [rolled_back_id]
+        db.session.rollback()
+        assert ChangeLog.query.filter_by(id=rolled_back_id).count() == 0
+        db.session.remove()
+    assert client.get(f"/api/vehicles/changes?since={since}").get_json()["data"]["seq"] > since
+
+def test_vehicle_prices_columnar(client, seller_headers, auth_headers):
+    ids = []
+    for lot, base in (("TST-P01", 5000), ("TST-P02", 6000)):
+        r = client.post("/api/vehicles", json={
+            "make": "Mini", "model": "Cooper", "year": 1967,
+            "base_price": base, "lot_code": lot, "min_increment": 100,
+        }, headers=seller_headers)
+        ids.append(r.get_json()["data"]["id"])
+    buyer = auth_headers("prices@test.local", "prices123")
+    assert client.post(f"/api/vehicles/{ids[1]}/bids", json={"amount": 6100}, headers=buyer).status_code == 200
+
+    r = client.get(f"/api/vehicles/prices?ids={ids[1]},{ids[0]},999999")
+    data = r.get_json()["data"]
+    assert data["ids"] == [ids[1], ids[0]]
+    assert data["prices"] == [6100, 5000]
+    assert data["statuses"] == ["active", "active"]
+    assert len(data["endsAt"]) == 2
+
+    r = client.post("/api/vehicles/prices", json={"ids": ids})
+    assert r.get_json()["data"]["prices"] == [5000, 6100]
+
+    r = client.post("/api/vehicles/prices", json={"ids": list(range(1, 1002))})
+    assert r.status_code == 400
+
+def test_summary_loads_cover_only_and_defers_description(app_instance, client, seller_headers):
+    from sqlalchemy import event
+    from app.extensions import db
+
+    r = client.post("/api/vehicles", json={
+        "make": "Alfa Romeo", "model": "Giulia", "year": 1965, "base_price": 30000,
+        "lot_code": "TST-I01", "description": "x" * 5000,
+        "images": ["https://img/1.jpg", "https://img/2.jpg", "https://img/3.jpg"],
+    }, headers=seller_headers)
+    vid = r.get_json()["data"]["id"]
+    assert r.get_json()["data"]["images"] == ["https://img/1.jpg", "https://img/2.jpg", "https://img/3.jpg"]
+
+    statements = []
+    with app_instance.app_context():
+        engine = db.engine
+    listener = lambda conn, cur, stmt, *a: statements.append(stmt)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r = client.get("/api/vehicles?q=TST-I01")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    item = r.get_json()["data"][0]
+    assert item["id"] == vid
+    assert item["images"] == ["https://img/1.jpg"]
+    assert item["cover"] == {"url": "https://img/1.jpg", "small": "https://img/1.jpg", "variants": {}}
+    assert "description" not in item
+    # listado + máximos de puja + portadas, sin cargar la descripción
+    assert len(statements) == 3
+    assert not any("description" in s for s in statements)
+
+    r = client.get(f"/api/vehicles/{vid}")
+    assert r.get_json()["data"]["description"] == "x" * 5000
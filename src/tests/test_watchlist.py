@@ -0,0 +1,51 @@
+# tests/test_watchlist.py
+def test_watchlist_and_agenda(client, seller_headers, auth_headers):
+    r = client.post("/api/vehicles", json={
+        "make": "Chevrolet", "model": "Camaro", "year": 1968,
+        "base_price": 100000, "lot_code": "TST-W01", "min_increment": 1000,
+    }, headers=seller_headers)
+    assert r.status_code == 200
+    vid = r.get_json()["data"]["id"]
+
+    # el vendedor ve su lote en la agenda
+    r = client.get("/api/users/me/agenda", headers=seller_headers)
+    assert any(it["vehicleId"] == vid for it in r.get_json()["data"])
+
+    watcher = auth_headers("watcher@test.local", "watch123")
+    r = client.get("/api/users/me/agenda", headers=watcher)
+    assert all(it["vehicleId"] != vid for it in r.get_json()["data"])
+
+    # seguir / dejar de seguir (idempotente)
+    assert client.post(f"/api/vehicles/{vid}/watch", headers=watcher).status_code == 200
+    assert client.post(f"/api/vehicles/{vid}/watch", headers=watcher).status_code == 200
+    r = client.get("/api/users/me/agenda", headers=watcher)
+    assert [it["vehicleId"] for it in r.get_json()["data"]].count(vid) == 1
+
+    assert client.delete(f"/api/vehicles/{vid}/watch", headers=watcher).status_code == 200
+    r = client.get("/api/users/me/agenda", headers=watcher)
+    assert all(it["vehicleId"] != vid for it in r.get_json()["data"])
+
+    # pujar sigue el lote automáticamente
+    bidder = auth_headers("bidder-w@test.local", "bid123")
+    r = client.post(f"/api/vehicles/{vid}/bids", json={"amount": 101000}, headers=bidder)
+    assert r.status_code == 200
+    r = client.get("/api/users/me/agenda", headers=bidder)
+    assert any(it["vehicleId"] == vid for it in r.get_json()["data"])
+
+def test_ensure_ignores_existing_row(app_instance, client, make_seller):
+    from app.extensions import db
+    from app.models import Vehicle, Watchlist
+    seller = make_seller("seller-wr@test.local")
+    vid = client.post("/api/vehicles", json={
+        "make": "Ford", "model": "Falcon", "year": 1972,
+        "base_price": 5000, "lot_code": "TST-W02", "min_increment": 100,
+    }, headers=seller).get_json()["data"]["id"]
+    with app_instance.app_context():
+        v = db.session.get(Vehicle, vid)
+        uid = v.seller_id
+        # La fila ya existe (el alta del lote): el INSERT la ignora, sin IntegrityError
+        Watchlist.ensure(uid, v)
+        Watchlist.ensure(uid, v)
+        db.session.commit()
+        assert Watchlist.query.filter_by(user_id=uid, vehicle_id=vid).count() == 1
+        db.session.remove()